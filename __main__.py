@@ -1,9 +1,15 @@
 import argparse
+import fnmatch
 import logging
+import os
+from typing import List
 
+import bashlex.errors
 from dockerfile import GoIOError, GoParseError
 
-from dockerfile_ast import DockerfileAST, DockerfileASTVisitor, DockerfileParser
+from dockerfile_ast import DockerfileAST, DockerfileASTVisitor, DockerfileParser, ParseStatistics
+from dockerfile_ast import DockerfileIndex, DockerfileWatcher, ParseCache, ParseProfiler, DOCKERFILE_PATTERNS
+from dockerfile_ast.dockerfile_items.utils import InstructionEnum
 import dockerfile_ast.utils
 
 _TEST_RAW_CODE = """FROM ubuntu
@@ -22,14 +28,67 @@ def _init_argument_parser() -> argparse.ArgumentParser:
     parser.add_argument("-o", "--output", help="Filename of DockerfileAST", metavar="filename")
     parser.add_argument("--exclude-label-instructions", help="", action="store_true")
     parser.add_argument(
-        "--parse-level", help="Parse level (1: Dockerfile Instruction, 2: Shell Script, 3: Shell Command)",
-        default=1, choices=[1, 2, 3], type=int
+        "--parse-level", help="Parse level (1: Dockerfile Instruction, 2: Shell Script)",
+        default=1, choices=[1, 2], type=int
     )
     parser.add_argument("--separate-instructions", help="", action="store_true")
     parser.add_argument("--separate_run_instructions", help="", action="store_true")
+    parser.add_argument(
+        "--error-tolerant", help="Record instructions which cannot be parsed as diagnostics instead of stopping",
+        action="store_true"
+    )
+    parser.add_argument("--stats", help="Print timers and counters of parsing", action="store_true")
+    parser.add_argument(
+        "--watch", help="Watch Dockerfiles in the directory given as filename and print changes", action="store_true"
+    )
+    parser.add_argument(
+        "--cache", help="Cache file of Dockerfile ASTs in watch mode (default: var/cache/<directory>.pickle)",
+        metavar="filename"
+    )
+    parser.add_argument(
+        "--interval", help="Polling interval in seconds in watch mode", default=1.0, type=float, metavar="seconds"
+    )
+    parser.add_argument(
+        "--profile",
+        help="Profile parsing and visiting the Dockerfile (or Dockerfiles in the directory) given as filename, "
+             "and write cProfile stats and a report of the slowest files and allocation sites to var/log",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--profile-top", help="Number of rows of each section of the profile report", default=10, type=int,
+        metavar="N"
+    )
+    parser.add_argument(
+        "--include-types", help="Instructions to be parsed (e.g. FROM ARG)", nargs="+", type=InstructionEnum.of,
+        metavar="INSTRUCTION"
+    )
+    parser.add_argument(
+        "--exclude-types", help="Instructions not to be parsed (e.g. RUN LABEL)", nargs="+", type=InstructionEnum.of,
+        metavar="INSTRUCTION"
+    )
     return parser
 
 
+def _find_dockerfiles(filename: str) -> List[str]:
+    if not os.path.isdir(filename):
+        return [filename]
+    filenames: List[str] = list()
+    for dir_path, dir_names, basenames in os.walk(filename):
+        dir_names.sort()
+        for basename in sorted(basenames):
+            if any(fnmatch.fnmatchcase(basename, pattern) for pattern in DOCKERFILE_PATTERNS):
+                filenames.append(os.path.join(dir_path, basename))
+    return filenames
+
+
+def _parse_and_visit(dfile_parser: DockerfileParser, filename: str, logger: logging.Logger):
+    dfile_ast: DockerfileAST = dfile_parser.parse_file(filename)
+    for diagnostic in dfile_ast.diagnostics:
+        logger.warning(filename + ": " + str(diagnostic))
+    visitor: DockerfileASTVisitor = DockerfileASTVisitor(dfile_ast, logger)
+    visitor.visit()
+
+
 if __name__ == "__main__":
     argument_parser: argparse.ArgumentParser = _init_argument_parser()
     # parse command line arguments
@@ -39,6 +98,10 @@ if __name__ == "__main__":
     parse_level: int = args.parse_level
     separate_instructions: bool = args.separate_instructions
     separate_run_instructions: bool = args.separate_run_instructions
+    error_tolerant: bool = args.error_tolerant
+    stats: ParseStatistics = ParseStatistics() if args.stats else None
+    include_types: List[InstructionEnum] = args.include_types
+    exclude_types: List[InstructionEnum] = args.exclude_types
 
     logger: logging.Logger = dockerfile_ast.utils.init_logger(
         logging.DEBUG, "var/log/" + filename.replace("/", ".") + ".log", logging.WARNING
@@ -47,11 +110,46 @@ if __name__ == "__main__":
         # parse Dockerfile
         logger.info("Parse " + filename)
         dfile_parser: DockerfileParser = DockerfileParser(
-            exclude_label_instructions, parse_level, separate_instructions, separate_run_instructions, logger
+            exclude_label_instructions, parse_level, separate_instructions, separate_run_instructions, logger,
+            error_tolerant=error_tolerant, stats=stats, include_types=include_types, exclude_types=exclude_types
         )
-        dfile_ast: DockerfileAST = dfile_parser.parse_file(filename)
-        visitor: DockerfileASTVisitor = DockerfileASTVisitor(dfile_ast, logger)
-        visitor.visit()
+        if args.watch:
+            cache_filename: str = args.cache
+            if cache_filename is None:
+                cache_filename = "var/cache/" + filename.strip("/").replace("/", ".") + ".pickle"
+            cache: ParseCache = ParseCache(cache_filename)
+            cache.load()
+            with DockerfileWatcher(DockerfileIndex(filename, dfile_parser, cache), args.interval, logger=logger) \
+                    as watcher:
+                try:
+                    for event in watcher.events():
+                        print(event, flush=True)
+                        if event.dockerfile_ast is not None:
+                            for diagnostic in event.dockerfile_ast.diagnostics:
+                                logger.warning(event.filename + ": " + str(diagnostic))
+                except KeyboardInterrupt:
+                    pass
+            exit(0)
+        if args.profile:
+            log_prefix: str = "var/log/" + filename.strip("/").replace("/", ".")
+            with ParseProfiler() as profiler:
+                for dockerfile_name in _find_dockerfiles(filename):
+                    try:
+                        profiler.profile(dockerfile_name, _parse_and_visit, dfile_parser, dockerfile_name, logger)
+                    except (GoParseError, GoIOError, IOError, ValueError, bashlex.errors.ParsingError) as e:
+                        # 異常なDockerfileがあってもコーパス全体をプロファイル
+                        logger.error(getattr(e, "message", e))
+                profiler.dump_stats(log_prefix + ".prof")
+                report: str = profiler.report(args.profile_top)
+            with open(log_prefix + ".profile.txt", "w") as fp:
+                fp.write(report + "\n")
+            print(report)
+            if stats is not None:
+                print(stats.summary())
+            exit(0)
+        _parse_and_visit(dfile_parser, filename, logger)
+        if stats is not None:
+            print(stats.summary())
     except GoParseError as e:
         if hasattr(e, "message"):
             logger.error(e.message)
@@ -72,3 +170,5 @@ if __name__ == "__main__":
             logger.error(e.message)
         else:
             logger.error(e)
+    except bashlex.errors.ParsingError as e:
+        logger.error(e.message)
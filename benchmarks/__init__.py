@@ -0,0 +1,5 @@
+"""
+Benchmarks of dockerfile_ast on a synthetic Dockerfile corpus.
+
+Run ``python -m benchmarks`` at the root of this repository.
+"""
@@ -0,0 +1,82 @@
+import argparse
+import concurrent.futures
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+from typing import Dict, List
+
+from benchmarks.corpus_generator import DockerfileCorpusGenerator
+from benchmarks.scenarios import SCENARIOS, run_scenario
+
+
+def _init_argument_parser() -> argparse.ArgumentParser:
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Dockerfile AST Benchmarks")
+    parser.add_argument("--files", help="Number of generated Dockerfiles", default=200, type=int)
+    parser.add_argument("--seed", help="Seed of the corpus generator", default=0, type=int)
+    parser.add_argument("--corpus-dir", help="Directory of the generated corpus", default="tmp/benchmark_corpus")
+    parser.add_argument(
+        "--scenarios", help="Scenarios to be run", nargs="+", default=list(SCENARIOS.keys()),
+        choices=list(SCENARIOS.keys())
+    )
+    parser.add_argument(
+        "-o", "--output", help="Filename of benchmark results (JSON)", default="var/log/benchmark.json",
+        metavar="filename"
+    )
+    parser.add_argument("--baseline", help="Benchmark results (JSON) to be compared with", metavar="filename")
+    return parser
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_comparison(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]):
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for key in ("files_per_second", "p50_ms", "p99_ms", "peak_rss_kib"):
+            old_value: float = baseline[name][key]
+            ratio: str = "n/a" if old_value == 0 else "{0:+.1f}%".format((result[key] - old_value) / old_value * 100)
+            print("  {0:<20} {1:<17} {2:>14.3f} -> {3:>14.3f} ({4})".format(name, key, old_value, result[key], ratio))
+
+
+if __name__ == "__main__":
+    argument_parser: argparse.ArgumentParser = _init_argument_parser()
+    args: argparse.Namespace = argument_parser.parse_args()
+
+    generator: DockerfileCorpusGenerator = DockerfileCorpusGenerator(args.seed)
+    filenames: List[str] = generator.generate_corpus(args.corpus_dir, args.files)
+
+    results: Dict[str, Dict[str, float]] = dict()
+    for scenario in args.scenarios:
+        # ピークRSSをシナリオごとに計測するため，新しいプロセスで実行
+        with concurrent.futures.ProcessPoolExecutor(1, multiprocessing.get_context("spawn")) as executor:
+            results[scenario] = executor.submit(run_scenario, scenario, filenames).result()
+        print("{0:<20} {1:>10.1f} files/s  p50 {2:8.3f} ms  p99 {3:8.3f} ms  peak RSS {4} KiB".format(
+            scenario, results[scenario]["files_per_second"], results[scenario]["p50_ms"],
+            results[scenario]["p99_ms"], results[scenario]["peak_rss_kib"]
+        ))
+
+    report = {
+        "revision": _git_revision(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "seed": args.seed,
+        "files": args.files,
+        "scenarios": results,
+    }
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as fp:
+        json.dump(report, fp, indent=2)
+    if args.baseline is not None:
+        with open(args.baseline) as fp:
+            print("Compared with " + args.baseline + ":")
+            _print_comparison(results, json.load(fp)["scenarios"])
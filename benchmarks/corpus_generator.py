@@ -0,0 +1,214 @@
+import os
+import random
+from typing import List
+
+
+_BASE_IMAGES = ["ubuntu", "debian", "alpine", "python", "node", "golang", "centos", "nginx"]
+_TAGS = ["latest", "20.04", "22.04", "bullseye", "3.18", "3.11-slim", "18-alpine", "1.21"]
+_PACKAGES = [
+    "curl", "wget", "git", "ca-certificates", "build-essential", "gcc", "make", "openssl", "libssl-dev",
+    "zlib1g-dev", "tzdata", "locales", "unzip", "gnupg", "vim", "less", "jq", "python3-pip",
+]
+_PORTS = ["80", "443", "3000", "5000", "8000", "8080", "8443", "9000", "5432/tcp", "53/udp"]
+_LABEL_NAMES = [
+    "maintainer", "version", "description", "org.opencontainers.image.source",
+    "org.opencontainers.image.licenses", "org.opencontainers.image.revision", "vendor", "release",
+]
+_SIGNALS = ["SIGTERM", "SIGINT", "SIGQUIT", "SIGKILL"]
+
+
+class DockerfileCorpusGenerator:
+    """
+    A generator of synthetic but realistic Dockerfiles for benchmarks.
+
+    Generated Dockerfiles include multi-stage builds, long RUN chains, many ENV/LABEL/ARG Instructions,
+    ONBUILD triggers and heavy variable interpolation.
+    The same seed always generates the same corpus.
+
+    Attributes
+    ----------
+    __seed : int
+        Seed of the random number generator.
+    __random : random.Random
+        Random number generator.
+    """
+    __REPR_FORMAT: str = "{0}(seed={1})"
+
+    def __init__(self, seed: int = 0):
+        """
+        Parameters
+        ----------
+        seed : int
+            Seed of the random number generator.
+        """
+        self.__seed: int = seed
+        self.__random: random.Random = random.Random(seed)
+
+    @property
+    def seed(self) -> int:
+        """
+        Returns
+        -------
+        __seed : int
+            Seed of the random number generator.
+        """
+        return self.__seed
+
+    def generate(self) -> str:
+        """
+        Generate Dockerfile source code.
+
+        Returns
+        -------
+        raw_code : str
+            Dockerfile source code.
+        """
+        rnd: random.Random = self.__random
+        lines: List[str] = list()
+        global_args: List[str] = ["BASE_IMAGE", "BASE_TAG"]
+        lines.append("ARG BASE_IMAGE={0}".format(rnd.choice(_BASE_IMAGES)))
+        lines.append("ARG BASE_TAG={0}".format(rnd.choice(_TAGS)))
+        for i in range(rnd.randint(0, 4)):
+            global_args.append("GLOBAL_ARG_{0}".format(i))
+            lines.append("ARG GLOBAL_ARG_{0}={1}".format(i, rnd.randint(0, 1000)))
+
+        stage_names: List[str] = list()
+        for stage_index in range(rnd.randint(1, 4)):
+            lines.append("")
+            stage_name: str = "stage{0}".format(stage_index)
+            if len(stage_names) > 0 and rnd.random() < 0.3:
+                lines.append("FROM {0} AS {1}".format(rnd.choice(stage_names), stage_name))
+            elif rnd.random() < 0.5:
+                lines.append("FROM ${BASE_IMAGE}:${BASE_TAG} AS " + stage_name)
+            else:
+                lines.append("FROM {0}:{1} AS {2}".format(rnd.choice(_BASE_IMAGES), rnd.choice(_TAGS), stage_name))
+            lines.extend(self.__generate_stage(global_args, stage_names))
+            stage_names.append(stage_name)
+        return "\n".join(lines) + "\n"
+
+    def generate_corpus(self, directory: str, num_files: int) -> List[str]:
+        """
+        Generate Dockerfiles into a directory.
+
+        Parameters
+        ----------
+        directory : str
+            Directory name (created if not exists).
+        num_files : int
+            Number of Dockerfiles.
+
+        Returns
+        -------
+        filenames : List[str]
+            Generated Dockerfile names.
+        """
+        os.makedirs(directory, exist_ok=True)
+        filenames: List[str] = list()
+        for i in range(num_files):
+            filename: str = os.path.join(directory, "Dockerfile.{0:06d}".format(i))
+            with open(filename, "w") as fp:
+                fp.write(self.generate())
+            filenames.append(filename)
+        return filenames
+
+    def __generate_stage(self, global_args: List[str], stage_names: List[str]) -> List[str]:
+        rnd: random.Random = self.__random
+        lines: List[str] = list()
+        variables: List[str] = list()
+        for name in rnd.sample(global_args, rnd.randint(0, len(global_args))):
+            lines.append("ARG " + name)
+            variables.append(name)
+        for i in range(rnd.randint(1, 4)):
+            name = "BUILD_ARG_{0}".format(i)
+            lines.append("ARG {0}={1}".format(name, self.__interpolated_value(variables)))
+            variables.append(name)
+
+        # ENV/LABELは1命令に複数の変数を宣言する形式も含める
+        for i in range(rnd.randint(2, 12)):
+            if rnd.random() < 0.3:
+                name2 = "ENV_{0}_B".format(i)
+                lines.append("ENV ENV_{0}={1} \\\n    {2}={3}".format(
+                    i, self.__interpolated_value(variables), name2, self.__interpolated_value(variables)
+                ))
+                variables.append(name2)
+            else:
+                lines.append("ENV ENV_{0}={1}".format(i, self.__interpolated_value(variables)))
+            variables.append("ENV_{0}".format(i))
+        labels: List[str] = [
+            '{0}="{1}"'.format(name, self.__interpolated_value(variables))
+            for name in rnd.sample(_LABEL_NAMES, rnd.randint(1, len(_LABEL_NAMES)))
+        ]
+        lines.append("LABEL " + " \\\n      ".join(labels))
+        lines.append("WORKDIR /opt/${0}/app".format(rnd.choice(variables)))
+
+        for _ in range(rnd.randint(1, 3)):
+            lines.append(self.__run_chain(variables))
+        if len(stage_names) > 0 and rnd.random() < 0.7:
+            lines.append(
+                "COPY --from={0} /opt/build/ /opt/${1}/".format(rnd.choice(stage_names), rnd.choice(variables))
+            )
+        lines.append("COPY . /opt/${0}/src".format(rnd.choice(variables)))
+        if rnd.random() < 0.3:
+            lines.append("ADD https://example.com/archive.tar.gz /tmp/archive.tar.gz")
+        if rnd.random() < 0.4:
+            lines.append("ONBUILD " + self.__run_chain(variables, max_commands=3))
+            lines.append("ONBUILD COPY . /opt/onbuild")
+        if rnd.random() < 0.5:
+            lines.append("VOLUME /var/lib/${0} /var/log/app".format(rnd.choice(variables)))
+        lines.append("EXPOSE " + " ".join(rnd.sample(_PORTS, rnd.randint(1, 3))))
+        if rnd.random() < 0.5:
+            lines.append("HEALTHCHECK --interval=30s CMD curl -f http://localhost/ || exit 1")
+        if rnd.random() < 0.3:
+            lines.append("STOPSIGNAL " + rnd.choice(_SIGNALS))
+        lines.append("USER {0}".format(rnd.choice(["root", "app", "1000:1000", "nobody"])))
+        if rnd.random() < 0.5:
+            lines.append('ENTRYPOINT ["/opt/app/bin/entrypoint.sh"]')
+            lines.append('CMD ["--port", "8080"]')
+        else:
+            lines.append("CMD /opt/app/bin/start.sh --config /etc/${0}.conf".format(rnd.choice(variables)))
+        return lines
+
+    def __interpolated_value(self, variables: List[str]) -> str:
+        rnd: random.Random = self.__random
+        parts: List[str] = list()
+        for _ in range(rnd.randint(1, 4)):
+            if len(variables) > 0 and rnd.random() < 0.6:
+                name = rnd.choice(variables)
+                form = rnd.random()
+                if form < 0.4:
+                    parts.append("$" + name)
+                elif form < 0.8:
+                    parts.append("${" + name + "}")
+                else:
+                    parts.append("${" + name + ":-default" + str(rnd.randint(0, 9)) + "}")
+            else:
+                parts.append(rnd.choice(["/usr/local", "v1", "release", "x86_64", "-", "_", "1.2.3"]))
+        return "".join(parts)
+
+    def __run_chain(self, variables: List[str], max_commands: int = 12) -> str:
+        rnd: random.Random = self.__random
+        commands: List[str] = ["set -eux", "apt-get update"]
+        for _ in range(rnd.randint(1, max_commands)):
+            kind = rnd.random()
+            if kind < 0.4:
+                commands.append("apt-get install -y --no-install-recommends " + " ".join(
+                    rnd.sample(_PACKAGES, rnd.randint(1, 6))
+                ))
+            elif kind < 0.6:
+                commands.append("curl -fsSL https://example.com/${0}.tar.gz | tar -xz -C /opt".format(
+                    rnd.choice(variables) if len(variables) > 0 else "pkg"
+                ))
+            elif kind < 0.8:
+                commands.append("mkdir -p /opt/${0} && chown -R 1000:1000 /opt/${0}".format(
+                    rnd.choice(variables) if len(variables) > 0 else "app"
+                ))
+            else:
+                commands.append('echo "${0}" > /etc/app.conf'.format(
+                    rnd.choice(variables) if len(variables) > 0 else "value"
+                ))
+        commands.append("rm -rf /var/lib/apt/lists/*")
+        return "RUN " + " \\\n  && ".join(commands)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(self.__seed))
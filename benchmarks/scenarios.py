@@ -0,0 +1,128 @@
+import logging
+import resource
+import time
+from typing import Callable, Dict, List
+
+from dockerfile_ast import DockerfileAST, DockerfileASTVisitor, DockerfileParser
+from dockerfile_ast import NodeInterner, PROCESS_NODE_INTERNER
+
+
+def _new_logger() -> logging.Logger:
+    logger: logging.Logger = logging.getLogger("benchmarks")
+    logger.setLevel(logging.WARNING)
+    return logger
+
+
+def _parse_scenario(filenames: List[str]) -> List[float]:
+    logger: logging.Logger = _new_logger()
+    raw_codes: List[str] = list()
+    for filename in filenames:
+        with open(filename) as fp:
+            raw_codes.append(fp.read())
+    latencies: List[float] = list()
+    for raw_code in raw_codes:
+        start: float = time.perf_counter()
+        DockerfileParser(logger=logger).parse(raw_code)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _parse_file_scenario(filenames: List[str]) -> List[float]:
+    logger: logging.Logger = _new_logger()
+    latencies: List[float] = list()
+    for filename in filenames:
+        start: float = time.perf_counter()
+        DockerfileParser(logger=logger).parse_file(filename)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _parse_default_logger_scenario(filenames: List[str]) -> List[float]:
+    # ロガーを渡さない場合，DockerfileParserとDockerfileASTVisitorは生成のたびにdefault_logger()を呼び出す
+    latencies: List[float] = list()
+    for filename in filenames:
+        start: float = time.perf_counter()
+        DockerfileASTVisitor(DockerfileParser().parse_file(filename)).visit()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _hold_corpus_scenario(filenames: List[str], interner: NodeInterner = PROCESS_NODE_INTERNER) -> List[float]:
+    # 全てのASTを保持したままのピークRSSを計測
+    logger: logging.Logger = _new_logger()
+    asts: List[DockerfileAST] = list()
+    latencies: List[float] = list()
+    for filename in filenames:
+        start: float = time.perf_counter()
+        asts.append(DockerfileParser(logger=logger, interner=interner).parse_file(filename))
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _hold_corpus_without_interning_scenario(filenames: List[str]) -> List[float]:
+    return _hold_corpus_scenario(filenames, None)
+
+
+def _visitor_scenario(filenames: List[str]) -> List[float]:
+    logger: logging.Logger = _new_logger()
+    asts: List[DockerfileAST] = [DockerfileParser(logger=logger).parse_file(filename) for filename in filenames]
+    latencies: List[float] = list()
+    for ast in asts:
+        start: float = time.perf_counter()
+        DockerfileASTVisitor(ast, logger).visit()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+# シナリオ名 -> Dockerfileごとの処理時間（秒）を返す関数
+SCENARIOS: Dict[str, Callable[[List[str]], List[float]]] = {
+    "parse": _parse_scenario,
+    "parse_file": _parse_file_scenario,
+    "visitor": _visitor_scenario,
+    "parse_default_logger": _parse_default_logger_scenario,
+    "hold_corpus": _hold_corpus_scenario,
+    "hold_corpus_no_intern": _hold_corpus_without_interning_scenario,
+}
+
+
+def run_scenario(name: str, filenames: List[str]) -> Dict[str, float]:
+    """
+    Run a scenario and summarize its throughput, latency and peak RSS.
+
+    Run each scenario in a fresh process, because peak RSS is measured per process.
+
+    Parameters
+    ----------
+    name : str
+        Scenario name (a key of ``SCENARIOS``).
+    filenames : List[str]
+        Dockerfile names.
+
+    Returns
+    -------
+    result : Dict[str, float]
+        Files per second, p50/p99/max latency (milliseconds), total seconds and peak RSS (KiB).
+    """
+    latencies: List[float] = SCENARIOS[name](filenames)
+    total_seconds: float = sum(latencies)
+    sorted_latencies: List[float] = sorted(latencies)
+    return {
+        "files": len(latencies),
+        "total_seconds": total_seconds,
+        "files_per_second": len(latencies) / total_seconds if total_seconds > 0 else 0.0,
+        "p50_ms": _percentile(sorted_latencies, 50) * 1000,
+        "p99_ms": _percentile(sorted_latencies, 99) * 1000,
+        "max_ms": sorted_latencies[-1] * 1000 if len(sorted_latencies) > 0 else 0.0,
+        # Linuxではキロバイト単位
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def _percentile(sorted_values: List[float], percent: int) -> float:
+    """
+    Return the percentile of sorted values by the nearest-rank method.
+    """
+    if len(sorted_values) < 1:
+        return 0.0
+    rank: int = max(1, -(-percent * len(sorted_values) // 100))
+    return sorted_values[rank - 1]
@@ -1,6 +1,22 @@
+from .parse_statistics import *
+from .parse_profiler import *
+from .node_interner import *
+from .memory_footprint import *
 from .bash_parser import *
 from .dockerfile_ast import *
+from .dockerfile_diff import *
+from .variable_resolver import *
+from .build_stage_graph import *
+from .image_config import *
+from .image_inheritance_graph import *
+from .build_context_index import *
+from .layer_cache import *
+from .port_interval_index import *
+from .columnar_ast import *
+from .dockerignore import *
 from .dockerfile_parser import *
+from .dockerfile_watcher import *
+from .visitor_map_reduce import *
 
 __copyright__ = "Copyright (C) 2022 gruidae"
 __version__ = "1.0.0"
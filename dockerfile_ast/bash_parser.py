@@ -1,13 +1,23 @@
 import bashlex
+import bashlex.errors
+import functools
 import re
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashNode
 from dockerfile_ast.dockerfile_items.bash_items.nodes import BashValueNode
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashCommand
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashCommandList
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashCompoundCommand
 from dockerfile_ast.dockerfile_items.bash_items.nodes import BashConcat
 from dockerfile_ast.dockerfile_items.bash_items.nodes import BashConstant
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashParameterExpansion
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashPipeline
 from dockerfile_ast.dockerfile_items.bash_items.nodes import BashVariable
 from dockerfile_ast.dockerfile_items.bash_items.nodes import EnvironmentVariable
 from dockerfile_ast.dockerfile_items.bash_items.nodes import BuildTimeVariable
+from dockerfile_ast.node_interner import NodeInterner
+from dockerfile_ast.parse_statistics import ParseStatistics
 
 
 class BashParser:
@@ -21,7 +31,8 @@ class BashParser:
     def __simple_parse_bash_variable(
             variable_name: str,
             arg_variables: Dict[str, BuildTimeVariable],
-            env_variables: Dict[str, EnvironmentVariable]
+            env_variables: Dict[str, EnvironmentVariable],
+            interner: NodeInterner = None
     ) -> BashVariable:
         """
         Simply parse Bash variable.
@@ -34,6 +45,8 @@ class BashParser:
             Associative array of build-time variable on Dockerfile.
         env_variables : Dict[str, EnvironmentVariable]
             Associative array of environment variable on Dockerfile.
+        interner : NodeInterner or None
+            Intern table of plain Bash variables (not interned if None).
         Returns
         -------
         bash_variable : BashVariable
@@ -43,6 +56,8 @@ class BashParser:
             return env_variables[variable_name]
         elif arg_variables is not None and variable_name in arg_variables.keys():
             return arg_variables[variable_name]
+        elif interner is not None:
+            return interner.variable(variable_name)
         else:
             return BashVariable(variable_name)
 
@@ -50,7 +65,9 @@ class BashParser:
     def simple_parse_bash_concat(
             token: str,
             arg_variables: Dict[str, BuildTimeVariable],
-            env_variables: Dict[str, EnvironmentVariable]
+            env_variables: Dict[str, EnvironmentVariable],
+            stats: ParseStatistics = None,
+            interner: NodeInterner = None
     ) -> BashValueNode:
         """
         Simply parse Bash concat (Bash variables and constants).
@@ -63,6 +80,10 @@ class BashParser:
             Associative array of build-time variable on Dockerfile.
         env_variables : Dict[str, EnvironmentVariable]
             Associative array of environment variable on Dockerfile.
+        stats : ParseStatistics or None
+            Statistics in order to measure bashlex and regex phases.
+        interner : NodeInterner or None
+            Intern table of Bash constants and plain Bash variables (not interned if None).
         Returns
         -------
         bash_value_node : BashValueNode
@@ -70,48 +91,253 @@ class BashParser:
         """
         if token is None:
             return None
+        if stats is None:
+            bashlex_nodes = bashlex.parse(token)
+        else:
+            stats.count_bashlex_call()
+            bashlex_nodes = stats.measure(ParseStatistics.BASHLEX_PHASE, bashlex.parse, token)
         # CommandNode()ではないため，直接WordNodeへとVisit
-        bashlex_token = bashlex.parse(token)[0].parts[0]
+        bashlex_token = bashlex_nodes[0].parts[0]
         bashlex_variables: List = bashlex_token.parts
 
         if len(bashlex_variables) < 1:
             # 定数のみ
-            return BashConstant(bashlex_token.word)
-        elif len(bashlex_variables) == 1:
-            # 変数のみ（${variable:-word}や${variable:+word}は非対応）
-            variable_name = bashlex_variables[0].value
-            if re.match(r"^\$(\{\w+}|\w+)$", bashlex_token.word):
-                return BashParser.__simple_parse_bash_variable(variable_name, arg_variables, env_variables)
-
-        # 変数と定数の分離
-        split_tokens = [bashlex_token.word]
-        for bashlex_variable in bashlex_variables:
-            variable_name = bashlex_variable.value
-            tmp_split_tokens1 = split_tokens
-            split_tokens = list()
-            for tmp_split_token1 in tmp_split_tokens1:
-                if isinstance(tmp_split_token1, str):
-                    # 変数名でトークンを分割
-                    tmp_split_tokens2 = re.split(r"\$\{" + variable_name + r"}|\$" + variable_name, tmp_split_token1)
-                    is_head_split_tokens = True
-                    for tmp_split_token2 in tmp_split_tokens2:
-                        tmp_split_token2 = tmp_split_token2
-                        if not is_head_split_tokens:
-                            # 変数はあらかじめparseしておく
-                            variable: BashVariable = BashParser.__simple_parse_bash_variable(
-                                variable_name, arg_variables, env_variables
-                            )
-                            split_tokens.append(variable)
-                        if len(tmp_split_token2) > 0:
-                            split_tokens.append(tmp_split_token2)
-                        is_head_split_tokens = False
+            return _new_constant(bashlex_token.word, interner)
+
+        # 変数と定数の分離（${variable:-word}や${variable:+word}も含む）
+        if stats is None:
+            return BashParser.__parse_bash_word(bashlex_token.word, arg_variables, env_variables, interner)
+        return stats.measure(
+            ParseStatistics.REGEX_PHASE, BashParser.__parse_bash_word,
+            bashlex_token.word, arg_variables, env_variables, interner
+        )
+
+    @staticmethod
+    def parse_bash_script(script: str) -> BashCommandList:
+        """
+        Parse Bash script (e.g. shell form of RUN Instruction) into a list of commands.
+
+        Parsed command trees are cached by normalized script text
+        (line continuations and whitespace outside quotes are collapsed),
+        so that the same scripts across Dockerfiles are parsed only once.
+        The cached trees are shared, so they must not be modified.
+
+        Parameters
+        ----------
+        script : str
+            Bash script.
+        Returns
+        -------
+        bash_command_list : BashCommandList or None
+            A node of Bash command list (None if the script cannot be parsed by bashlex).
+        """
+        if script is None:
+            return None
+        return _parse_normalized_bash_script(_normalize_bash_script(script))
+
+    @staticmethod
+    def clear_bash_script_cache():
+        """
+        Clear the cache of parsed Bash scripts.
+        """
+        _parse_normalized_bash_script.cache_clear()
+
+    @staticmethod
+    def parse_bash_script_node(bashlex_node, script: str) -> BashNode:
+        """
+        Convert a node generated by bashlex into a node of Bash command, pipeline, command list or compound command.
+
+        Parameters
+        ----------
+        bashlex_node : bashlex.ast.node
+            A node generated by ``bashlex.parse``.
+        script : str
+            Bash script parsed by bashlex.
+        Returns
+        -------
+        bash_node : BashNode
+            A node of Bash command, pipeline, command list or compound command.
+        """
+        raw_code: str = script[bashlex_node.pos[0]:bashlex_node.pos[1]]
+        if bashlex_node.kind == "list":
+            commands: List[BashNode] = list()
+            operators: List[str] = list()
+            for part in bashlex_node.parts:
+                if part.kind == "operator":
+                    operators[-1] = part.op
                 else:
-                    split_tokens.append(tmp_split_token1)
+                    commands.append(BashParser.parse_bash_script_node(part, script))
+                    operators.append(None)
+            return BashCommandList(commands, operators, raw_code)
+        elif bashlex_node.kind == "pipeline":
+            commands: List[BashNode] = [
+                BashParser.parse_bash_script_node(part, script) for part in bashlex_node.parts if part.kind != "pipe"
+            ]
+            return BashPipeline(commands, raw_code)
+        elif bashlex_node.kind == "command":
+            words: List[BashValueNode] = list()
+            redirects: List[str] = list()
+            for part in bashlex_node.parts:
+                if part.kind == "redirect":
+                    redirects.append(script[part.pos[0]:part.pos[1]])
+                elif part.kind == "word" and all(p.kind == "parameter" for p in part.parts) and len(part.parts) > 0:
+                    # コマンド実行時にシェルが展開するため，ARG/ENV変数とは対応付けない
+                    words.append(BashParser.__parse_bash_word(part.word, None, None))
+                else:
+                    words.append(BashConstant(part.word))
+            return BashCommand(words, redirects, raw_code)
+        else:
+            return BashCompoundCommand(raw_code)
+
+    @staticmethod
+    def __parse_bash_word(
+            word: str,
+            arg_variables: Dict[str, BuildTimeVariable],
+            env_variables: Dict[str, EnvironmentVariable],
+            interner: NodeInterner = None
+    ) -> BashValueNode:
+        """
+        Split Bash word into Bash variables, parameter expansions and constants.
 
+        Parameters
+        ----------
+        word : str
+            Bash word whose quotes are removed.
+        arg_variables : Dict[str, BuildTimeVariable]
+            Associative array of build-time variable on Dockerfile.
+        env_variables : Dict[str, EnvironmentVariable]
+            Associative array of environment variable on Dockerfile.
+        interner : NodeInterner or None
+            Intern table of Bash constants and plain Bash variables (not interned if None).
+        Returns
+        -------
+        bash_value_node : BashValueNode
+            A node of Bash variable, parameter expansion, constant or concat.
+        """
         nodes: List[BashValueNode] = list()
-        for token in split_tokens:
-            if isinstance(token, str):
-                nodes.append(BashConstant(token))
-            else:
-                nodes.append(token)
-        return BashConcat(nodes)
+        constant: str = ""
+        index: int = 0
+        while index < len(word):
+            dollar_index = word.find("$", index)
+            if dollar_index < 0:
+                constant += word[index:]
+                break
+            constant += word[index:dollar_index]
+            node, index = BashParser.__parse_bash_parameter(
+                word, dollar_index, arg_variables, env_variables, interner
+            )
+            if node is None:
+                constant += "$"
+                continue
+            if len(constant) > 0:
+                nodes.append(_new_constant(constant, interner))
+                constant = ""
+            nodes.append(node)
+        if len(constant) > 0:
+            nodes.append(_new_constant(constant, interner))
+
+        if len(nodes) < 1:
+            return _new_constant("", interner)
+        elif len(nodes) == 1:
+            return nodes[0]
+        else:
+            return BashConcat(nodes)
+
+    @staticmethod
+    def __parse_bash_parameter(
+            word: str,
+            dollar_index: int,
+            arg_variables: Dict[str, BuildTimeVariable],
+            env_variables: Dict[str, EnvironmentVariable],
+            interner: NodeInterner = None
+    ) -> Tuple[BashValueNode, int]:
+        """
+        Parse Bash parameter (`$variable`, `${variable}`, `${variable:-word}` or `${variable:+word}`)
+        starting at `dollar_index`.
+
+        Returns
+        -------
+        bash_value_node, next_index : Tuple[BashValueNode, int]
+            A node of Bash variable or parameter expansion (None if not a parameter),
+            and the index next to the parameter.
+        """
+        match = _PARAMETER_PATTERN.match(word, dollar_index)
+        if match is None:
+            return None, dollar_index + 1
+        if match.group(1) is not None:
+            # $variable
+            variable_name = match.group(1)
+            return (
+                BashParser.__simple_parse_bash_variable(variable_name, arg_variables, env_variables, interner),
+                match.end()
+            )
+        variable_name = match.group(2)
+        operator = match.group(3)
+        if operator is None:
+            # ${variable}
+            return (
+                BashParser.__simple_parse_bash_variable(variable_name, arg_variables, env_variables, interner),
+                match.end()
+            )
+
+        # ${variable:-word}, ${variable:+word}（入れ子の${...}を考慮して閉じ括弧を探す）
+        depth: int = 1
+        index: int = match.end()
+        while index < len(word):
+            if word.startswith("${", index):
+                depth += 1
+                index += 2
+                continue
+            elif word[index] == "}":
+                depth -= 1
+                if depth == 0:
+                    break
+            index += 1
+        if depth > 0:
+            return None, dollar_index + 1
+        variable: BashVariable = BashParser.__simple_parse_bash_variable(
+            variable_name, arg_variables, env_variables, interner
+        )
+        alternative_word: BashValueNode = BashParser.__parse_bash_word(
+            word[match.end():index], arg_variables, env_variables, interner
+        )
+        return BashParameterExpansion(variable, operator, alternative_word), index + 1
+
+
+def _new_constant(value: str, interner: NodeInterner) -> BashConstant:
+    """
+    Return the interned Bash constant, or a new Bash constant if `interner` is None.
+    """
+    if interner is None:
+        return BashConstant(value)
+    return interner.constant(value)
+
+
+# $variable, ${variable}, ${variable:-, ${variable:+
+_PARAMETER_PATTERN = re.compile(r"\$(?:([A-Za-z_]\w*)|\{([A-Za-z_]\w*)(?:}|(:[-+])))")
+
+
+def _normalize_bash_script(script: str) -> str:
+    """
+    Remove line continuations and collapse whitespace outside quotes in Bash script.
+    """
+    script = re.sub(r"\\\r?\n", " ", script)
+    return _NORMALIZE_PATTERN.sub(lambda match: match.group(1) or " ", script).strip()
+
+
+# エスケープ文字・クォート文字列はそのまま，それ以外の空白文字の連続は1文字へ
+_NORMALIZE_PATTERN = re.compile(r"""(\\.|'[^']*'|"(?:\\.|[^"\\])*")|[ \t]+""")
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_normalized_bash_script(script: str) -> BashCommandList:
+    try:
+        bashlex_nodes = bashlex.parse(script)
+    except (bashlex.errors.ParsingError, NotImplementedError):
+        return None
+    commands: List[BashNode] = [BashParser.parse_bash_script_node(node, script) for node in bashlex_nodes]
+    if len(commands) == 1 and isinstance(commands[0], BashCommandList):
+        return commands[0]
+    # 改行で区切られたコマンドは`;`で区切られたものとみなす
+    operators: List[str] = [";"] * (len(commands) - 1) + [None]
+    return BashCommandList(commands, operators, script)
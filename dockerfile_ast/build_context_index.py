@@ -0,0 +1,341 @@
+import bisect
+import os
+import posixpath
+import re
+from typing import Dict, List, Pattern, Set, Tuple
+
+from dockerfile_ast.dockerfile_ast import DockerfileAST
+from dockerfile_ast.dockerfile_items.instructions import COPYInstruction, FileCopyInstruction, Instruction
+from dockerfile_ast.dockerignore import Dockerignore, DockerignoreParser, translate_pattern
+from dockerfile_ast.variable_resolver import VariableResolver
+
+
+class BuildContextIndex:
+    """
+    A directory index of files in a build context which are not ignored by `.dockerignore`,
+    answering source patterns of COPY/ADD Instructions without walking the build context again.
+
+    The build context is walked once on first use, and each source pattern is matched component by component
+    against the names in the directories it can reach, as Docker does (`*` and `?` do not match `/`).
+    A matched directory stands for all files under it.
+
+    Attributes
+    ----------
+    __context_directory : str
+        Absolute name of the build context directory.
+    __dockerignore : Dockerignore
+        Patterns of `.dockerignore` of the build context.
+    __filenames : List[str]
+        Relative names (`/`-separated) of files in sorted order, so that files under a directory are contiguous
+        (None before the build context is walked).
+    __file_sizes : Dict[str, int]
+        Sizes of files in bytes (relative name is the key).
+    __children : Dict[str, List[str]]
+        Names of files and directories in each directory in sorted order (relative name, `.` for the root,
+        is the key).
+    """
+    __REPR_FORMAT: str = "{0}(context_directory={1}, dockerignore={2})"
+
+    def __init__(self, context_directory: str, dockerignore: Dockerignore = None):
+        """
+        Parameters
+        ----------
+        context_directory : str
+            Build context directory.
+        dockerignore : Dockerignore or None
+            Patterns of `.dockerignore` (parsed from `.dockerignore` in the build context if None).
+        """
+        self.__context_directory: str = os.path.abspath(context_directory)
+        if dockerignore is None:
+            dockerignore = DockerignoreParser().parse_context(self.__context_directory)
+        self.__dockerignore: Dockerignore = dockerignore
+        self.__filenames: List[str] = None
+        self.__file_sizes: Dict[str, int] = dict()
+        self.__children: Dict[str, List[str]] = dict()
+
+    @property
+    def context_directory(self) -> str:
+        """
+        Returns
+        -------
+        __context_directory : str
+            Absolute name of the build context directory.
+        """
+        return self.__context_directory
+
+    @property
+    def dockerignore(self) -> Dockerignore:
+        """
+        Returns
+        -------
+        __dockerignore : Dockerignore
+            Patterns of `.dockerignore` of the build context.
+        """
+        return self.__dockerignore
+
+    @property
+    def filenames(self) -> List[str]:
+        """
+        Returns
+        -------
+        __filenames : List[str]
+            Relative names (`/`-separated) of files in the build context in sorted order.
+        """
+        self.__ensure_index()
+        return self.__filenames
+
+    def file_size(self, path: str) -> int:
+        """
+        Return the size of a file in bytes.
+
+        Parameters
+        ----------
+        path : str
+            Relative name (`/`-separated) of the file.
+
+        Returns
+        -------
+        file_size : int
+            Size of the file in bytes.
+        """
+        self.__ensure_index()
+        return self.__file_sizes[path]
+
+    def refresh(self):
+        """
+        Discard the index, so that the build context is walked again on next use.
+        """
+        self.__filenames = None
+        self.__file_sizes = dict()
+        self.__children = dict()
+
+    def glob(self, pattern: str) -> List[str]:
+        """
+        Return files and directories matched by a source pattern of COPY/ADD Instruction.
+
+        Parameters
+        ----------
+        pattern : str
+            Source pattern relative to the build context (e.g. `src/*.py`).
+
+        Returns
+        -------
+        paths : List[str]
+            Relative names (`/`-separated, `.` for the root) of matched files and directories.
+        """
+        self.__ensure_index()
+        pattern = normalize_context_path(pattern)
+        if pattern == ".":
+            return ["."]
+        paths: List[str] = ["."]
+        for part in pattern.split("/"):
+            next_paths: List[str] = list()
+            if _WILDCARD_PATTERN.search(part) is None:
+                for path in paths:
+                    child_path: str = _join(path, part)
+                    if child_path in self.__children or child_path in self.__file_sizes:
+                        next_paths.append(child_path)
+            else:
+                part_regex: Pattern = _compile_part(part)
+                for path in paths:
+                    next_paths.extend([
+                        _join(path, name) for name in self.__children.get(path, ()) if part_regex.fullmatch(name)
+                    ])
+            paths = next_paths
+            if len(paths) < 1:
+                break
+        return paths
+
+    def expand(self, pattern: str) -> List[str]:
+        """
+        Return files copied by a source pattern of COPY/ADD Instruction (directories are expanded recursively).
+
+        Parameters
+        ----------
+        pattern : str
+            Source pattern relative to the build context (e.g. `src/*.py`).
+
+        Returns
+        -------
+        filenames : List[str]
+            Relative names (`/`-separated) of copied files in sorted order.
+        """
+        paths: List[str] = self.glob(pattern)
+        if paths == ["."]:
+            return list(self.__filenames)
+        filenames: List[str] = list()
+        for path in paths:
+            if path in self.__file_sizes:
+                filenames.append(path)
+            else:
+                # ソート済みのため，ディレクトリ下のファイルは連続する
+                start: int = bisect.bisect_left(self.__filenames, path + "/")
+                end: int = bisect.bisect_left(self.__filenames, path + "0")
+                filenames.extend(self.__filenames[start:end])
+        # 一致したパスは同じ深さにあり重ならないため，並べ替えのみ
+        return sorted(filenames) if len(paths) > 1 else filenames
+
+    def copy_sources(
+            self,
+            dockerfile_ast: DockerfileAST,
+            build_args: Dict[str, str] = None
+    ) -> List[Tuple[Instruction, List[str]]]:
+        """
+        Expand sources of all COPY/ADD Instructions copying from the build context against this index.
+
+        COPY Instructions with `--from=<name>`, remote sources of ADD Instructions (URLs and Git repositories)
+        and heredocs are skipped. Sources matching nothing are ignored (Docker fails unless they have wildcards).
+
+        Parameters
+        ----------
+        dockerfile_ast : DockerfileAST
+            Dockerfile AST.
+        build_args : Dict[str, str] or None
+            Values of `--build-arg` options (variable name is the key).
+
+        Returns
+        -------
+        copy_sources : List[Tuple[Instruction, List[str]]]
+            COPY/ADD Instructions in declaration order and relative names of files they copy in sorted order.
+        """
+        resolver: VariableResolver = VariableResolver(build_args)
+        copy_sources: List[Tuple[Instruction, List[str]]] = list()
+        for instruction in dockerfile_ast.instructions:
+            if not isinstance(instruction, FileCopyInstruction):
+                continue
+            if isinstance(instruction, COPYInstruction) and instruction.from_stage is not None:
+                continue
+            copy_sources.append((instruction, self.instruction_sources(instruction, resolver)))
+        return copy_sources
+
+    def instruction_sources(
+            self,
+            instruction: FileCopyInstruction,
+            resolver: VariableResolver
+    ) -> List[str]:
+        """
+        Expand sources of a COPY/ADD Instruction against this index (remote sources are skipped).
+
+        Parameters
+        ----------
+        instruction : FileCopyInstruction
+            COPY/ADD Instruction.
+        resolver : VariableResolver
+            Resolver of variables in the sources.
+
+        Returns
+        -------
+        filenames : List[str]
+            Relative names (`/`-separated) of copied files in sorted order.
+        """
+        filenames: List[str] = list()
+        for source in instruction.sources:
+            pattern: str = resolver.resolve(source)
+            if not is_remote_source(pattern):
+                filenames.extend(self.expand(pattern))
+        return sorted(set(filenames)) if len(instruction.sources) > 1 else filenames
+
+    def __ensure_index(self):
+        if self.__filenames is not None:
+            return
+        filenames: List[str] = list()
+        directories: Set[str] = {"."}
+        for path, entry in self.__dockerignore.walk(self.__context_directory):
+            filenames.append(path)
+            self.__file_sizes[path] = entry.stat(follow_symlinks=False).st_size
+            directory, _, name = path.rpartition("/")
+            directory = directory or "."
+            self.__children.setdefault(directory, list()).append(name)
+            # 未登録の祖先ディレクトリを親ディレクトリに登録
+            while directory not in directories:
+                directories.add(directory)
+                parent, _, name = directory.rpartition("/")
+                parent = parent or "."
+                self.__children.setdefault(parent, list()).append(name)
+                directory = parent
+        for names in self.__children.values():
+            names.sort()
+        filenames.sort()
+        self.__filenames = filenames
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(self.__context_directory), repr(self.__dockerignore))
+
+
+def normalize_context_path(path: str) -> str:
+    """
+    Return a path relative to the build context root (`.` for the root itself),
+    as sources of COPY/ADD Instructions cannot refer outside the build context.
+
+    Parameters
+    ----------
+    path : str
+        Path (`/`-separated) relative to the build context.
+
+    Returns
+    -------
+    normalized_path : str
+        Normalized path.
+    """
+    return posixpath.normpath("/" + path).lstrip("/") or "."
+
+
+def is_remote_source(source: str) -> bool:
+    """
+    Return True if a source of ADD Instruction is a URL or a Git repository instead of a path in the build context.
+    """
+    return source.startswith(_REMOTE_SOURCE_PREFIXES)
+
+
+def matches_source(pattern: str, path: str) -> bool:
+    """
+    Return True if a file is copied by a source pattern of COPY/ADD Instruction,
+    i.e. the pattern matches the file or one of its parent directories component by component as ``glob`` does.
+    The file need not exist (e.g. removed files).
+
+    Parameters
+    ----------
+    pattern : str
+        Source pattern relative to the build context (e.g. `src/*.py`).
+    path : str
+        Relative name (`/`-separated) of the file.
+
+    Returns
+    -------
+    matches_source : bool
+        True if the file is copied by the source pattern.
+    """
+    pattern = normalize_context_path(pattern)
+    if pattern == ".":
+        return True
+    pattern_parts: List[str] = pattern.split("/")
+    path_parts: List[str] = normalize_context_path(path).split("/")
+    if len(path_parts) < len(pattern_parts):
+        return False
+    for pattern_part, path_part in zip(pattern_parts, path_parts):
+        if _WILDCARD_PATTERN.search(pattern_part) is None:
+            if pattern_part != path_part:
+                return False
+        elif _compile_part(pattern_part).fullmatch(path_part) is None:
+            return False
+    return True
+
+
+def _join(directory: str, name: str) -> str:
+    return name if directory == "." else directory + "/" + name
+
+
+def _compile_part(part: str) -> Pattern:
+    """
+    Compile a path component of source pattern as Go `filepath.Match` does (`**` is the same as `*`).
+    """
+    return re.compile(translate_pattern(part, double_star=False), re.DOTALL)
+
+
+_REMOTE_SOURCE_PREFIXES = ("http://", "https://", "git@", "git://")
+# ワイルドカードを含むパスの要素
+_WILDCARD_PATTERN = re.compile(r"[*?\[\\]")
@@ -0,0 +1,317 @@
+from typing import Dict, List, Set, Union
+
+from dockerfile_ast.dockerfile_ast import DockerfileAST
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashConstant
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashValueNode
+from dockerfile_ast.dockerfile_items.instructions import Instruction
+from dockerfile_ast.dockerfile_items.instructions import COPYInstruction
+from dockerfile_ast.dockerfile_items.instructions import FROMInstruction
+from dockerfile_ast.variable_resolver import VariableResolver
+
+
+class BuildStage:
+    """
+    A build stage of multi-stage Dockerfile, which starts from a FROM Instruction.
+
+    Attributes
+    ----------
+    __index : int
+        Index of this build stage (0-origin).
+    __from_instruction : FROMInstruction
+        FROM Instruction starting this build stage.
+    __instructions : List[Instruction]
+        Dockerfile Instructions in this build stage (excluding its FROM Instruction).
+    __base_stage : int or None
+        Index of the build stage this build stage is based on (None if based on a Docker image).
+    __dependencies : List[int]
+        Indexes of build stages this build stage depends on via `FROM <stage>` or `COPY --from=<stage>`.
+    """
+    __REPR_FORMAT: str = "{0}(index={1}, name={2}, base_stage={3}, dependencies={4})"
+
+    def __init__(
+            self,
+            index: int,
+            from_instruction: FROMInstruction,
+            instructions: List[Instruction],
+            base_stage: int,
+            dependencies: List[int]
+    ):
+        """
+        Parameters
+        ----------
+        index : int
+            Index of this build stage (0-origin).
+        from_instruction : FROMInstruction
+            FROM Instruction starting this build stage.
+        instructions : List[Instruction]
+            Dockerfile Instructions in this build stage (excluding its FROM Instruction).
+        base_stage : int or None
+            Index of the build stage this build stage is based on (None if based on a Docker image).
+        dependencies : List[int]
+            Indexes of build stages this build stage depends on.
+        """
+        self.__index: int = index
+        self.__from_instruction: FROMInstruction = from_instruction
+        self.__instructions: List[Instruction] = instructions
+        self.__base_stage: int = base_stage
+        self.__dependencies: List[int] = dependencies
+
+    @property
+    def index(self) -> int:
+        """
+        Returns
+        -------
+        __index : int
+            Index of this build stage (0-origin).
+        """
+        return self.__index
+
+    @property
+    def name(self) -> str:
+        """
+        Returns
+        -------
+        name : str or None
+            Name of this build stage given by `AS <name>` (None if not named).
+        """
+        as_name: BashValueNode = self.__from_instruction.image.as_name
+        return None if as_name is None else str(as_name)
+
+    @property
+    def from_instruction(self) -> FROMInstruction:
+        """
+        Returns
+        -------
+        __from_instruction : FROMInstruction
+            FROM Instruction starting this build stage.
+        """
+        return self.__from_instruction
+
+    @property
+    def instructions(self) -> List[Instruction]:
+        """
+        Returns
+        -------
+        __instructions : List[Instruction]
+            Dockerfile Instructions in this build stage (excluding its FROM Instruction).
+        """
+        return self.__instructions
+
+    @property
+    def base_stage(self) -> int:
+        """
+        Returns
+        -------
+        __base_stage : int or None
+            Index of the build stage this build stage is based on (None if based on a Docker image).
+        """
+        return self.__base_stage
+
+    @property
+    def dependencies(self) -> List[int]:
+        """
+        Returns
+        -------
+        __dependencies : List[int]
+            Indexes of build stages this build stage depends on.
+        """
+        return self.__dependencies
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(self.__index), repr(self.name), repr(self.__base_stage), repr(self.__dependencies)
+        )
+
+
+class BuildStageGraph:
+    """
+    A dependency graph of build stages in multi-stage Dockerfile.
+
+    Build stages depend on earlier build stages via `FROM <stage>` and `COPY --from=<stage>`.
+    References whose value is not a constant (e.g. `FROM ${BASE}`) are regarded as external Docker images
+    unless a ``VariableResolver`` is given.
+
+    Attributes
+    ----------
+    __global_instructions : List[Instruction]
+        Dockerfile Instructions before the first FROM Instruction.
+    __stages : List[BuildStage]
+        Build stages in declaration order.
+    """
+    __REPR_FORMAT: str = "{0}(stages={1})"
+
+    def __init__(self, global_instructions: List[Instruction], stages: List[BuildStage]):
+        """
+        Parameters
+        ----------
+        global_instructions : List[Instruction]
+            Dockerfile Instructions before the first FROM Instruction.
+        stages : List[BuildStage]
+            Build stages in declaration order.
+        """
+        self.__global_instructions: List[Instruction] = global_instructions
+        self.__stages: List[BuildStage] = stages
+        self.__stage_indexes: Dict[str, int] = dict()
+        for stage in stages:
+            if stage.name is not None:
+                self.__stage_indexes[stage.name.lower()] = stage.index
+
+    @staticmethod
+    def of(ast: DockerfileAST, resolver: VariableResolver = None) -> "BuildStageGraph":
+        """
+        Build a dependency graph of build stages in Dockerfile AST.
+
+        Parameters
+        ----------
+        ast : DockerfileAST
+            Dockerfile AST.
+        resolver : VariableResolver or None
+            Resolver in order to evaluate stage references including variables.
+
+        Returns
+        -------
+        graph : BuildStageGraph
+            Dependency graph of build stages.
+        """
+        global_instructions: List[Instruction] = list()
+        stage_instructions: List[List[Instruction]] = list()
+        from_instructions: List[FROMInstruction] = list()
+        for instruction in ast.instructions:
+            if isinstance(instruction, FROMInstruction):
+                from_instructions.append(instruction)
+                stage_instructions.append(list())
+            elif len(from_instructions) == 0:
+                global_instructions.append(instruction)
+            else:
+                stage_instructions[-1].append(instruction)
+
+        stages: List[BuildStage] = list()
+        stage_indexes: Dict[str, int] = dict()
+        for index, from_instruction in enumerate(from_instructions):
+            image = from_instruction.image
+            base_stage: int = None
+            if image.tag is None and image.digest is None:
+                base_stage = _find_stage(image.name, stage_indexes, index, False, resolver)
+            dependencies: Set[int] = set() if base_stage is None else {base_stage}
+            for instruction in stage_instructions[index]:
+                if isinstance(instruction, COPYInstruction) and instruction.from_stage is not None:
+                    dependency: int = _find_stage(
+                        instruction.from_stage, stage_indexes, index, True, resolver
+                    )
+                    if dependency is not None:
+                        dependencies.add(dependency)
+            stages.append(
+                BuildStage(index, from_instruction, stage_instructions[index], base_stage, sorted(dependencies))
+            )
+            if image.as_name is not None:
+                stage_indexes[str(image.as_name).lower()] = index
+        return BuildStageGraph(global_instructions, stages)
+
+    @property
+    def global_instructions(self) -> List[Instruction]:
+        """
+        Returns
+        -------
+        __global_instructions : List[Instruction]
+            Dockerfile Instructions before the first FROM Instruction.
+        """
+        return self.__global_instructions
+
+    @property
+    def stages(self) -> List[BuildStage]:
+        """
+        Returns
+        -------
+        __stages : List[BuildStage]
+            Build stages in declaration order.
+        """
+        return self.__stages
+
+    def stage(self, target: Union[str, int] = None) -> BuildStage:
+        """
+        Find a build stage by its name or index.
+
+        Parameters
+        ----------
+        target : str or int or None
+            Build stage name or index (the last build stage if None).
+
+        Returns
+        -------
+        stage : BuildStage
+            Build stage.
+        """
+        if len(self.__stages) < 1:
+            raise ValueError("BuildStageGraph: Dockerfile has no build stage.")
+        if target is None:
+            return self.__stages[-1]
+        elif isinstance(target, int):
+            if target < 0 or len(self.__stages) <= target:
+                raise ValueError("BuildStageGraph: build stage {0} is not defined.".format(target))
+            return self.__stages[target]
+        elif target.lower() in self.__stage_indexes:
+            return self.__stages[self.__stage_indexes[target.lower()]]
+        else:
+            raise ValueError("BuildStageGraph: build stage {0} is not defined.".format(target))
+
+    def topological_order(self) -> List[BuildStage]:
+        """
+        Return build stages in an order where every build stage follows the build stages it depends on.
+
+        Returns
+        -------
+        stages : List[BuildStage]
+            Build stages in topological order (declaration order among independent build stages).
+        """
+        # 依存先は常に先に宣言されたステージのため，宣言順がそのままトポロジカル順になる
+        return list(self.__stages)
+
+    def contributing_stages(self, target: Union[str, int] = None) -> List[BuildStage]:
+        """
+        Return build stages that contribute to the target build stage, as BuildKit prunes unreachable stages.
+
+        Parameters
+        ----------
+        target : str or int or None
+            Build stage name or index (the last build stage if None).
+
+        Returns
+        -------
+        stages : List[BuildStage]
+            Build stages reachable from the target build stage (including itself) in topological order.
+        """
+        target_stage: BuildStage = self.stage(target)
+        reachable: Set[int] = {target_stage.index}
+        stack: List[int] = [target_stage.index]
+        while len(stack) > 0:
+            for dependency in self.__stages[stack.pop()].dependencies:
+                if dependency not in reachable:
+                    reachable.add(dependency)
+                    stack.append(dependency)
+        return [stage for stage in self.__stages if stage.index in reachable]
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(self.__stages))
+
+
+def _find_stage(
+        value: BashValueNode,
+        stage_indexes: Dict[str, int],
+        index: int,
+        allow_index: bool,
+        resolver: VariableResolver
+) -> int:
+    """
+    Find the index of an earlier build stage referred by a value (None if it refers a Docker image).
+    """
+    if isinstance(value, BashConstant):
+        reference: str = value.value
+    elif resolver is not None:
+        reference: str = resolver.resolve(value)
+    else:
+        return None
+    if allow_index and reference.isdigit():
+        return int(reference) if int(reference) < index else None
+    return stage_indexes.get(reference.lower())
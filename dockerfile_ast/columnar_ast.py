@@ -0,0 +1,424 @@
+from array import array
+from typing import Dict, Iterable, List, Set, Tuple
+
+import dockerfile
+
+from dockerfile_ast.dockerfile_ast import DockerfileAST
+from dockerfile_ast.dockerfile_items.utils import InstructionEnum, strip_heredoc_bodies
+
+
+class StringTable:
+    """
+    A table of strings shared by columnar Dockerfile ASTs, which refer to strings by their indexes.
+
+    Attributes
+    ----------
+    __strings : List[str]
+        Strings (index is the reference).
+    __indexes : Dict[str, int]
+        Indexes of the strings (string is the key).
+    """
+    __REPR_FORMAT: str = "{0}(size={1})"
+
+    def __init__(self):
+        self.__strings: List[str] = list()
+        self.__indexes: Dict[str, int] = dict()
+
+    def index(self, value: str) -> int:
+        """
+        Return the index of a string, adding it to this table if not exists.
+
+        Parameters
+        ----------
+        value : str
+            String.
+
+        Returns
+        -------
+        index : int
+            Index of the string.
+        """
+        index: int = self.__indexes.get(value)
+        if index is None:
+            index = len(self.__strings)
+            self.__strings.append(value)
+            self.__indexes[value] = index
+        return index
+
+    def find(self, value: str) -> int:
+        """
+        Return the index of a string without adding it to this table.
+
+        Parameters
+        ----------
+        value : str
+            String.
+
+        Returns
+        -------
+        index : int or None
+            Index of the string (None if not exists).
+        """
+        return self.__indexes.get(value)
+
+    def __getitem__(self, index: int) -> str:
+        return self.__strings[index]
+
+    def __len__(self):
+        return len(self.__strings)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(len(self.__strings)))
+
+
+class ColumnarDockerfileAST:
+    """
+    A compact (struct-of-arrays) representation of Dockerfile AST for bulk analytics over corpora.
+
+    Each Dockerfile Instruction in the source code is a row of typed columns backed by ``array.array``,
+    and strings (source code, arguments and flags) are referred by indexes of a ``StringTable``
+    shared by columnar ASTs of a corpus.
+    Arguments and flags of the i-th row are ``values[value_offsets[i]:value_offsets[i + 1]]``
+    and ``flags[flag_offsets[i]:flag_offsets[i + 1]]``.
+    Instruction types are codes of ``INSTRUCTION_TYPES`` (``NO_TYPE`` if not defined).
+
+    Attributes
+    ----------
+    __string_table : StringTable
+        String table referred by this AST.
+    __instruction_types : array
+        Instruction type of each row.
+    __sub_instruction_types : array
+        Instruction type nested in ONBUILD Instruction of each row (``NO_TYPE`` if not nested).
+    __line_nums : array
+        Line number of each row.
+    __source_offsets : array
+        Offset of the first character of each row in the source code.
+    __raw_codes : array
+        Index of the original source code of each row.
+    __value_offsets : array
+        Offset of the first argument of each row in ``__values`` (and the number of arguments at the end).
+    __values : array
+        Indexes of arguments of rows.
+    __flag_offsets : array
+        Offset of the first flag of each row in ``__flags`` (and the number of flags at the end).
+    __flags : array
+        Indexes of flags (e.g. `--from=builder`) of rows.
+    """
+    INSTRUCTION_TYPES: Tuple[InstructionEnum, ...] = tuple(InstructionEnum)
+    NO_TYPE: int = 255
+    __REPR_FORMAT: str = "{0}(rows={1}, string_table={2})"
+
+    def __init__(self, string_table: StringTable):
+        """
+        Parameters
+        ----------
+        string_table : StringTable
+            String table referred by this AST.
+        """
+        self.__string_table: StringTable = string_table
+        self.__instruction_types: array = array("B")
+        self.__sub_instruction_types: array = array("B")
+        self.__line_nums: array = array("I")
+        self.__source_offsets: array = array("I")
+        self.__raw_codes: array = array("I")
+        self.__value_offsets: array = array("I", [0])
+        self.__values: array = array("I")
+        self.__flag_offsets: array = array("I", [0])
+        self.__flags: array = array("I")
+
+    @property
+    def string_table(self) -> StringTable:
+        """
+        Returns
+        -------
+        __string_table : StringTable
+            String table referred by this AST.
+        """
+        return self.__string_table
+
+    @property
+    def instruction_types(self) -> array:
+        """
+        Returns
+        -------
+        __instruction_types : array
+            Instruction type of each row.
+        """
+        return self.__instruction_types
+
+    @property
+    def sub_instruction_types(self) -> array:
+        """
+        Returns
+        -------
+        __sub_instruction_types : array
+            Instruction type nested in ONBUILD Instruction of each row (``NO_TYPE`` if not nested).
+        """
+        return self.__sub_instruction_types
+
+    @property
+    def line_nums(self) -> array:
+        """
+        Returns
+        -------
+        __line_nums : array
+            Line number of each row.
+        """
+        return self.__line_nums
+
+    @property
+    def source_offsets(self) -> array:
+        """
+        Returns
+        -------
+        __source_offsets : array
+            Offset of the first character of each row in the source code.
+        """
+        return self.__source_offsets
+
+    @property
+    def raw_codes(self) -> array:
+        """
+        Returns
+        -------
+        __raw_codes : array
+            Index of the original source code of each row.
+        """
+        return self.__raw_codes
+
+    @property
+    def value_offsets(self) -> array:
+        """
+        Returns
+        -------
+        __value_offsets : array
+            Offset of the first argument of each row in ``values`` (and the number of arguments at the end).
+        """
+        return self.__value_offsets
+
+    @property
+    def values(self) -> array:
+        """
+        Returns
+        -------
+        __values : array
+            Indexes of arguments of rows.
+        """
+        return self.__values
+
+    @property
+    def flag_offsets(self) -> array:
+        """
+        Returns
+        -------
+        __flag_offsets : array
+            Offset of the first flag of each row in ``flags`` (and the number of flags at the end).
+        """
+        return self.__flag_offsets
+
+    @property
+    def flags(self) -> array:
+        """
+        Returns
+        -------
+        __flags : array
+            Indexes of flags (e.g. `--from=builder`) of rows.
+        """
+        return self.__flags
+
+    def instruction_type(self, row: int) -> InstructionEnum:
+        """
+        Return the instruction type of a row.
+
+        Parameters
+        ----------
+        row : int
+            Row index.
+
+        Returns
+        -------
+        instruction_enum : InstructionEnum or None
+            Enumerated Dockerfile Instruction (None if not defined).
+        """
+        code: int = self.__instruction_types[row]
+        return None if code == self.NO_TYPE else self.INSTRUCTION_TYPES[code]
+
+    def raw_code(self, row: int) -> str:
+        """
+        Return the original source code of a row.
+        """
+        return self.__string_table[self.__raw_codes[row]]
+
+    def row_values(self, row: int) -> List[str]:
+        """
+        Return the arguments of a row.
+        """
+        start, end = self.__value_offsets[row], self.__value_offsets[row + 1]
+        return [self.__string_table[index] for index in self.__values[start:end]]
+
+    def row_flags(self, row: int) -> List[str]:
+        """
+        Return the flags of a row.
+        """
+        start, end = self.__flag_offsets[row], self.__flag_offsets[row + 1]
+        return [self.__string_table[index] for index in self.__flags[start:end]]
+
+    def count(self, instruction_enum: InstructionEnum) -> int:
+        """
+        Count rows of a Dockerfile Instruction type.
+
+        Parameters
+        ----------
+        instruction_enum : InstructionEnum
+            Enumerated Dockerfile Instruction.
+
+        Returns
+        -------
+        count : int
+            Number of rows.
+        """
+        return self.__instruction_types.count(_INSTRUCTION_TYPE_CODES[instruction_enum])
+
+    def append(self, cst_instruction: dockerfile.Command, source_offset: int):
+        """
+        Append a row of a Dockerfile Instruction generated by ``dockerfile.parse_string``.
+
+        Parameters
+        ----------
+        cst_instruction : dockerfile.Command
+            Dockerfile Instruction of CST.
+        source_offset : int
+            Offset of the first character of the Dockerfile Instruction in the source code.
+        """
+        string_table: StringTable = self.__string_table
+        self.__instruction_types.append(_instruction_type_code(cst_instruction.cmd))
+        self.__sub_instruction_types.append(
+            self.NO_TYPE if cst_instruction.sub_cmd is None else _instruction_type_code(cst_instruction.sub_cmd)
+        )
+        self.__line_nums.append(cst_instruction.start_line)
+        self.__source_offsets.append(source_offset)
+        self.__raw_codes.append(string_table.index(cst_instruction.original))
+        self.__values.extend(string_table.index(value) for value in cst_instruction.value)
+        self.__value_offsets.append(len(self.__values))
+        self.__flags.extend(string_table.index(flag) for flag in cst_instruction.flags)
+        self.__flag_offsets.append(len(self.__flags))
+
+    def to_ast(self, parser) -> DockerfileAST:
+        """
+        Convert this columnar AST into the object-based Dockerfile AST.
+
+        The source code is reconstructed from the original source code of rows placed on their line numbers
+        (comments, blank lines and heredoc bodies are not restored, and continued lines are joined into one line).
+        Heredocs are closed by their delimiters right after their Instructions, leaving their bodies empty.
+
+        Parameters
+        ----------
+        parser : DockerfileParser
+            Parser of the reconstructed source code.
+
+        Returns
+        -------
+        dockerfile_ast : DockerfileAST
+            Object-based Dockerfile AST.
+        """
+        lines: List[str] = list()
+        for row in range(len(self)):
+            # 行番号を保つため，元の行の位置まで空行で埋める
+            lines.extend([""] * (self.__line_nums[row] - 1 - len(lines)))
+            raw_code: str = self.raw_code(row)
+            lines.append(raw_code)
+            # 本体を持たないヒアドキュメントを区切り文字で閉じ，後続の命令が本体とならないようにする
+            _, heredocs = strip_heredoc_bodies(raw_code)
+            lines.extend(heredoc.name for instruction_heredocs in heredocs.values() for heredoc in instruction_heredocs)
+        return parser.parse("\n".join(lines) + "\n")
+
+    @staticmethod
+    def from_cst(
+            cst_instructions: Iterable[dockerfile.Command],
+            raw_code: str,
+            string_table: StringTable
+    ) -> "ColumnarDockerfileAST":
+        """
+        Build a columnar AST from Dockerfile Instructions generated by ``dockerfile.parse_string``.
+
+        Parameters
+        ----------
+        cst_instructions : Iterable[dockerfile.Command]
+            Dockerfile Instructions of CST.
+        raw_code : str
+            Dockerfile source code.
+        string_table : StringTable
+            String table referred by the columnar AST.
+
+        Returns
+        -------
+        columnar_ast : ColumnarDockerfileAST
+            Columnar Dockerfile AST.
+        """
+        columnar_ast: ColumnarDockerfileAST = ColumnarDockerfileAST(string_table)
+        line_offsets: List[int] = _line_offsets(raw_code)
+        for cst_instruction in cst_instructions:
+            columnar_ast.append(cst_instruction, line_offsets[cst_instruction.start_line - 1])
+        return columnar_ast
+
+    @staticmethod
+    def from_ast(dockerfile_ast: DockerfileAST, string_table: StringTable) -> "ColumnarDockerfileAST":
+        """
+        Convert the object-based Dockerfile AST into a columnar AST.
+
+        Rows are built from the source code of the AST (without heredoc bodies),
+        one per source Dockerfile Instruction which the AST has nodes on its line.
+
+        Parameters
+        ----------
+        dockerfile_ast : DockerfileAST
+            Object-based Dockerfile AST.
+        string_table : StringTable
+            String table referred by the columnar AST.
+
+        Returns
+        -------
+        columnar_ast : ColumnarDockerfileAST
+            Columnar Dockerfile AST.
+        """
+        line_nums: Set[int] = {instruction.line_num for instruction in dockerfile_ast.instructions}
+        cst_code, _ = strip_heredoc_bodies(dockerfile_ast.raw_code)
+        cst_instructions = [
+            cst_instruction for cst_instruction in dockerfile.parse_string(cst_code)
+            if cst_instruction.start_line in line_nums
+        ]
+        return ColumnarDockerfileAST.from_cst(cst_instructions, dockerfile_ast.raw_code, string_table)
+
+    def __len__(self):
+        return len(self.__instruction_types)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(len(self)), repr(self.__string_table))
+
+
+def _instruction_type_code(instruction_name: str) -> int:
+    return _INSTRUCTION_TYPE_NAME_CODES.get(instruction_name.upper(), ColumnarDockerfileAST.NO_TYPE)
+
+
+def _line_offsets(raw_code: str) -> List[int]:
+    """
+    Return the offset of the first character of each line in source code.
+    """
+    offsets: List[int] = [0]
+    index: int = raw_code.find("\n")
+    while index >= 0:
+        offsets.append(index + 1)
+        index = raw_code.find("\n", index + 1)
+    return offsets
+
+
+# 命令の種類のコード（ColumnarDockerfileAST.INSTRUCTION_TYPESの添字）
+_INSTRUCTION_TYPE_CODES: Dict[InstructionEnum, int] = {
+    instruction_enum: code for code, instruction_enum in enumerate(ColumnarDockerfileAST.INSTRUCTION_TYPES)
+}
+_INSTRUCTION_TYPE_NAME_CODES: Dict[str, int] = {
+    instruction_enum.value: code for instruction_enum, code in _INSTRUCTION_TYPE_CODES.items()
+}
@@ -1,8 +1,84 @@
 import logging
-from typing import List
+import re
+from typing import Any, Dict, List, Tuple, Union
 
 import dockerfile_ast.utils
-from dockerfile_ast.dockerfile_items.instructions import Instruction
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashConstant, BashValueNode
+from dockerfile_ast.dockerfile_items.instructions import EXPOSEInstruction, FROMInstruction, Instruction
+from dockerfile_ast.dockerfile_items.nodes import DockerPortRange
+from dockerfile_ast.image_config import ImageConfig, evaluate_stage_configs
+from dockerfile_ast.memory_footprint import MemoryFootprint
+from dockerfile_ast.variable_resolver import VariableResolver
+
+
+class ParseDiagnostic:
+    """
+    A diagnostic of Dockerfile Instruction which could not be parsed in error-tolerant mode.
+
+    Attributes
+    ----------
+    __line_num : int
+        Line number of the Dockerfile Instruction.
+    __message : str
+        Error message.
+    __instruction : Instruction
+        Generic Dockerfile Instruction node substituted for the Dockerfile Instruction.
+    """
+    __REPR_FORMAT: str = "{0}(line_num={1}, message={2}, instruction={3})"
+
+    def __init__(self, line_num: int, message: str, instruction: Instruction):
+        """
+        Parameters
+        ----------
+        line_num : int
+            Line number of the Dockerfile Instruction.
+        message : str
+            Error message.
+        instruction : Instruction
+            Generic Dockerfile Instruction node substituted for the Dockerfile Instruction.
+        """
+        self.__line_num: int = line_num
+        self.__message: str = message
+        self.__instruction: Instruction = instruction
+
+    @property
+    def line_num(self) -> int:
+        """
+        Returns
+        -------
+        __line_num : int
+            Line number of the Dockerfile Instruction.
+        """
+        return self.__line_num
+
+    @property
+    def message(self) -> str:
+        """
+        Returns
+        -------
+        __message : str
+            Error message.
+        """
+        return self.__message
+
+    @property
+    def instruction(self) -> Instruction:
+        """
+        Returns
+        -------
+        __instruction : Instruction
+            Generic Dockerfile Instruction node substituted for the Dockerfile Instruction.
+        """
+        return self.__instruction
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(self.__line_num), repr(self.__message), repr(self.__instruction)
+        )
+
+    def __str__(self):
+        return "{0}: {1}".format(self.__line_num, self.__message)
 
 
 class DockerfileAST:
@@ -21,6 +97,10 @@ class DockerfileAST:
         List of Dockerfile Instructions
     __raw_code: str
         Original Dockerfile source code.
+    __diagnostics: List[ParseDiagnostic]
+        Diagnostics of Dockerfile Instructions which could not be parsed in error-tolerant mode.
+    __image_configs: Dict[Tuple[Tuple[str, str], ...], List[ImageConfig]]
+        Cached configs of Docker images built by build stages (sorted `--build-arg` values are the key).
 
     See Also
     --------
@@ -29,7 +109,7 @@ class DockerfileAST:
     """
     __REPR_FORMAT: str = "{0}(instructions={0}, raw_code={1})"
 
-    def __init__(self, instructions: List[Instruction], raw_code: str):
+    def __init__(self, instructions: List[Instruction], raw_code: str, diagnostics: List[ParseDiagnostic] = None):
         """
         An AST (Abstract Syntax Tree) of Dockerfile.
 
@@ -39,9 +119,13 @@ class DockerfileAST:
             List of Dockerfile Instructions.
         raw_code : str
             Original Dockerfile source code.
+        diagnostics : List[ParseDiagnostic] or None
+            Diagnostics of Dockerfile Instructions which could not be parsed in error-tolerant mode.
         """
         self.__instructions = instructions
         self.__raw_code = raw_code
+        self.__diagnostics = list() if diagnostics is None else diagnostics
+        self.__image_configs: Dict[Tuple[Tuple[str, str], ...], List[ImageConfig]] = dict()
 
     def __repr__(self):
         self_class_name = self.__class__.__name__
@@ -69,6 +153,127 @@ class DockerfileAST:
         """
         return self.__raw_code
 
+    @property
+    def diagnostics(self) -> List[ParseDiagnostic]:
+        """
+        Returns
+        -------
+        __diagnostics : List[ParseDiagnostic]
+            Diagnostics of Dockerfile Instructions which could not be parsed in error-tolerant mode.
+        """
+        return self.__diagnostics
+
+    def exposed_port_intervals(self, resolver: VariableResolver = None) -> List[Tuple[int, int, str]]:
+        """
+        Return intervals of ports exposed by EXPOSE Instructions, without expanding port ranges.
+
+        Parameters
+        ----------
+        resolver : VariableResolver or None
+            Resolver of ports referring variables (such ports are skipped if None).
+
+        Returns
+        -------
+        port_intervals : List[Tuple[int, int, str]]
+            First and last (inclusive) port numbers and the protocol (`tcp` if not declared) of each port (range),
+            in the order of declaration.
+        """
+        port_intervals: List[Tuple[int, int, str]] = list()
+        for instruction in self.__instructions:
+            if not isinstance(instruction, EXPOSEInstruction):
+                continue
+            for port in instruction.ports:
+                str_protocol: str = _resolve_port_value(port.protocol, resolver)
+                if port.protocol is not None and str_protocol is None:
+                    continue
+                if isinstance(port, DockerPortRange):
+                    start, end = port.start, port.end
+                else:
+                    str_port: str = _resolve_port_value(port.port_num, resolver)
+                    port_match = None if str_port is None else _PORT_INTERVAL_PATTERN.fullmatch(str_port)
+                    if port_match is None:
+                        # 変数を解決できないポート
+                        continue
+                    start = int(port_match.group(1))
+                    end = start if port_match.group(2) is None else int(port_match.group(2))
+                port_intervals.append((start, end, "tcp" if not str_protocol else str_protocol.lower()))
+        return port_intervals
+
+    def image_configs(self, build_args: Dict[str, str] = None) -> List[ImageConfig]:
+        """
+        Return configs of Docker images built by build stages, evaluated on first call for `build_args` and cached.
+
+        Docker images which build stages are built FROM, other than earlier build stages, have empty configs.
+        Use ``dockerfile_ast.ImageInheritanceGraph`` in order to inherit configs of Docker images built by
+        other Dockerfiles.
+
+        Parameters
+        ----------
+        build_args : Dict[str, str] or None
+            Values of `--build-arg` options (variable name is the key).
+
+        Returns
+        -------
+        image_configs : List[ImageConfig]
+            Configs of build stages in declaration order, which must not be modified.
+        """
+        key: Tuple[Tuple[str, str], ...] = () if build_args is None else tuple(sorted(build_args.items()))
+        image_configs: List[ImageConfig] = self.__image_configs.get(key)
+        if image_configs is None:
+            image_configs = evaluate_stage_configs(self.__instructions, build_args)
+            self.__image_configs[key] = image_configs
+        return image_configs
+
+    def image_config(self, target: Union[str, int] = None, build_args: Dict[str, str] = None) -> ImageConfig:
+        """
+        Return the config of Docker image built by a build stage (cached as ``image_configs``).
+
+        Parameters
+        ----------
+        target : str or int or None
+            Build stage name or index (the last build stage if None).
+        build_args : Dict[str, str] or None
+            Values of `--build-arg` options (variable name is the key).
+
+        Returns
+        -------
+        image_config : ImageConfig
+            Config of the build stage, which must not be modified.
+        """
+        image_configs: List[ImageConfig] = self.image_configs(build_args)
+        if len(image_configs) < 1:
+            raise ValueError("DockerfileAST: Dockerfile has no build stage.")
+        if target is None:
+            return image_configs[-1]
+        elif isinstance(target, int):
+            if target < 0 or len(image_configs) <= target:
+                raise ValueError("DockerfileAST: build stage {0} is not defined.".format(target))
+            return image_configs[target]
+        from_instructions: List[FROMInstruction] = [
+            instruction for instruction in self.__instructions if isinstance(instruction, FROMInstruction)
+        ]
+        # 同名のステージは後のものが優先
+        for index in reversed(range(len(from_instructions))):
+            as_name = from_instructions[index].image.as_name
+            if as_name is not None and str(as_name).lower() == target.lower():
+                return image_configs[index]
+        raise ValueError("DockerfileAST: build stage {0} is not defined.".format(target))
+
+    def memory_footprint(self) -> MemoryFootprint:
+        """
+        Return bytes of objects referred by this Dockerfile AST by class, counting shared objects once.
+
+        Use ``dockerfile_ast.corpus_memory_footprint`` for a corpus of Dockerfile ASTs sharing (interned) nodes.
+
+        Returns
+        -------
+        memory_footprint : MemoryFootprint
+            Bytes of this Dockerfile AST by class.
+        """
+        memory_footprint: MemoryFootprint = MemoryFootprint()
+        memory_footprint.add(self)
+        return memory_footprint
+
 
 class DockerfileASTVisitor:
     """
@@ -86,18 +291,49 @@ class DockerfileASTVisitor:
             Logger in order to log debug, warning or error messages.
         """
         self.__ast = ast
+        self.__info_enabled: bool = False
         if logger is None:
-            self.__logger = dockerfile_ast.utils.init_logger(logging.WARNING, None, logging.WARNING)
+            self.__logger = dockerfile_ast.utils.default_logger()
         else:
             self.__logger = logger
 
     def visit(self) -> bool:
+        # 出力されないログメッセージのために命令ノードを文字列化しない
+        self.__info_enabled = self.__logger.isEnabledFor(logging.INFO)
         for instruction in self.__ast.instructions:
             can_visit = self.__visit_instruction(instruction)
             if not can_visit:
                 return False
         return True
 
+    def result(self) -> Any:
+        """
+        Return the result of visiting Dockerfile AST, which is expected to be compact
+        (e.g. counts or names) so that it can be sent across processes.
+
+        Override this method in subclasses collecting results (``None`` by default).
+
+        Returns
+        -------
+        result : Any
+            Result of visiting Dockerfile AST.
+        """
+        return None
+
     def __visit_instruction(self, instruction: Instruction) -> bool:
-        self.__logger.info(repr(instruction))
+        if self.__info_enabled:
+            self.__logger.info("%r", instruction, extra={"line_num": instruction.line_num})
         return True
+
+
+def _resolve_port_value(node: BashValueNode, resolver: VariableResolver) -> str:
+    """
+    Return the value of a port number or protocol (None if `node` is None, or refers variables without `resolver`).
+    """
+    if resolver is not None:
+        return resolver.resolve(node)
+    return node.value if isinstance(node, BashConstant) else None
+
+
+# ポート番号またはポート範囲（例：`80`，`30000-32767`）
+_PORT_INTERVAL_PATTERN = re.compile(r"(\d+)(?:-(\d+))?")
@@ -0,0 +1,454 @@
+from enum import Enum
+from typing import Dict, List, Tuple, Union
+
+from dockerfile_ast.dockerfile_ast import DockerfileAST
+from dockerfile_ast.dockerfile_items.instructions import Instruction
+from dockerfile_ast.dockerfile_items.instructions import ADDInstruction
+from dockerfile_ast.dockerfile_items.instructions import ARGInstruction
+from dockerfile_ast.dockerfile_items.instructions import COPYInstruction
+from dockerfile_ast.dockerfile_items.instructions import ENVInstruction
+from dockerfile_ast.dockerfile_items.instructions import EXPOSEInstruction
+from dockerfile_ast.dockerfile_items.instructions import LABELInstruction
+from dockerfile_ast.dockerfile_items.instructions import RUNInstruction
+from dockerfile_ast.dockerfile_items.instructions import VOLUMEInstruction
+from dockerfile_ast.dockerfile_items.instructions import WORKDIRInstruction
+
+
+class EditType(Enum):
+    """
+    Enumerated kinds of edits between two Dockerfile ASTs.
+    """
+    ADDED = "ADDED"
+    REMOVED = "REMOVED"
+    MODIFIED = "MODIFIED"
+
+    def __str__(self):
+        return self.value
+
+
+class ValueEdit:
+    """
+    An edit of a value declared by a Dockerfile Instruction,
+    such as an ENV variable, an EXPOSE port or a COPY destination.
+
+    Attributes
+    ----------
+    __edit_type : EditType
+        Kind of this edit.
+    __kind : str
+        Kind of the edited value (e.g. "variable", "port", "destination").
+    __name : str
+        Name of the edited value, or its text if the value has no name.
+    __old_value : str or None
+        Value before this edit (None if added).
+    __new_value : str or None
+        Value after this edit (None if removed).
+    """
+    __REPR_FORMAT: str = "{0}(edit_type={1}, kind={2}, name={3}, old_value={4}, new_value={5})"
+
+    def __init__(self, edit_type: EditType, kind: str, name: str, old_value: str = None, new_value: str = None):
+        """
+        Parameters
+        ----------
+        edit_type : EditType
+            Kind of this edit.
+        kind : str
+            Kind of the edited value (e.g. "variable", "port", "destination").
+        name : str
+            Name of the edited value, or its text if the value has no name.
+        old_value : str or None
+            Value before this edit (None if added).
+        new_value : str or None
+            Value after this edit (None if removed).
+        """
+        self.__edit_type: EditType = edit_type
+        self.__kind: str = kind
+        self.__name: str = name
+        self.__old_value: str = old_value
+        self.__new_value: str = new_value
+
+    @property
+    def edit_type(self) -> EditType:
+        """
+        Returns
+        -------
+        __edit_type : EditType
+            Kind of this edit.
+        """
+        return self.__edit_type
+
+    @property
+    def kind(self) -> str:
+        """
+        Returns
+        -------
+        __kind : str
+            Kind of the edited value (e.g. "variable", "port", "destination").
+        """
+        return self.__kind
+
+    @property
+    def name(self) -> str:
+        """
+        Returns
+        -------
+        __name : str
+            Name of the edited value, or its text if the value has no name.
+        """
+        return self.__name
+
+    @property
+    def old_value(self) -> str:
+        """
+        Returns
+        -------
+        __old_value : str or None
+            Value before this edit (None if added).
+        """
+        return self.__old_value
+
+    @property
+    def new_value(self) -> str:
+        """
+        Returns
+        -------
+        __new_value : str or None
+            Value after this edit (None if removed).
+        """
+        return self.__new_value
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(self.__edit_type), repr(self.__kind), repr(self.__name),
+            repr(self.__old_value), repr(self.__new_value)
+        )
+
+
+class InstructionEdit:
+    """
+    An edit of a Dockerfile Instruction between two Dockerfile ASTs.
+
+    Attributes
+    ----------
+    __edit_type : EditType
+        Kind of this edit.
+    __old_instruction : Instruction or None
+        Instruction in the old Dockerfile AST (None if added).
+    __new_instruction : Instruction or None
+        Instruction in the new Dockerfile AST (None if removed).
+    __value_edits : List[ValueEdit]
+        Edits of values declared by the instruction.
+    """
+    __REPR_FORMAT: str = "{0}(edit_type={1}, old_instruction={2}, new_instruction={3}, value_edits={4})"
+
+    def __init__(
+            self,
+            edit_type: EditType,
+            old_instruction: Instruction = None,
+            new_instruction: Instruction = None,
+            value_edits: List[ValueEdit] = None
+    ):
+        """
+        Parameters
+        ----------
+        edit_type : EditType
+            Kind of this edit.
+        old_instruction : Instruction or None
+            Instruction in the old Dockerfile AST (None if added).
+        new_instruction : Instruction or None
+            Instruction in the new Dockerfile AST (None if removed).
+        value_edits : List[ValueEdit] or None
+            Edits of values declared by the instruction.
+        """
+        self.__edit_type: EditType = edit_type
+        self.__old_instruction: Instruction = old_instruction
+        self.__new_instruction: Instruction = new_instruction
+        self.__value_edits: List[ValueEdit] = list() if value_edits is None else value_edits
+
+    @property
+    def edit_type(self) -> EditType:
+        """
+        Returns
+        -------
+        __edit_type : EditType
+            Kind of this edit.
+        """
+        return self.__edit_type
+
+    @property
+    def old_instruction(self) -> Instruction:
+        """
+        Returns
+        -------
+        __old_instruction : Instruction or None
+            Instruction in the old Dockerfile AST (None if added).
+        """
+        return self.__old_instruction
+
+    @property
+    def new_instruction(self) -> Instruction:
+        """
+        Returns
+        -------
+        __new_instruction : Instruction or None
+            Instruction in the new Dockerfile AST (None if removed).
+        """
+        return self.__new_instruction
+
+    @property
+    def value_edits(self) -> List[ValueEdit]:
+        """
+        Returns
+        -------
+        __value_edits : List[ValueEdit]
+            Edits of values declared by the instruction.
+        """
+        return self.__value_edits
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(self.__edit_type), repr(self.__old_instruction),
+            repr(self.__new_instruction), repr(self.__value_edits)
+        )
+
+
+def diff(old_ast: DockerfileAST, new_ast: DockerfileAST) -> List[InstructionEdit]:
+    """
+    Compute instruction-level and value-level edits between two Dockerfile ASTs.
+
+    Instructions are compared by hash keys of their type and source code (and bodies of their heredocs),
+    and matched by Myers' O(ND) difference algorithm.
+    Unmatched instructions of the same type between two matched ones are reported as modified,
+    together with edits of their values.
+    No instruction is re-parsed.
+
+    Parameters
+    ----------
+    old_ast : DockerfileAST
+        Dockerfile AST of the old version.
+    new_ast : DockerfileAST
+        Dockerfile AST of the new version.
+
+    Returns
+    -------
+    edits : List[InstructionEdit]
+        Edits in the order of the new Dockerfile AST.
+    """
+    old_instructions: List[Instruction] = old_ast.instructions
+    new_instructions: List[Instruction] = new_ast.instructions
+
+    # 命令の種類とソースコードを整数キーへ変換（比較を整数比較にする）
+    key_ids: Dict[Tuple, int] = dict()
+    old_keys: List[int] = [key_ids.setdefault(_instruction_key(i), len(key_ids)) for i in old_instructions]
+    new_keys: List[int] = [key_ids.setdefault(_instruction_key(i), len(key_ids)) for i in new_instructions]
+
+    # 共通の先頭・末尾は差分計算から除外
+    head: int = 0
+    max_head: int = min(len(old_keys), len(new_keys))
+    while head < max_head and old_keys[head] == new_keys[head]:
+        head += 1
+    tail: int = 0
+    max_tail: int = max_head - head
+    while tail < max_tail and old_keys[-1 - tail] == new_keys[-1 - tail]:
+        tail += 1
+
+    matches: List[Tuple[int, int]] = [
+        (i + head, j + head) for i, j in _myers_matches(
+            old_keys[head:len(old_keys) - tail], new_keys[head:len(new_keys) - tail]
+        )
+    ]
+    matches.append((len(old_keys) - tail, len(new_keys) - tail))
+
+    edits: List[InstructionEdit] = list()
+    old_index: int = head
+    new_index: int = head
+    for matched_old_index, matched_new_index in matches:
+        edits.extend(_diff_unmatched_instructions(
+            old_instructions[old_index:matched_old_index], new_instructions[new_index:matched_new_index]
+        ))
+        old_index = matched_old_index + 1
+        new_index = matched_new_index + 1
+    return edits
+
+
+def _myers_matches(old_keys: List[int], new_keys: List[int]) -> List[Tuple[int, int]]:
+    """
+    Find index pairs of a longest common subsequence by Myers' O(ND) difference algorithm.
+    """
+    n: int = len(old_keys)
+    m: int = len(new_keys)
+    if n == 0 or m == 0:
+        return list()
+    furthest: Dict[int, int] = {1: 0}
+    trace: List[Dict[int, int]] = list()
+    for d in range(n + m + 1):
+        trace.append(furthest.copy())
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and furthest[k - 1] < furthest[k + 1]):
+                x = furthest[k + 1]
+            else:
+                x = furthest[k - 1] + 1
+            y = x - k
+            while x < n and y < m and old_keys[x] == new_keys[y]:
+                x += 1
+                y += 1
+            furthest[k] = x
+            if x >= n and y >= m:
+                return _backtrack_myers_trace(trace, n, m)
+    return list()
+
+
+def _backtrack_myers_trace(trace: List[Dict[int, int]], n: int, m: int) -> List[Tuple[int, int]]:
+    matches: List[Tuple[int, int]] = list()
+    x: int = n
+    y: int = m
+    for d in range(len(trace) - 1, 0, -1):
+        furthest = trace[d]
+        k = x - y
+        if k == -d or (k != d and furthest[k - 1] < furthest[k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = furthest[prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            matches.append((x, y))
+        x, y = prev_x, prev_y
+    while x > 0 and y > 0:
+        x -= 1
+        y -= 1
+        matches.append((x, y))
+    matches.reverse()
+    return matches
+
+
+def _diff_unmatched_instructions(
+        old_instructions: List[Instruction],
+        new_instructions: List[Instruction]
+) -> List[InstructionEdit]:
+    edits: List[InstructionEdit] = list()
+    old_index: int = 0
+    for new_instruction in new_instructions:
+        # 同種の削除命令があれば変更として対応付ける
+        paired_index: int = old_index
+        while paired_index < len(old_instructions) \
+                and type(old_instructions[paired_index]) is not type(new_instruction):
+            paired_index += 1
+        if paired_index < len(old_instructions):
+            for old_instruction in old_instructions[old_index:paired_index]:
+                edits.append(InstructionEdit(EditType.REMOVED, old_instruction=old_instruction))
+            old_instruction = old_instructions[paired_index]
+            edits.append(InstructionEdit(
+                EditType.MODIFIED, old_instruction, new_instruction, _diff_values(old_instruction, new_instruction)
+            ))
+            old_index = paired_index + 1
+        else:
+            edits.append(InstructionEdit(EditType.ADDED, new_instruction=new_instruction))
+    for old_instruction in old_instructions[old_index:]:
+        edits.append(InstructionEdit(EditType.REMOVED, old_instruction=old_instruction))
+    return edits
+
+
+def _diff_values(old_instruction: Instruction, new_instruction: Instruction) -> List[ValueEdit]:
+    if isinstance(old_instruction, ENVInstruction):
+        return _diff_named_values(
+            "variable",
+            [(str(v.name), str(v.value)) for v in old_instruction.variables],
+            [(str(v.name), str(v.value)) for v in new_instruction.variables]
+        )
+    elif isinstance(old_instruction, ARGInstruction):
+        old_variable = old_instruction.variable
+        new_variable = new_instruction.variable
+        return _diff_named_values(
+            "variable",
+            [(old_variable.name, None if old_variable.value is None else str(old_variable.value))],
+            [(new_variable.name, None if new_variable.value is None else str(new_variable.value))]
+        )
+    elif isinstance(old_instruction, LABELInstruction):
+        return _diff_named_values(
+            "label",
+            [(label.name, str(label.value)) for label in old_instruction.labels],
+            [(label.name, str(label.value)) for label in new_instruction.labels]
+        )
+    elif isinstance(old_instruction, EXPOSEInstruction):
+        return _diff_unnamed_values(
+            "port", [str(port) for port in old_instruction.ports], [str(port) for port in new_instruction.ports]
+        )
+    elif isinstance(old_instruction, VOLUMEInstruction):
+        return _diff_unnamed_values(
+            "volume",
+            [str(volume) for volume in old_instruction.volumes],
+            [str(volume) for volume in new_instruction.volumes]
+        )
+    elif isinstance(old_instruction, (COPYInstruction, ADDInstruction)):
+        return _diff_unnamed_values(
+            "source",
+            [str(source) for source in old_instruction.sources],
+            [str(source) for source in new_instruction.sources]
+        ) + _diff_unnamed_values(
+            "destination",
+            [str(destination) for destination in [old_instruction.destination] if destination is not None],
+            [str(destination) for destination in [new_instruction.destination] if destination is not None]
+        ) + _diff_heredocs(old_instruction, new_instruction)
+    elif isinstance(old_instruction, RUNInstruction):
+        return _diff_heredocs(old_instruction, new_instruction)
+    elif isinstance(old_instruction, WORKDIRInstruction):
+        return _diff_unnamed_values("work_dir", [str(old_instruction.work_dir)], [str(new_instruction.work_dir)])
+    else:
+        return list()
+
+
+def _instruction_key(instruction: Instruction) -> Tuple:
+    heredocs = getattr(instruction, "heredocs", ())
+    if len(heredocs) < 1:
+        return (type(instruction), instruction.raw_code)
+    # ヒアドキュメントの本体は命令のソースコードに含まれないため，キーに加える
+    return (type(instruction), instruction.raw_code) + tuple(heredoc.body for heredoc in heredocs)
+
+
+def _diff_heredocs(
+        old_instruction: Union[RUNInstruction, COPYInstruction, ADDInstruction],
+        new_instruction: Union[RUNInstruction, COPYInstruction, ADDInstruction]
+) -> List[ValueEdit]:
+    return _diff_named_values(
+        "heredoc",
+        [(heredoc.name, heredoc.body) for heredoc in old_instruction.heredocs],
+        [(heredoc.name, heredoc.body) for heredoc in new_instruction.heredocs]
+    )
+
+
+def _diff_named_values(
+        kind: str,
+        old_values: List[Tuple[str, str]],
+        new_values: List[Tuple[str, str]]
+) -> List[ValueEdit]:
+    # 同名の値は後勝ち（Dockerfileの上書きと同じ）
+    old_value_dict: Dict[str, str] = dict(old_values)
+    new_value_dict: Dict[str, str] = dict(new_values)
+    edits: List[ValueEdit] = list()
+    for name, old_value in old_value_dict.items():
+        if name not in new_value_dict:
+            edits.append(ValueEdit(EditType.REMOVED, kind, name, old_value=old_value))
+        elif new_value_dict[name] != old_value:
+            edits.append(ValueEdit(EditType.MODIFIED, kind, name, old_value, new_value_dict[name]))
+    for name, new_value in new_value_dict.items():
+        if name not in old_value_dict:
+            edits.append(ValueEdit(EditType.ADDED, kind, name, new_value=new_value))
+    return edits
+
+
+def _diff_unnamed_values(kind: str, old_values: List[str], new_values: List[str]) -> List[ValueEdit]:
+    old_value_set = set(old_values)
+    new_value_set = set(new_values)
+    edits: List[ValueEdit] = list()
+    for old_value in old_values:
+        if old_value not in new_value_set:
+            edits.append(ValueEdit(EditType.REMOVED, kind, old_value, old_value=old_value))
+    for new_value in new_values:
+        if new_value not in old_value_set:
+            edits.append(ValueEdit(EditType.ADDED, kind, new_value, new_value=new_value))
+    return edits
@@ -1,7 +1,10 @@
 from abc import ABCMeta
-from typing import List
+from typing import List, Tuple, Union
 
 from dockerfile_ast.utils import DockerfileASTNode
+from dockerfile_ast.utils import LazyValue
+from dockerfile_ast.utils import as_tuple
+from dockerfile_ast.utils import materialize
 
 
 class BashNode(DockerfileASTNode, metaclass=ABCMeta):
@@ -47,6 +50,10 @@ class BashConstant(BashValueNode):
         """
         return self.__value
 
+    # override
+    def _key(self):
+        return (self.__value,)
+
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
@@ -101,18 +108,9 @@ class BashVariable(BashValueNode):
         """
         return self.__REFERRED_NAME_FORMAT.format(self.__name)
 
-    def __hash__(self):
-        return hash(self.name)
-
-    def __eq__(self, other):
-        if self is other:
-            return True
-        elif other is None:
-            return False
-        elif not isinstance(other, BashVariable):
-            return False
-        else:
-            return self.__name == other.__name
+    # override
+    def _key(self):
+        return (self.__name,)
 
     # override
     def __repr__(self):
@@ -143,11 +141,11 @@ class BuildTimeVariable(BashVariable):
         ----------
         name : str
             Name of this build-time variable.
-        value : BashValueNode
+        value : BashValueNode or LazyValue
             Value of this build-time variable.
         """
         super(BuildTimeVariable, self).__init__(name)
-        self.__value: BashValueNode = value
+        self.__value: Union[BashValueNode, LazyValue] = value
 
     @property
     def value(self) -> BashValueNode:
@@ -157,32 +155,25 @@ class BuildTimeVariable(BashVariable):
         __value : BashValueNode
             Value of this build-time variable.
         """
-        return self.__value
+        return materialize(self.__value)
 
     # override
-    def __eq__(self, other):
-        if self is other:
-            return True
-        elif other is None:
-            return False
-        elif not isinstance(other, BuildTimeVariable):
-            return False
-        else:
-            return self.__name == other.__name
+    def _key(self):
+        return (self.name, self.value)
 
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
         repr_name = repr(self.name)
-        repr_value = repr(self.__value)
+        repr_value = repr(self.value)
         return self.__REPR_FORMAT.format(self_class_name, repr_name, repr_value)
 
     # override
     def __str__(self):
-        if self.__value is None:
+        if self.value is None:
             return super(BuildTimeVariable, self).__str__()
         else:
-            return "=".join([self.name, str(self.__value)])
+            return "=".join([self.name, str(self.value)])
 
 
 class EnvironmentVariable(BashVariable):
@@ -202,11 +193,11 @@ class EnvironmentVariable(BashVariable):
         ----------
         name : str
             Name of this environment variable.
-        value : BashValueNode
+        value : BashValueNode or LazyValue
             Value of this environment variable.
         """
         super(EnvironmentVariable, self).__init__(name)
-        self.__value: BashValueNode = value
+        self.__value: Union[BashValueNode, LazyValue] = value
 
     @property
     def value(self) -> BashValueNode:
@@ -216,29 +207,31 @@ class EnvironmentVariable(BashVariable):
         __value : BashValueNode
             Value of this environment variable.
         """
-        return self.__value
+        return materialize(self.__value)
 
     # override
-    def __eq__(self, other):
-        if self is other:
-            return True
-        elif other is None:
-            return False
-        elif not isinstance(other, BuildTimeVariable):
-            return False
-        else:
-            return self.__name == other.__name
+    def _key(self):
+        return (self.name, self.value)
 
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
         repr_name = repr(self.name)
-        repr_value = repr(self.__value)
+        repr_value = repr(self.value)
         return self.__REPR_FORMAT.format(self_class_name, repr_name, repr_value)
 
     # override
     def __str__(self):
-        return "=".join([self.name, str(self.__value)])
+        return "=".join([self.name, str(self.value)])
+
+
+class PredefinedEnvironmentVariable(EnvironmentVariable):
+    """
+    A node of environment variable Docker images have by default (e.g. `PATH`), which is not declared in Dockerfile.
+
+    Its value is the default of Docker images,
+    which is overridden by the environment variable of the same name inherited from the base image (if any).
+    """
 
 
 class BashConcat(BashValueNode):
@@ -247,7 +240,7 @@ class BashConcat(BashValueNode):
 
     Attributes
     ----------
-    __values : List[BashValueNode]
+    __values : Tuple[BashValueNode, ...]
         Nodes of Bash variables and Bash constants.
     """
     __REPR_FORMAT: str = "{0}(values={1})"
@@ -260,18 +253,22 @@ class BashConcat(BashValueNode):
             Nodes of Bash variables and Bash constants.
         """
         super(BashConcat, self).__init__()
-        self.__values = values
+        self.__values: Tuple[BashValueNode, ...] = as_tuple(values)
 
     @property
-    def values(self) -> List[BashValueNode]:
+    def values(self) -> Tuple[BashValueNode, ...]:
         """
         Returns
         -------
-        __values : List[BashValueNode]
+        __values : Tuple[BashValueNode, ...]
             Nodes of Bash variables and Bash constants.
         """
         return self.__values
 
+    # override
+    def _key(self):
+        return self.__values
+
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
@@ -286,9 +283,364 @@ class BashConcat(BashValueNode):
                 retval += value.referenced_name()
             elif isinstance(value, BashConstant):
                 retval += value.value
+            elif isinstance(value, BashParameterExpansion):
+                retval += str(value)
         return retval
 
-# TODO: Bashコマンド，Bashオプション，ユーザ名（ID），グループ名（ID）
+
+class BashParameterExpansion(BashValueNode):
+    """
+    A node of Bash parameter expansion with an alternative word,
+    such as `${variable:-word}` or `${variable:+word}`.
+
+    Attributes
+    ----------
+    __variable : BashVariable
+        Variable to be expanded.
+    __operator : str
+        Operator of this parameter expansion (":-" or ":+").
+    __word : BashValueNode
+        Default word (":-") or alternative word (":+").
+    """
+    DEFAULT_OPERATOR = ":-"
+    ALTERNATIVE_OPERATOR = ":+"
+    __REPR_FORMAT: str = "{0}(variable={1}, operator={2}, word={3})"
+    __REFERRED_FORMAT: str = "${{{0}{1}{2}}}"
+
+    def __init__(self, variable: BashVariable, operator: str, word: BashValueNode):
+        """
+        Parameters
+        ----------
+        variable : BashVariable
+            Variable to be expanded.
+        operator : str
+            Operator of this parameter expansion (":-" or ":+").
+        word : BashValueNode
+            Default word (":-") or alternative word (":+").
+        """
+        super(BashParameterExpansion, self).__init__()
+        if operator not in (self.DEFAULT_OPERATOR, self.ALTERNATIVE_OPERATOR):
+            raise ValueError("BashParameterExpansion: {0} operator is not supported.".format(operator))
+        self.__variable: BashVariable = variable
+        self.__operator: str = operator
+        self.__word: BashValueNode = word
+
+    @property
+    def variable(self) -> BashVariable:
+        """
+        Returns
+        -------
+        __variable : BashVariable
+            Variable to be expanded.
+        """
+        return self.__variable
+
+    @property
+    def operator(self) -> str:
+        """
+        Returns
+        -------
+        __operator : str
+            Operator of this parameter expansion (":-" or ":+").
+        """
+        return self.__operator
+
+    @property
+    def word(self) -> BashValueNode:
+        """
+        Returns
+        -------
+        __word : BashValueNode
+            Default word (":-") or alternative word (":+").
+        """
+        return self.__word
+
+    # override
+    def _key(self):
+        return (self.__variable, self.__operator, self.__word)
+
+    # override
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        repr_variable = repr(self.__variable)
+        repr_operator = repr(self.__operator)
+        repr_word = repr(self.__word)
+        return self.__REPR_FORMAT.format(self_class_name, repr_variable, repr_operator, repr_word)
+
+    # override
+    def __str__(self):
+        if isinstance(self.__word, BashVariable):
+            str_word = self.__word.referenced_name()
+        else:
+            str_word = str(self.__word)
+        return self.__REFERRED_FORMAT.format(self.__variable.name, self.__operator, str_word)
+
+
+class BashCommand(BashNode):
+    """
+    A node of Bash simple command such as `apt-get install -y curl > /dev/null`.
+
+    Variables in words are not bound to ARG/ENV Instructions (i.e. plain ``BashVariable``)
+    because the shell expands them when the command runs.
+
+    Attributes
+    ----------
+    __words : Tuple[BashValueNode, ...]
+        Command name, arguments and variable assignments of this command.
+    __redirects : Tuple[str, ...]
+        Redirections of this command such as `> /dev/null` or `2>&1`.
+    __raw_code : str
+        Source code of this command.
+    """
+    __REPR_FORMAT: str = "{0}(words={1}, redirects={2})"
+
+    def __init__(self, words: List[BashValueNode], redirects: List[str], raw_code: str):
+        """
+        Parameters
+        ----------
+        words : List[BashValueNode]
+            Command name, arguments and variable assignments of this command.
+        redirects : List[str]
+            Redirections of this command such as `> /dev/null` or `2>&1`.
+        raw_code : str
+            Source code of this command.
+        """
+        super(BashCommand, self).__init__()
+        self.__words: Tuple[BashValueNode, ...] = as_tuple(words)
+        self.__redirects: Tuple[str, ...] = as_tuple(redirects)
+        self.__raw_code: str = raw_code
+
+    @property
+    def words(self) -> Tuple[BashValueNode, ...]:
+        """
+        Returns
+        -------
+        __words : Tuple[BashValueNode, ...]
+            Command name, arguments and variable assignments of this command.
+        """
+        return self.__words
+
+    @property
+    def redirects(self) -> Tuple[str, ...]:
+        """
+        Returns
+        -------
+        __redirects : Tuple[str, ...]
+            Redirections of this command such as `> /dev/null` or `2>&1`.
+        """
+        return self.__redirects
+
+    @property
+    def raw_code(self) -> str:
+        """
+        Returns
+        -------
+        __raw_code : str
+            Source code of this command.
+        """
+        return self.__raw_code
+
+    # override
+    def _key(self):
+        return (self.__words, self.__redirects, self.__raw_code)
+
+    # override
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        repr_words = repr(self.__words)
+        repr_redirects = repr(self.__redirects)
+        return self.__REPR_FORMAT.format(self_class_name, repr_words, repr_redirects)
+
+    # override
+    def __str__(self):
+        return self.__raw_code
+
+
+class BashCompoundCommand(BashNode):
+    """
+    A node of Bash compound command (e.g. `if`, `for`, `while`, `( ... )` and `{ ...; }`) or function definition,
+    which is kept as source code.
+
+    Attributes
+    ----------
+    __raw_code : str
+        Source code of this compound command.
+    """
+    __REPR_FORMAT: str = "{0}(raw_code={1})"
+
+    def __init__(self, raw_code: str):
+        """
+        Parameters
+        ----------
+        raw_code : str
+            Source code of this compound command.
+        """
+        super(BashCompoundCommand, self).__init__()
+        self.__raw_code: str = raw_code
+
+    @property
+    def raw_code(self) -> str:
+        """
+        Returns
+        -------
+        __raw_code : str
+            Source code of this compound command.
+        """
+        return self.__raw_code
+
+    # override
+    def _key(self):
+        return (self.__raw_code,)
+
+    # override
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(self.__raw_code))
+
+    # override
+    def __str__(self):
+        return self.__raw_code
+
+
+class BashPipeline(BashNode):
+    """
+    A node of Bash pipeline such as `curl -sL URL | tar xz`.
+
+    Attributes
+    ----------
+    __commands : Tuple[BashNode, ...]
+        Commands connected by pipes.
+    __raw_code : str
+        Source code of this pipeline.
+    """
+    __REPR_FORMAT: str = "{0}(commands={1})"
+
+    def __init__(self, commands: List[BashNode], raw_code: str):
+        """
+        Parameters
+        ----------
+        commands : List[BashNode]
+            Commands connected by pipes.
+        raw_code : str
+            Source code of this pipeline.
+        """
+        super(BashPipeline, self).__init__()
+        self.__commands: Tuple[BashNode, ...] = as_tuple(commands)
+        self.__raw_code: str = raw_code
+
+    @property
+    def commands(self) -> Tuple[BashNode, ...]:
+        """
+        Returns
+        -------
+        __commands : Tuple[BashNode, ...]
+            Commands connected by pipes.
+        """
+        return self.__commands
+
+    @property
+    def raw_code(self) -> str:
+        """
+        Returns
+        -------
+        __raw_code : str
+            Source code of this pipeline.
+        """
+        return self.__raw_code
+
+    # override
+    def _key(self):
+        return (self.__commands, self.__raw_code)
+
+    # override
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(self.__commands))
+
+    # override
+    def __str__(self):
+        return self.__raw_code
+
+
+class BashCommandList(BashNode):
+    """
+    A node of Bash command list, which is commands or pipelines separated by `&&`, `||`, `;` or `&`.
+
+    Attributes
+    ----------
+    __commands : Tuple[BashNode, ...]
+        Commands, pipelines or compound commands in this list.
+    __operators : Tuple[str, ...]
+        Operator following each command (None if not followed by an operator).
+        Commands on separate lines are regarded as separated by `;`.
+    __raw_code : str
+        Source code of this command list.
+    """
+    __REPR_FORMAT: str = "{0}(commands={1}, operators={2})"
+
+    def __init__(self, commands: List[BashNode], operators: List[str], raw_code: str):
+        """
+        Parameters
+        ----------
+        commands : List[BashNode]
+            Commands, pipelines or compound commands in this list.
+        operators : List[str]
+            Operator following each command (None if not followed by an operator).
+        raw_code : str
+            Source code of this command list.
+        """
+        super(BashCommandList, self).__init__()
+        self.__commands: Tuple[BashNode, ...] = as_tuple(commands)
+        self.__operators: Tuple[str, ...] = as_tuple(operators)
+        self.__raw_code: str = raw_code
+
+    @property
+    def commands(self) -> Tuple[BashNode, ...]:
+        """
+        Returns
+        -------
+        __commands : Tuple[BashNode, ...]
+            Commands, pipelines or compound commands in this list.
+        """
+        return self.__commands
+
+    @property
+    def operators(self) -> Tuple[str, ...]:
+        """
+        Returns
+        -------
+        __operators : Tuple[str, ...]
+            Operator following each command (None if not followed by an operator).
+        """
+        return self.__operators
+
+    @property
+    def raw_code(self) -> str:
+        """
+        Returns
+        -------
+        __raw_code : str
+            Source code of this command list.
+        """
+        return self.__raw_code
+
+    # override
+    def _key(self):
+        return (self.__commands, self.__operators, self.__raw_code)
+
+    # override
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        repr_commands = repr(self.__commands)
+        repr_operators = repr(self.__operators)
+        return self.__REPR_FORMAT.format(self_class_name, repr_commands, repr_operators)
+
+    # override
+    def __str__(self):
+        return self.__raw_code
+
+
+# TODO: Bashオプション，ユーザ名（ID），グループ名（ID）
 
 
 class Filepath(BashNode):
@@ -322,6 +674,10 @@ class Filepath(BashNode):
         """
         return self.__value
 
+    # override
+    def _key(self):
+        return (self.__value,)
+
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
@@ -364,6 +720,10 @@ class SystemCallSignal(BashNode):
         """
         return self.__value
 
+    # override
+    def _key(self):
+        return (self.__value,)
+
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
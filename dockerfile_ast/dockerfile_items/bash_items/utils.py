@@ -2,13 +2,16 @@ from typing import Dict
 
 from dockerfile_ast.dockerfile_items.bash_items.nodes import BashConstant
 from dockerfile_ast.dockerfile_items.bash_items.nodes import EnvironmentVariable
+from dockerfile_ast.dockerfile_items.bash_items.nodes import PredefinedEnvironmentVariable
 
 
 _DEFAULT_ENVIRONMENT_VARIABLES: Dict[str, EnvironmentVariable] = {
-    "HOME": EnvironmentVariable("HOME", BashConstant("~")),
-    "PATH": EnvironmentVariable("PATH", BashConstant("/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin")),
-    "SHLVL": EnvironmentVariable("SHLVL", BashConstant("1")),
-    "TERM": EnvironmentVariable("TERM", BashConstant("XTERM"))
+    "HOME": PredefinedEnvironmentVariable("HOME", BashConstant("~")),
+    "PATH": PredefinedEnvironmentVariable(
+        "PATH", BashConstant("/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin")
+    ),
+    "SHLVL": PredefinedEnvironmentVariable("SHLVL", BashConstant("1")),
+    "TERM": PredefinedEnvironmentVariable("TERM", BashConstant("XTERM"))
 }
 
 
@@ -1,20 +1,34 @@
 from abc import ABCMeta
-from typing import List
+import functools
+import re
+from typing import List, Tuple, Union
 
+from dockerfile_ast.bash_parser import BashParser
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashCommandList
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashValueNode
 from dockerfile_ast.dockerfile_items.bash_items.nodes import BuildTimeVariable
 from dockerfile_ast.dockerfile_items.bash_items.nodes import EnvironmentVariable
 from dockerfile_ast.dockerfile_items.bash_items.nodes import Filepath
 from dockerfile_ast.dockerfile_items.bash_items.nodes import SystemCallSignal
 from dockerfile_ast.dockerfile_items.nodes import DockerfileSyntaxNode
+from dockerfile_ast.dockerfile_items.nodes import DockerImage
 from dockerfile_ast.dockerfile_items.nodes import DockerLabel
 from dockerfile_ast.dockerfile_items.nodes import DockerPort
+from dockerfile_ast.dockerfile_items.nodes import DockerPortRange
+from dockerfile_ast.dockerfile_items.nodes import Heredoc
 from dockerfile_ast.dockerfile_items.utils import InstructionEnum
+from dockerfile_ast.utils import LazyValue
+from dockerfile_ast.utils import as_tuple
+from dockerfile_ast.utils import materialize
 
 
 class Instruction(DockerfileSyntaxNode, metaclass=ABCMeta):
     """
     A node of Dockerfile Instruction.
 
+    Line number and raw code are always available, while bodies of Dockerfile Instructions
+    (labels, ports, filepaths, values of variables, ...) are built on first access if parsed in lazy mode.
+
     Attributes
     ----------
     __line_num : int
@@ -57,8 +71,9 @@ class Instruction(DockerfileSyntaxNode, metaclass=ABCMeta):
         """
         return self.__raw_code
 
-    def __hash__(self):
-        return hash(self.__line_num) + hash(self.__raw_code)
+    # override
+    def _key(self):
+        return (self.__line_num, self.__raw_code)
 
     # override
     def __repr__(self):
@@ -72,38 +87,248 @@ class Instruction(DockerfileSyntaxNode, metaclass=ABCMeta):
 
 
 class FROMInstruction(Instruction):
-    # TODO: Need to implement
-    def __init__(self, line_num: int, raw_code: str):
+    """
+    A node of FROM Instruction.
+
+    Attributes
+    ----------
+    __image : DockerImage
+        Docker image (and build stage name) declared by this FROM Instruction.
+    """
+    __REPR_FORMAT: str = "{0}(image={1}, line_num={2}, raw_code={3})"
+
+    def __init__(self, image: DockerImage, line_num: int, raw_code: str):
+        """
+        Parameters
+        ----------
+        image : DockerImage
+            Docker image (and build stage name) declared by this FROM Instruction.
+        line_num : int
+            Line number of this FROM Instruction.
+        raw_code : str
+            Original Dockerfile source code.
+        """
         super(FROMInstruction, self).__init__(line_num, raw_code)
+        self.__image: DockerImage = image
 
+    @property
+    def image(self) -> DockerImage:
+        """
+        Returns
+        -------
+        __image : DockerImage
+            Docker image (and build stage name) declared by this FROM Instruction.
+        """
+        return materialize(self.__image)
+
+    # override
+    def _key(self):
+        return super(FROMInstruction, self)._key() + (self.image,)
+
+    # override
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        repr_image = repr(self.image)
+        repr_line_num = repr(self.line_num)
+        repr_raw_code = repr(self.raw_code)
+        return self.__REPR_FORMAT.format(self_class_name, repr_image, repr_line_num, repr_raw_code)
+
+    # override
+    def __str__(self):
+        return " ".join([str(InstructionEnum.FROM), str(self.image)])
+
+
+class ShellCommandInstruction(Instruction, metaclass=ABCMeta):
     """
-    FROM [--platform=<platform>] <image> [AS <name>]
-    FROM [--platform=<platform>] <image>[:<tag>] [AS <name>]
-    FROM [--platform=<platform>] <image>[@<digest>] [AS <name>]
+    A node of Dockerfile Instruction running commands (RUN, CMD or ENTRYPOINT Instruction).
+
+    The shell script of shell form is parsed into a Bash command list on first access of ``bash_script``.
+    If the Instruction has heredocs, the shell script is parsed together with their bodies,
+    or only the body is parsed if the shell script consists only of a heredoc (e.g. `RUN <<EOF`).
+
+    ``argv`` is the command line Docker runs: the JSON array of exec form as it is,
+    or the shell given by SHELL Instruction (`["/bin/sh", "-c"]` by default) followed by the shell script of shell form.
+
+    Attributes
+    ----------
+    __script : str
+        Shell script of shell form (None if exec form or not subject to parse).
+    __heredocs : Tuple[Heredoc, ...]
+        Heredocs following this Instruction (empty if none).
+    __argv : Tuple[BashValueNode, ...]
+        Command line run by this Instruction (None if not subject to parse).
+    __is_exec_form : bool
+        True if this Instruction is written in exec form (JSON array).
+    __bash_script : LazyValue
+        Bash command list parsed from ``__script`` on first access (None if ``__script`` is None).
     """
 
+    def __init__(
+            self,
+            line_num: int,
+            raw_code: str,
+            script: str = None,
+            heredocs: List[Heredoc] = None,
+            argv: List[BashValueNode] = None,
+            is_exec_form: bool = False
+    ):
+        """
+        Parameters
+        ----------
+        line_num : int
+            Line number of this Instruction.
+        raw_code : str
+            Original Dockerfile source code.
+        script : str or None
+            Shell script of shell form (None if exec form or not subject to parse).
+        heredocs : List[Heredoc] or None
+            Heredocs following this Instruction.
+        argv : List[BashValueNode] or None
+            Command line run by this Instruction.
+        is_exec_form : bool
+            True if this Instruction is written in exec form (JSON array).
+        """
+        super(ShellCommandInstruction, self).__init__(line_num, raw_code)
+        self.__script: str = script
+        self.__heredocs: Tuple[Heredoc, ...] = () if heredocs is None else as_tuple(heredocs)
+        self.__argv: Tuple[BashValueNode, ...] = as_tuple(argv)
+        self.__is_exec_form: bool = is_exec_form
+        if script is None:
+            self.__bash_script: LazyValue = None
+        elif len(self.__heredocs) > 0:
+            self.__bash_script: LazyValue = LazyValue(
+                functools.partial(_parse_heredoc_script, script, self.__heredocs)
+            )
+        else:
+            self.__bash_script: LazyValue = LazyValue(functools.partial(BashParser.parse_bash_script, script))
+
+    @property
+    def script(self) -> str:
+        """
+        Returns
+        -------
+        __script : str or None
+            Shell script of shell form (None if exec form or not subject to parse).
+        """
+        return self.__script
+
+    @property
+    def heredocs(self) -> Tuple[Heredoc, ...]:
+        """
+        Returns
+        -------
+        __heredocs : Tuple[Heredoc, ...]
+            Heredocs following this Instruction (empty if none).
+        """
+        return self.__heredocs
+
+    @property
+    def argv(self) -> Tuple[BashValueNode, ...]:
+        """
+        Returns
+        -------
+        __argv : Tuple[BashValueNode, ...] or None
+            Command line run by this Instruction (None if not subject to parse).
+        """
+        return materialize(self.__argv)
+
+    @property
+    def is_exec_form(self) -> bool:
+        """
+        Returns
+        -------
+        __is_exec_form : bool
+            True if this Instruction is written in exec form (JSON array).
+        """
+        return self.__is_exec_form
+
+    @property
+    def bash_script(self) -> BashCommandList:
+        """
+        Returns
+        -------
+        __bash_script : BashCommandList or None
+            Bash command list parsed from the shell script of shell form
+            (None if exec form, not subject to parse or not parsable).
+        """
+        return materialize(self.__bash_script)
+
+    # override
+    def _key(self):
+        return super(ShellCommandInstruction, self)._key() + (
+            self.__script, self.__heredocs, self.argv, self.__is_exec_form
+        )
 
-class RUNInstruction(Instruction):
-    # TODO: Need to implement
-    def __init__(self, line_num: int, raw_code: str):
-        super(RUNInstruction, self).__init__(line_num, raw_code)
 
+class RUNInstruction(ShellCommandInstruction):
     """
+    A node of RUN Instruction.
+
     RUN <command>
     RUN ["executable", "param1", "param2"]
+    RUN <<EOF
+    <command>
+    EOF
     """
+    def __init__(
+            self,
+            line_num: int,
+            raw_code: str,
+            script: str = None,
+            heredocs: List[Heredoc] = None,
+            argv: List[BashValueNode] = None,
+            is_exec_form: bool = False
+    ):
+        """
+        Parameters
+        ----------
+        line_num : int
+            Line number of this RUN Instruction.
+        raw_code : str
+            Original Dockerfile source code.
+        script : str or None
+            Shell script of shell form (None if exec form or not subject to parse).
+        heredocs : List[Heredoc] or None
+            Heredocs following this RUN Instruction.
+        argv : List[BashValueNode] or None
+            Command line run by this RUN Instruction.
+        is_exec_form : bool
+            True if this RUN Instruction is written in exec form (JSON array).
+        """
+        super(RUNInstruction, self).__init__(line_num, raw_code, script, heredocs, argv, is_exec_form)
 
 
-class CMDInstruction(Instruction):
-    # TODO: Need to implement
-    def __init__(self, line_num: int, raw_code: str):
-        super(CMDInstruction, self).__init__(line_num, raw_code)
-
+class CMDInstruction(ShellCommandInstruction):
     """
+    A node of CMD Instruction.
+
     CMD ["executable","param1","param2"]
     CMD ["param1","param2"]
     CMD command param1 param2
     """
+    def __init__(
+            self,
+            line_num: int,
+            raw_code: str,
+            script: str = None,
+            argv: List[BashValueNode] = None,
+            is_exec_form: bool = False
+    ):
+        """
+        Parameters
+        ----------
+        line_num : int
+            Line number of this CMD Instruction.
+        raw_code : str
+            Original Dockerfile source code.
+        script : str or None
+            Shell script of shell form (None if exec form or not subject to parse).
+        argv : List[BashValueNode] or None
+            Command line run by this CMD Instruction.
+        is_exec_form : bool
+            True if this CMD Instruction is written in exec form (JSON array).
+        """
+        super(CMDInstruction, self).__init__(line_num, raw_code, script, None, argv, is_exec_form)
 
 
 class LABELInstruction(Instruction):
@@ -112,7 +337,7 @@ class LABELInstruction(Instruction):
 
     Attributes
     ----------
-    __labels : List[DockerLabel]
+    __labels : Tuple[DockerLabel, ...]
         List of Docker labels declared by this LABEL Instruction.
     """
     __REPR_FORMAT: str = "{0}(labels={1}, line_num={2}, raw_code={3})"
@@ -129,29 +354,33 @@ class LABELInstruction(Instruction):
             Original Dockerfile source code.
         """
         super(LABELInstruction, self).__init__(line_num, raw_code)
-        self.__labels: List[DockerLabel] = labels
+        self.__labels: Tuple[DockerLabel, ...] = as_tuple(labels)
 
     @property
-    def labels(self) -> List[DockerLabel]:
+    def labels(self) -> Tuple[DockerLabel, ...]:
         """
         Returns
         -------
-        __labels : List[DockerLabel]
+        __labels : Tuple[DockerLabel, ...]
             List of Docker labels declared by this LABEL Instruction.
         """
-        return self.__labels
+        return materialize(self.__labels)
+
+    # override
+    def _key(self):
+        return super(LABELInstruction, self)._key() + (self.labels,)
 
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
-        repr_labels = repr(self.__labels)
+        repr_labels = repr(self.labels)
         repr_line_num = repr(self.line_num)
         repr_raw_code = repr(self.raw_code)
         return self.__REPR_FORMAT.format(self_class_name, repr_labels, repr_line_num, repr_raw_code)
 
     # override
     def __str__(self):
-        return " ".join([str(InstructionEnum.LABEL)] + [str(label) for label in self.__labels])
+        return " ".join([str(InstructionEnum.LABEL)] + [str(label) for label in self.labels])
 
 
 class EXPOSEInstruction(Instruction):
@@ -160,39 +389,43 @@ class EXPOSEInstruction(Instruction):
 
     Attributes
     ----------
-    __ports : List[DockerPort]
-        List of Docker ports declared by this EXPOSE Instruction.
+    __ports : Tuple[Union[DockerPort, DockerPortRange], ...]
+        List of Docker ports (and port ranges) declared by this EXPOSE Instruction.
     """
     __REPR_FORMAT: str = "{0}(ports={1}, line_num={2}, raw_code={3})"
 
-    def __init__(self, ports: List[DockerPort], line_num: int, raw_code: str):
+    def __init__(self, ports: List[Union[DockerPort, DockerPortRange]], line_num: int, raw_code: str):
         """
         Parameters
         ----------
-        ports : List[DockerPort]
-            List of Docker ports declared by this LABEL Instruction.
+        ports : List[Union[DockerPort, DockerPortRange]]
+            List of Docker ports (and port ranges) declared by this EXPOSE Instruction.
         line_num : int
             Line number of this EXPOSE Instruction.
         raw_code : str
             Original Dockerfile source code.
         """
         super(EXPOSEInstruction, self).__init__(line_num, raw_code)
-        self.__ports: List[DockerPort] = ports
+        self.__ports: Tuple[Union[DockerPort, DockerPortRange], ...] = as_tuple(ports)
 
     @property
-    def ports(self) -> List[DockerPort]:
+    def ports(self) -> Tuple[Union[DockerPort, DockerPortRange], ...]:
         """
         Returns
         -------
-        __ports : List[DockerPort]
-            List of Docker ports declared by this EXPOSE Instruction.
+        __ports : Tuple[Union[DockerPort, DockerPortRange], ...]
+            List of Docker ports (and port ranges) declared by this EXPOSE Instruction.
         """
-        return self.__ports
+        return materialize(self.__ports)
+
+    # override
+    def _key(self):
+        return super(EXPOSEInstruction, self)._key() + (self.ports,)
 
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
-        repr_ports = repr(self.__ports)
+        repr_ports = repr(self.ports)
         repr_line_num = repr(self.line_num)
         repr_raw_code = repr(self.raw_code)
         return self.__REPR_FORMAT.format(self_class_name, repr_ports, repr_line_num, repr_raw_code)
@@ -204,7 +437,7 @@ class ENVInstruction(Instruction):
 
     Attributes
     ----------
-    __variables: List[EnvironmentVariable]
+    __variables: Tuple[EnvironmentVariable, ...]
         List of environment variables declared by this ENV Instruction.
     """
     __REPR_FORMAT: str = "{0}(variables={1}, line_num={2}, raw_code={3})"
@@ -221,18 +454,22 @@ class ENVInstruction(Instruction):
             Original Dockerfile source code.
         """
         super(ENVInstruction, self).__init__(line_num, raw_code)
-        self.__variables: List[EnvironmentVariable] = variables
+        self.__variables: Tuple[EnvironmentVariable, ...] = as_tuple(variables)
 
     @property
-    def variables(self) -> List[EnvironmentVariable]:
+    def variables(self) -> Tuple[EnvironmentVariable, ...]:
         """
         Returns
         -------
-        __variables :  List[EnvironmentVariable]
+        __variables :  Tuple[EnvironmentVariable, ...]
             List of environment variables declared by this ENV Instruction.
         """
         return self.__variables
 
+    # override
+    def _key(self):
+        return super(ENVInstruction, self)._key() + (self.__variables,)
+
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
@@ -246,22 +483,30 @@ class ENVInstruction(Instruction):
         return " ".join([str(InstructionEnum.ENV)] + [str(variable) for variable in self.variables])
 
 
-class ADDInstruction(Instruction):
+class FileCopyInstruction(Instruction, metaclass=ABCMeta):
     """
-    A node of ADD Instruction.
+    A node of Instruction copying files into Docker image (ADD and COPY Instructions).
 
-    Todo: Need to implement parse options `--chown=<user>:<group>`
+    All arguments but the last are sources, and the last one is the destination.
 
     Attributes
     ----------
     __source: Filepath
 
-    __destinations: List[FilePath]
+    __destinations: Tuple[Filepath, ...]
 
+    __heredocs : Tuple[Heredoc, ...]
+        Heredocs whose bodies are copied as files (empty if none).
     """
-    __REPR_FORMAT: str = "{0}(source={1}, destinations={2}, line_num={3}, raw_code={4})"
 
-    def __init__(self, source: Filepath, destinations: List[Filepath], line_num: int, raw_code: str):
+    def __init__(
+            self,
+            source: Filepath,
+            destinations: List[Filepath],
+            line_num: int,
+            raw_code: str,
+            heredocs: List[Heredoc] = None
+    ):
         """
         Parameters
         ----------
@@ -270,13 +515,16 @@ class ADDInstruction(Instruction):
         destinations : List[FilePath]
 
         line_num : int
-            Line number of this ADD Instruction.
+            Line number of this Instruction.
         raw_code : str
             Original Dockerfile source code.
+        heredocs : List[Heredoc] or None
+            Heredocs whose bodies are copied as files (e.g. `COPY <<EOF /etc/conf`).
         """
-        super(ADDInstruction, self).__init__(line_num, raw_code)
+        super(FileCopyInstruction, self).__init__(line_num, raw_code)
         self.__source: Filepath = source
-        self.__destinations: List[Filepath] = destinations
+        self.__destinations: Tuple[Filepath, ...] = as_tuple(destinations)
+        self.__heredocs: Tuple[Heredoc, ...] = () if heredocs is None else as_tuple(heredocs)
 
     @property
     def source(self) -> Filepath:
@@ -286,28 +534,102 @@ class ADDInstruction(Instruction):
         __source: Filepath
 
         """
-        return self.__source
+        return materialize(self.__source)
 
     @property
-    def destinations(self) -> List[Filepath]:
+    def destinations(self) -> Tuple[Filepath, ...]:
         """
         Returns
         -------
-        __destinations: List[FilePath]
+        __destinations: Tuple[Filepath, ...]
+
+        """
+        return materialize(self.__destinations)
+
+    @property
+    def sources(self) -> Tuple[Filepath, ...]:
+        """
+        Returns
+        -------
+        sources : Tuple[Filepath, ...]
+            All sources excluding heredocs, i.e. ``source`` and ``destinations`` but the last.
+        """
+        destinations: Tuple[Filepath, ...] = self.destinations
+        if self.source is None:
+            return destinations[:-1]
+        return (self.source,) + destinations[:-1]
+
+    @property
+    def destination(self) -> Filepath:
+        """
+        Returns
+        -------
+        destination : Filepath or None
+            Destination, i.e. the last of ``destinations`` (None if no destination).
+        """
+        destinations: Tuple[Filepath, ...] = self.destinations
+        return destinations[-1] if len(destinations) > 0 else None
+
+    @property
+    def heredocs(self) -> Tuple[Heredoc, ...]:
+        """
+        Returns
+        -------
+        __heredocs : Tuple[Heredoc, ...]
+            Heredocs whose bodies are copied as files (empty if none).
+        """
+        return self.__heredocs
 
+    # override
+    def _key(self):
+        return super(FileCopyInstruction, self)._key() + (self.source, self.destinations, self.__heredocs)
+
+
+class ADDInstruction(FileCopyInstruction):
+    """
+    A node of ADD Instruction.
+
+    Todo: Need to implement parse options `--chown=<user>:<group>`
+    """
+    __REPR_FORMAT: str = "{0}(source={1}, destinations={2}, heredocs={3}, line_num={4}, raw_code={5})"
+
+    def __init__(
+            self,
+            source: Filepath,
+            destinations: List[Filepath],
+            line_num: int,
+            raw_code: str,
+            heredocs: List[Heredoc] = None
+    ):
+        """
+        Parameters
+        ----------
+        source : Filepath
+
+        destinations : List[FilePath]
+
+        line_num : int
+            Line number of this ADD Instruction.
+        raw_code : str
+            Original Dockerfile source code.
+        heredocs : List[Heredoc] or None
+            Heredocs whose bodies are added as files (e.g. `ADD <<EOF /etc/conf`).
         """
-        return self.__destinations
+        super(ADDInstruction, self).__init__(source, destinations, line_num, raw_code, heredocs)
 
     def __repr__(self):
         self_class_name = self.__class__.__name__
-        repr_source = repr(self.__source)
-        repr_destinations = repr(self.__destinations)
+        repr_source = repr(self.source)
+        repr_destinations = repr(self.destinations)
+        repr_heredocs = repr(self.heredocs)
         repr_line_num = repr(self.line_num)
         repr_raw_code = repr(self.raw_code)
-        return self.__REPR_FORMAT.format(self_class_name, repr_source, repr_destinations, repr_line_num, repr_raw_code)
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr_source, repr_destinations, repr_heredocs, repr_line_num, repr_raw_code
+        )
 
 
-class COPYInstruction(Instruction):
+class COPYInstruction(FileCopyInstruction):
     """
     A node of COPY Instruction.
 
@@ -315,14 +637,20 @@ class COPYInstruction(Instruction):
 
     Attributes
     ----------
-    __source: Filepath
-
-    __destinations: List[FilePath]
-
+    __from_stage: BashValueNode
+        Build stage (name or index) or Docker image given by `--from=<name>`.
     """
-    __REPR_FORMAT: str = "{0}(source={1}, destinations={2}, line_num={3}, raw_code={4})"
-
-    def __init__(self, source: Filepath, destinations: List[Filepath], line_num: int, raw_code: str):
+    __REPR_FORMAT: str = "{0}(source={1}, destinations={2}, from_stage={3}, heredocs={4}, line_num={5}, raw_code={6})"
+
+    def __init__(
+            self,
+            source: Filepath,
+            destinations: List[Filepath],
+            line_num: int,
+            raw_code: str,
+            from_stage: BashValueNode = None,
+            heredocs: List[Heredoc] = None
+    ):
         """
         Parameters
         ----------
@@ -334,49 +662,72 @@ class COPYInstruction(Instruction):
             Line number of this COPY Instruction.
         raw_code : str
             Original Dockerfile source code.
+        from_stage : BashValueNode or None
+            Build stage (name or index) or Docker image given by `--from=<name>`.
+        heredocs : List[Heredoc] or None
+            Heredocs whose bodies are copied as files (e.g. `COPY <<EOF /etc/conf`).
         """
-        super(COPYInstruction, self).__init__(line_num, raw_code)
-        self.__source: Filepath = source
-        self.__destinations: List[Filepath] = destinations
+        super(COPYInstruction, self).__init__(source, destinations, line_num, raw_code, heredocs)
+        self.__from_stage: BashValueNode = from_stage
 
     @property
-    def source(self) -> Filepath:
+    def from_stage(self) -> BashValueNode:
         """
         Returns
         -------
-        __source: Filepath
-
-        """
-        return self.__source
-
-    @property
-    def destinations(self) -> List[Filepath]:
+        __from_stage : BashValueNode or None
+            Build stage (name or index) or Docker image given by `--from=<name>`.
         """
-        Returns
-        -------
-        __destinations: List[FilePath]
+        return materialize(self.__from_stage)
 
-        """
-        return self.__destinations
+    # override
+    def _key(self):
+        return super(COPYInstruction, self)._key() + (self.from_stage,)
 
     def __repr__(self):
         self_class_name = self.__class__.__name__
-        repr_source = repr(self.__source)
-        repr_destinations = repr(self.__destinations)
+        repr_source = repr(self.source)
+        repr_destinations = repr(self.destinations)
+        repr_from_stage = repr(self.from_stage)
+        repr_heredocs = repr(self.heredocs)
         repr_line_num = repr(self.line_num)
         repr_raw_code = repr(self.raw_code)
-        return self.__REPR_FORMAT.format(self_class_name, repr_source, repr_destinations, repr_line_num, repr_raw_code)
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr_source, repr_destinations, repr_from_stage, repr_heredocs, repr_line_num,
+            repr_raw_code
+        )
 
 
-class ENTRYPOINTInstruction(Instruction):
-    # TODO: Need to implement
-    def __init__(self, line_num: int, raw_code: str):
-        super(ENTRYPOINTInstruction, self).__init__(line_num, raw_code)
-
+class ENTRYPOINTInstruction(ShellCommandInstruction):
     """
+    A node of ENTRYPOINT Instruction.
+
     ENTRYPOINT ["executable", "param1", "param2"]
     ENTRYPOINT command param1 param2
     """
+    def __init__(
+            self,
+            line_num: int,
+            raw_code: str,
+            script: str = None,
+            argv: List[BashValueNode] = None,
+            is_exec_form: bool = False
+    ):
+        """
+        Parameters
+        ----------
+        line_num : int
+            Line number of this ENTRYPOINT Instruction.
+        raw_code : str
+            Original Dockerfile source code.
+        script : str or None
+            Shell script of shell form (None if exec form or not subject to parse).
+        argv : List[BashValueNode] or None
+            Command line run by this ENTRYPOINT Instruction.
+        is_exec_form : bool
+            True if this ENTRYPOINT Instruction is written in exec form (JSON array).
+        """
+        super(ENTRYPOINTInstruction, self).__init__(line_num, raw_code, script, None, argv, is_exec_form)
 
 
 class VOLUMEInstruction(Instruction):
@@ -385,7 +736,7 @@ class VOLUMEInstruction(Instruction):
 
     Attributes
     ----------
-    __volumes : List[Filepath]
+    __volumes : Tuple[Filepath, ...]
         List of mount points created by this VOLUME Instruction.
     """
     __REPR_FORMAT: str = "{0}(volumes={1}, line_num={2}, raw_code={3})"
@@ -402,41 +753,101 @@ class VOLUMEInstruction(Instruction):
             Original Dockerfile code source.
         """
         super(VOLUMEInstruction, self).__init__(line_num, raw_code)
-        self.__volumes: List[Filepath] = volumes
+        self.__volumes: Tuple[Filepath, ...] = as_tuple(volumes)
 
     @property
-    def volumes(self) -> List[Filepath]:
+    def volumes(self) -> Tuple[Filepath, ...]:
         """
 
         Returns
         -------
-        __volumes : List[Filepath]
+        __volumes : Tuple[Filepath, ...]
           List of mount points created by this VOLUME Instruction.
         """
-        return self.__volumes
+        return materialize(self.__volumes)
+
+    # override
+    def _key(self):
+        return super(VOLUMEInstruction, self)._key() + (self.volumes,)
 
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
-        repr_volumes = repr(self.__volumes)
+        repr_volumes = repr(self.volumes)
         repr_line_num = repr(self.line_num)
         repr_raw_code = repr(self.raw_code)
         return self.__REPR_FORMAT.format(self_class_name, repr_volumes, repr_line_num, repr_raw_code)
 
     # override
     def __str__(self):
-        return " ".join([str(InstructionEnum.VOLUME)] + [str(volume) for volume in self.__volumes])
+        return " ".join([str(InstructionEnum.VOLUME)] + [str(volume) for volume in self.volumes])
 
 
 class USERInstruction(Instruction):
-    # TODO: Need to implement
-    def __init__(self, line_num: int, raw_code: str):
-        super(USERInstruction, self).__init__(line_num, raw_code)
-
     """
+    A node of USER Instruction.
+
     USER <user>[:<group>]
     USER <UID>[:<GID>]
+
+    Attributes
+    ----------
+    __user : BashValueNode
+        User name or UID.
+    __group : BashValueNode
+        Group name or GID (None if not declared).
     """
+    __REPR_FORMAT: str = "{0}(user={1}, group={2}, line_num={3}, raw_code={4})"
+
+    def __init__(self, user: BashValueNode, group: BashValueNode, line_num: int, raw_code: str):
+        """
+        Parameters
+        ----------
+        user : BashValueNode
+            User name or UID.
+        group : BashValueNode or None
+            Group name or GID.
+        line_num : int
+            Line number of this USER Instruction.
+        raw_code : str
+            Original Dockerfile source code.
+        """
+        super(USERInstruction, self).__init__(line_num, raw_code)
+        self.__user: BashValueNode = user
+        self.__group: BashValueNode = group
+
+    @property
+    def user(self) -> BashValueNode:
+        """
+        Returns
+        -------
+        __user : BashValueNode
+            User name or UID.
+        """
+        return materialize(self.__user)
+
+    @property
+    def group(self) -> BashValueNode:
+        """
+        Returns
+        -------
+        __group : BashValueNode or None
+            Group name or GID (None if not declared).
+        """
+        return materialize(self.__group)
+
+    # override
+    def _key(self):
+        return super(USERInstruction, self)._key() + (self.user, self.group)
+
+    # override
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        repr_user = repr(self.user)
+        repr_group = repr(self.group)
+        repr_line_num = repr(self.line_num)
+        repr_raw_code = repr(self.raw_code)
+        return self.__REPR_FORMAT.format(self_class_name, repr_user, repr_group, repr_line_num, repr_raw_code)
 
 
 class WORKDIRInstruction(Instruction):
@@ -473,12 +884,16 @@ class WORKDIRInstruction(Instruction):
         __work_dir : Filepath
             Working directory declared by this WORKDIR Instruction.
         """
-        return self.__work_dir
+        return materialize(self.__work_dir)
+
+    # override
+    def _key(self):
+        return super(WORKDIRInstruction, self)._key() + (self.work_dir,)
 
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
-        repr_work_dir = repr(self.__work_dir)
+        repr_work_dir = repr(self.work_dir)
         repr_line_num = repr(self.line_num)
         repr_raw_code = repr(self.raw_code)
         return self.__REPR_FORMAT.format(self_class_name, repr_work_dir, repr_line_num, repr_raw_code)
@@ -519,6 +934,10 @@ class ARGInstruction(Instruction):
         """
         return self.__variable
 
+    # override
+    def _key(self):
+        return super(ARGInstruction, self)._key() + (self.__variable,)
+
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
@@ -534,7 +953,7 @@ class ONBUILDInstruction(Instruction):
 
     Attributes
     ----------
-    __param_instructions : List[Instruction]
+    __param_instructions : Tuple[Instruction, ...]
         Dockerfile Instructions as parameters of ONBUILD Instruction.
     """
     __REPR_FORMAT: str = "{0}(param_instructions={1}, line_num={2}, raw_code={3})"
@@ -551,18 +970,22 @@ class ONBUILDInstruction(Instruction):
             Original Dockerfile source code.
         """
         super(ONBUILDInstruction, self).__init__(line_num, raw_code)
-        self.__param_instructions: List[Instruction] = param_instructions
+        self.__param_instructions: Tuple[Instruction, ...] = as_tuple(param_instructions)
 
     @property
-    def param_instructions(self) -> List[Instruction]:
+    def param_instructions(self) -> Tuple[Instruction, ...]:
         """
         Returns
         -------
-        __param_instructions : List[Instruction]
+        __param_instructions : Tuple[Instruction, ...]
             Dockerfile Instructions as parameters of ONBUILD Instruction.
         """
         return self.__param_instructions
 
+    # override
+    def _key(self):
+        return super(ONBUILDInstruction, self)._key() + (self.__param_instructions,)
+
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
@@ -605,11 +1028,15 @@ class STOPSIGNALInstruction(Instruction):
         __signal : SystemCallSignal
             System call signal declared by this STOPSIGNAL Instruction.
         """
-        return self.__signal
+        return materialize(self.__signal)
+
+    # override
+    def _key(self):
+        return super(STOPSIGNALInstruction, self)._key() + (self.signal,)
 
     def __repr__(self):
         self_class_name = self.__class__.__name__
-        repr_signal = repr(self.__signal)
+        repr_signal = repr(self.signal)
         repr_line_num = repr(self.line_num)
         repr_raw_code = repr(self.raw_code)
         return self.__REPR_FORMAT.format(self_class_name, repr_signal, repr_line_num, repr_raw_code)
@@ -630,7 +1057,7 @@ class HEALTHCHECKInstruction(Instruction):
 
     Attributes
     ----------
-    __param_instructions : List[Instruction]
+    __param_instructions : Tuple[Instruction, ...]
         Dockerfile Instructions as parameters of HEALTHCHECK Instruction.
         HEALTHCHECK Instruction has only CMD Instruction or "NONE."
     """
@@ -649,18 +1076,22 @@ class HEALTHCHECKInstruction(Instruction):
             Original Dockerfile source code.
         """
         super(HEALTHCHECKInstruction, self).__init__(line_num, raw_code)
-        self.__param_instructions: List[Instruction] = param_instructions
+        self.__param_instructions: Tuple[Instruction, ...] = as_tuple(param_instructions)
 
     @property
-    def param_instructions(self) -> List[Instruction]:
+    def param_instructions(self) -> Tuple[Instruction, ...]:
         """
         Returns
         -------
-        __param_instructions : List[Instruction]
+        __param_instructions : Tuple[Instruction, ...]
             Dockerfile Instructions as parameters of HEALTHCHECK Instruction.
         """
         return self.__param_instructions
 
+    # override
+    def _key(self):
+        return super(HEALTHCHECKInstruction, self)._key() + (self.__param_instructions,)
+
     # override
     def __repr__(self):
         self_class_name = self.__class__.__name__
@@ -671,10 +1102,64 @@ class HEALTHCHECKInstruction(Instruction):
 
 
 class SHELLInstruction(Instruction):
-    # TODO: Need to implement
-    def __init__(self, line_num: int, raw_code: str):
-        super(SHELLInstruction, self).__init__(line_num, raw_code)
-
     """
+    A node of SHELL Instruction.
+
     SHELL ["executable", "parameters"]
+
+    Attributes
+    ----------
+    __argv : Tuple[BashValueNode, ...]
+        Shell (and its parameters) running shell form of subsequent RUN, CMD and ENTRYPOINT Instructions.
     """
+    __REPR_FORMAT: str = "{0}(argv={1}, line_num={2}, raw_code={3})"
+
+    def __init__(self, argv: List[BashValueNode], line_num: int, raw_code: str):
+        """
+        Parameters
+        ----------
+        argv : List[BashValueNode]
+            Shell (and its parameters) running shell form of subsequent RUN, CMD and ENTRYPOINT Instructions.
+        line_num : int
+            Line number of this SHELL Instruction.
+        raw_code : str
+            Original Dockerfile source code.
+        """
+        super(SHELLInstruction, self).__init__(line_num, raw_code)
+        self.__argv: Tuple[BashValueNode, ...] = as_tuple(argv)
+
+    @property
+    def argv(self) -> Tuple[BashValueNode, ...]:
+        """
+        Returns
+        -------
+        __argv : Tuple[BashValueNode, ...]
+            Shell (and its parameters) running shell form of subsequent RUN, CMD and ENTRYPOINT Instructions.
+        """
+        return materialize(self.__argv)
+
+    # override
+    def _key(self):
+        return super(SHELLInstruction, self)._key() + (self.argv,)
+
+    # override
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        repr_argv = repr(self.argv)
+        repr_line_num = repr(self.line_num)
+        repr_raw_code = repr(self.raw_code)
+        return self.__REPR_FORMAT.format(self_class_name, repr_argv, repr_line_num, repr_raw_code)
+
+
+def _parse_heredoc_script(script: str, heredocs: Tuple[Heredoc, ...]) -> BashCommandList:
+    if len(heredocs) == 1 and _HEREDOC_SCRIPT_PATTERN.fullmatch(script):
+        # ヒアドキュメントの本体をシェルスクリプトとして実行
+        return BashParser.parse_bash_script(heredocs[0].body)
+    # シェルスクリプトとヒアドキュメント（本体と終端）を合わせてシェルで実行
+    return BashParser.parse_bash_script(
+        "\n".join([script] + [heredoc.body + heredoc.name for heredoc in heredocs]) + "\n"
+    )
+
+
+# ヒアドキュメントのみからなるシェルスクリプト（例：`<<EOF`）
+_HEREDOC_SCRIPT_PATTERN = re.compile(r"\s*<<-?(['\"]?)[A-Za-z_][\w.-]*\1\s*")
@@ -1,8 +1,11 @@
 from abc import ABCMeta
+import functools
 
 from dockerfile_ast.dockerfile_items.bash_items.nodes import BashValueNode
 
 from dockerfile_ast.utils import DockerfileASTNode
+from dockerfile_ast.utils import LazyValue
+from dockerfile_ast.utils import materialize
 
 
 class DockerfileSyntaxNode(DockerfileASTNode, metaclass=ABCMeta):
@@ -12,19 +15,141 @@ class DockerfileSyntaxNode(DockerfileASTNode, metaclass=ABCMeta):
 
 
 class DockerImage(DockerfileSyntaxNode):
-    # TODO: Need to implement
+    """
+    A node of Docker image referred by FROM Instruction.
+
+    Attributes
+    ----------
+    __name : BashValueNode
+        Name of this Docker image (including registry and repository).
+    __tag : BashValueNode
+        Tag of this Docker image.
+    __digest : BashValueNode
+        Digest of this Docker image.
+    __as_name : BashValueNode
+        Build stage name given by `AS <name>`.
+    __platform : BashValueNode
+        Platform given by `--platform=<platform>`.
+    """
+    __REPR_FORMAT: str = "{0}(name={1}, tag={2}, digest={3}, as_name={4}, platform={5})"
+
     def __init__(
             self,
             name: BashValueNode,
             tag: BashValueNode = None,
             digest: BashValueNode = None,
-            as_name: BashValueNode = None
+            as_name: BashValueNode = None,
+            platform: BashValueNode = None
     ):
+        """
+        Parameters
+        ----------
+        name : BashValueNode
+            Name of this Docker image (including registry and repository).
+        tag : BashValueNode or None
+            Tag of this Docker image.
+        digest : BashValueNode or None
+            Digest of this Docker image.
+        as_name : BashValueNode or None
+            Build stage name given by `AS <name>`.
+        platform : BashValueNode or None
+            Platform given by `--platform=<platform>`.
+        """
         super(DockerImage, self).__init__()
-        self.__name = name
-        self.__tag = tag
-        self.__digest = digest
-        self.__as_name = as_name
+        self.__name: BashValueNode = name
+        self.__tag: BashValueNode = tag
+        self.__digest: BashValueNode = digest
+        self.__as_name: BashValueNode = as_name
+        self.__platform: BashValueNode = platform
+
+    @property
+    def name(self) -> BashValueNode:
+        """
+        Returns
+        -------
+        __name : BashValueNode
+            Name of this Docker image (including registry and repository).
+        """
+        return self.__name
+
+    @property
+    def tag(self) -> BashValueNode:
+        """
+        Returns
+        -------
+        __tag : BashValueNode or None
+            Tag of this Docker image.
+        """
+        return self.__tag
+
+    @property
+    def digest(self) -> BashValueNode:
+        """
+        Returns
+        -------
+        __digest : BashValueNode or None
+            Digest of this Docker image.
+        """
+        return self.__digest
+
+    @property
+    def as_name(self) -> BashValueNode:
+        """
+        Returns
+        -------
+        __as_name : BashValueNode or None
+            Build stage name given by `AS <name>`.
+        """
+        return self.__as_name
+
+    @property
+    def platform(self) -> BashValueNode:
+        """
+        Returns
+        -------
+        __platform : BashValueNode or None
+            Platform given by `--platform=<platform>`.
+        """
+        return self.__platform
+
+    def reference(self) -> str:
+        """
+        Return this Docker image reference such as `ubuntu:22.04` or `alpine@sha256:...`.
+
+        Returns
+        -------
+        reference : str
+            Docker image reference.
+        """
+        reference = str(self.__name)
+        if self.__tag is not None:
+            reference += ":" + str(self.__tag)
+        if self.__digest is not None:
+            reference += "@" + str(self.__digest)
+        return reference
+
+    # override
+    def _key(self):
+        return (self.__name, self.__tag, self.__digest, self.__as_name, self.__platform)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        repr_name = repr(self.__name)
+        repr_tag = repr(self.__tag)
+        repr_digest = repr(self.__digest)
+        repr_as_name = repr(self.__as_name)
+        repr_platform = repr(self.__platform)
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr_name, repr_tag, repr_digest, repr_as_name, repr_platform
+        )
+
+    def __str__(self):
+        tokens = [self.reference()]
+        if self.__platform is not None:
+            tokens.insert(0, "--platform=" + str(self.__platform))
+        if self.__as_name is not None:
+            tokens.extend(["AS", str(self.__as_name)])
+        return " ".join(tokens)
 
 
 class DockerPort(DockerfileSyntaxNode):
@@ -65,6 +190,10 @@ class DockerPort(DockerfileSyntaxNode):
         """
         return self.__protocol
 
+    # override
+    def _key(self):
+        return (self.__port_num, self.__protocol)
+
     def __repr__(self):
         self_class_name = self.__class__.__name__
         repr_port_num = repr(self.__port_num)
@@ -78,6 +207,92 @@ class DockerPort(DockerfileSyntaxNode):
             return "/".join([str(self.__port_num), str(self.__protocol)])
 
 
+class DockerPortRange(DockerfileSyntaxNode):
+    """
+    A node of Docker port range (e.g. `30000-32767/udp`), whose ports are not expanded.
+
+    Attributes
+    ----------
+    __start : int
+        First port number of this port range.
+    __end : int
+        Last port number of this port range (inclusive).
+    __protocol : BashValueNode
+        Ethernet protocol of this port range.
+    """
+    __REPR_FORMAT: str = "{0}(start={1}, end={2}, protocol={3})"
+
+    def __init__(self, start: int, end: int, protocol: BashValueNode = None):
+        """
+        Parameters
+        ----------
+        start : int
+            First port number of this port range.
+        end : int
+            Last port number of this port range (inclusive).
+        protocol : BashValueNode or None
+            Ethernet protocol of this port range.
+        """
+        super(DockerPortRange, self).__init__()
+        self.__start: int = start
+        self.__end: int = end
+        self.__protocol: BashValueNode = protocol
+
+    @property
+    def start(self) -> int:
+        """
+        Returns
+        -------
+        __start : int
+            First port number of this port range.
+        """
+        return self.__start
+
+    @property
+    def end(self) -> int:
+        """
+        Returns
+        -------
+        __end : int
+            Last port number of this port range (inclusive).
+        """
+        return self.__end
+
+    @property
+    def protocol(self) -> BashValueNode:
+        """
+        Returns
+        -------
+        __protocol : BashValueNode
+            Ethernet protocol of this port range.
+        """
+        return self.__protocol
+
+    def __contains__(self, port_num: int):
+        return self.__start <= port_num <= self.__end
+
+    def __len__(self):
+        return self.__end - self.__start + 1
+
+    # override
+    def _key(self):
+        return (self.__start, self.__end, self.__protocol)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        repr_start = repr(self.__start)
+        repr_end = repr(self.__end)
+        repr_protocol = repr(self.__protocol)
+        return self.__REPR_FORMAT.format(self_class_name, repr_start, repr_end, repr_protocol)
+
+    def __str__(self):
+        port_range: str = "-".join([str(self.__start), str(self.__end)])
+        if self.__protocol is None:
+            return port_range
+        else:
+            return "/".join([port_range, str(self.__protocol)])
+
+
 class DockerLabel(DockerfileSyntaxNode):
     """
     A node of Docker label.
@@ -126,6 +341,10 @@ class DockerLabel(DockerfileSyntaxNode):
         """
         return self.__value
 
+    # override
+    def _key(self):
+        return (self.__name, self.__value)
+
     def __repr__(self):
         self_class_name = self.__class__.__name__
         repr_name = repr(self.__name)
@@ -134,3 +353,161 @@ class DockerLabel(DockerfileSyntaxNode):
 
     def __str__(self):
         return "=\"".join([self.name, str(self.__value)]) + "\""
+
+
+class Heredoc(DockerfileSyntaxNode):
+    """
+    A node of heredoc (e.g. `RUN <<EOF` or `COPY <<EOF /etc/conf`) embedded in RUN, COPY or ADD Instruction.
+
+    The body is kept as an offset range of the Dockerfile source code,
+    and the string of the body is sliced (and stripped of leading tabs for `<<-`) on first access of ``body``.
+
+    Attributes
+    ----------
+    __name : str
+        Delimiter of this heredoc (e.g. `EOF`).
+    __line_num : int
+        Line number of the first line of the body.
+    __start : int
+        Offset of the first character of the body in the Dockerfile source code.
+    __end : int
+        Offset next to the last character of the body (the first character of the delimiter line).
+    __strip_tabs : bool
+        True if leading tabs of the body are stripped (`<<-EOF`).
+    __quoted : bool
+        True if the delimiter is quoted (`<<"EOF"`), i.e. variables in the body are not expanded.
+    __body : LazyValue
+        Body of this heredoc built on first access.
+    """
+    __REPR_FORMAT: str = "{0}(name={1}, line_num={2}, start={3}, end={4}, strip_tabs={5}, quoted={6})"
+
+    def __init__(
+            self,
+            name: str,
+            source: str,
+            line_num: int,
+            start: int,
+            end: int,
+            strip_tabs: bool = False,
+            quoted: bool = False
+    ):
+        """
+        Parameters
+        ----------
+        name : str
+            Delimiter of this heredoc (e.g. `EOF`).
+        source : str
+            Dockerfile source code including the body (referred, not copied).
+        line_num : int
+            Line number of the first line of the body.
+        start : int
+            Offset of the first character of the body in `source`.
+        end : int
+            Offset next to the last character of the body in `source`.
+        strip_tabs : bool
+            True if leading tabs of the body are stripped (`<<-EOF`).
+        quoted : bool
+            True if the delimiter is quoted (`<<"EOF"`), i.e. variables in the body are not expanded.
+        """
+        super(Heredoc, self).__init__()
+        self.__name: str = name
+        self.__line_num: int = line_num
+        self.__start: int = start
+        self.__end: int = end
+        self.__strip_tabs: bool = strip_tabs
+        self.__quoted: bool = quoted
+        self.__body: LazyValue = LazyValue(functools.partial(_heredoc_body, source, start, end, strip_tabs))
+
+    @property
+    def name(self) -> str:
+        """
+        Returns
+        -------
+        __name : str
+            Delimiter of this heredoc (e.g. `EOF`).
+        """
+        return self.__name
+
+    @property
+    def line_num(self) -> int:
+        """
+        Returns
+        -------
+        __line_num : int
+            Line number of the first line of the body.
+        """
+        return self.__line_num
+
+    @property
+    def start(self) -> int:
+        """
+        Returns
+        -------
+        __start : int
+            Offset of the first character of the body in the Dockerfile source code.
+        """
+        return self.__start
+
+    @property
+    def end(self) -> int:
+        """
+        Returns
+        -------
+        __end : int
+            Offset next to the last character of the body in the Dockerfile source code.
+        """
+        return self.__end
+
+    @property
+    def strip_tabs(self) -> bool:
+        """
+        Returns
+        -------
+        __strip_tabs : bool
+            True if leading tabs of the body are stripped (`<<-EOF`).
+        """
+        return self.__strip_tabs
+
+    @property
+    def quoted(self) -> bool:
+        """
+        Returns
+        -------
+        __quoted : bool
+            True if the delimiter is quoted (`<<"EOF"`), i.e. variables in the body are not expanded.
+        """
+        return self.__quoted
+
+    @property
+    def body(self) -> str:
+        """
+        Returns
+        -------
+        __body : str
+            Body of this heredoc (without the delimiter line).
+        """
+        return materialize(self.__body)
+
+    def __len__(self):
+        return self.__end - self.__start
+
+    # override
+    def _key(self):
+        return (self.__name, self.__strip_tabs, self.__quoted, self.body)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(self.__name), repr(self.__line_num), repr(self.__start), repr(self.__end),
+            repr(self.__strip_tabs), repr(self.__quoted)
+        )
+
+    def __str__(self):
+        return "<<" + ("-" if self.__strip_tabs else "") + (repr(self.__name) if self.__quoted else self.__name)
+
+
+def _heredoc_body(source: str, start: int, end: int, strip_tabs: bool) -> str:
+    body: str = source[start:end]
+    if strip_tabs:
+        body = "".join(line.lstrip("\t") for line in body.splitlines(keepends=True))
+    return body
@@ -1,4 +1,8 @@
 from enum import Enum
+import re
+from typing import Dict, List, Tuple
+
+from dockerfile_ast.dockerfile_items.nodes import Heredoc
 
 
 class InstructionEnum(Enum):
@@ -44,3 +48,115 @@ class InstructionEnum(Enum):
 
     def __str__(self):
         return self.value
+
+
+def strip_heredoc_bodies(raw_code: str) -> Tuple[str, Dict[int, Tuple[Heredoc, ...]]]:
+    """
+    Blank lines of heredoc bodies (and their delimiter lines) in Dockerfile source code,
+    which ``dockerfile.parse_string`` would parse as Dockerfile Instructions,
+    keeping line numbers of the other lines.
+
+    Returns
+    -------
+    cst_code, heredocs : Tuple[str, Dict[int, Tuple[Heredoc, ...]]]
+        Source code without heredoc bodies, and heredocs by line number of the Instructions starting them.
+        A heredoc not terminated by its delimiter lasts to the end of the source code.
+    """
+    heredocs: Dict[int, Tuple[Heredoc, ...]] = dict()
+    if "<<" not in raw_code:
+        return raw_code, heredocs
+    lines: List[str] = raw_code.splitlines(keepends=True)
+    line_offsets: List[int] = [0]
+    for line in lines:
+        line_offsets.append(line_offsets[-1] + len(line))
+    cst_lines: List[str] = list(lines)
+    line_index: int = 0
+    instruction_line_num: int = None
+    markers: List[Tuple[str, str, str]] = list()
+    quote: str = ""
+    is_continued: bool = False
+    while line_index < len(lines):
+        line: str = lines[line_index]
+        stripped_line: str = line.strip()
+        line_index += 1
+        if stripped_line.startswith("#") or (is_continued and len(stripped_line) < 1):
+            # コメント行・継続行中の空行
+            continue
+        if not is_continued:
+            instruction_line_num = line_index if _HEREDOC_INSTRUCTION_PATTERN.match(line) else None
+            quote = ""
+        if instruction_line_num is not None:
+            line_markers, quote = _find_heredoc_markers(line, quote)
+            markers.extend(line_markers)
+        is_continued = stripped_line.endswith("\\")
+        if is_continued or len(markers) < 1:
+            continue
+        # 命令の次の行から，ヒアドキュメントの本体が開始順に続く
+        instruction_heredocs: List[Heredoc] = list()
+        for strip_tabs, quote, name in markers:
+            body_index: int = line_index
+            while line_index < len(lines):
+                delimiter: str = lines[line_index].rstrip("\r\n")
+                if (delimiter.lstrip("\t") if strip_tabs else delimiter) == name:
+                    break
+                line_index += 1
+            instruction_heredocs.append(Heredoc(
+                name, raw_code, body_index + 1, line_offsets[body_index], line_offsets[line_index],
+                len(strip_tabs) > 0, len(quote) > 0
+            ))
+            line_index = min(line_index + 1, len(lines))
+            for index in range(body_index, line_index):
+                cst_lines[index] = "\n"
+        heredocs[instruction_line_num] = tuple(instruction_heredocs)
+        markers = list()
+    if len(heredocs) < 1:
+        return raw_code, heredocs
+    return "".join(cst_lines), heredocs
+
+
+def _find_heredoc_markers(line: str, quote: str) -> Tuple[List[Tuple[str, str, str]], str]:
+    """
+    Find heredoc starts (e.g. `<<EOF`, `<<-"EOF"`) in a line of Dockerfile Instruction,
+    which begin words outside quotes as BuildKit splits arguments into words
+    (e.g. neither `echo "a <<EOF"` nor `$((1<<X))` starts a heredoc).
+
+    Returns
+    -------
+    markers, quote : Tuple[List[Tuple[str, str, str]], str]
+        `-` (or empty), the quote (or empty) and the delimiter of each heredoc,
+        and the quote left open at the end of the line (empty if none).
+    """
+    markers: List[Tuple[str, str, str]] = list()
+    is_word_start: bool = True
+    index: int = 0
+    while index < len(line):
+        char: str = line[index]
+        if len(quote) > 0:
+            if char == quote:
+                quote = ""
+            elif char == "\\" and quote == "\"":
+                index += 1
+            is_word_start = False
+        elif char.isspace():
+            is_word_start = True
+        else:
+            if is_word_start and char == "<":
+                match = HEREDOC_PATTERN.match(line, index)
+                if match is not None and (match.end() == len(line) or line[match.end()].isspace()):
+                    markers.append(match.groups())
+                    index = match.end()
+                    continue
+            if char in "'\"":
+                quote = char
+            elif char == "\\":
+                index += 1
+            is_word_start = False
+        index += 1
+    return markers, quote
+
+
+# ヒアドキュメントの開始（`<<EOF`，`<<-"EOF"`など）
+HEREDOC_PATTERN = re.compile(r"<<(-?)(['\"]?)([A-Za-z_][\w.-]*)\2")
+
+# ヒアドキュメントを持てる命令（ONBUILDの引数を含む）の行
+_HEREDOC_INSTRUCTION_PATTERN = re.compile(r"\s*(?:ONBUILD\s+)?(?:RUN|COPY|ADD)\s", re.IGNORECASE)
@@ -1,21 +1,32 @@
+import functools
 import logging
 import re
-from typing import Dict, List, Tuple
+import time
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Sequence, Set, Tuple, Union
 
+import bashlex.errors
 import dockerfile
 from dockerfile import GoParseError
 
 import dockerfile_ast.utils
-from dockerfile_ast import DockerfileAST, Instruction
+from dockerfile_ast.utils import LazyValue
+from dockerfile_ast import DockerfileAST, Instruction, ParseDiagnostic
 from dockerfile_ast.bash_parser import BashParser
+from dockerfile_ast.columnar_ast import ColumnarDockerfileAST, StringTable
+from dockerfile_ast.node_interner import NodeInterner, PROCESS_NODE_INTERNER
+from dockerfile_ast.parse_statistics import ParseStatistics
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashConstant
 from dockerfile_ast.dockerfile_items.bash_items.nodes import BashValueNode
 from dockerfile_ast.dockerfile_items.bash_items.nodes import BuildTimeVariable
 from dockerfile_ast.dockerfile_items.bash_items.nodes import EnvironmentVariable
 from dockerfile_ast.dockerfile_items.bash_items.nodes import Filepath
 from dockerfile_ast.dockerfile_items.bash_items.nodes import SystemCallSignal
 import dockerfile_ast.dockerfile_items.bash_items.utils
+from dockerfile_ast.dockerfile_items.nodes import DockerImage
 from dockerfile_ast.dockerfile_items.nodes import DockerLabel
 from dockerfile_ast.dockerfile_items.nodes import DockerPort
+from dockerfile_ast.dockerfile_items.nodes import DockerPortRange
+from dockerfile_ast.dockerfile_items.nodes import Heredoc
 from dockerfile_ast.dockerfile_items.instructions import FROMInstruction, RUNInstruction
 from dockerfile_ast.dockerfile_items.instructions import CMDInstruction
 from dockerfile_ast.dockerfile_items.instructions import LABELInstruction
@@ -32,13 +43,46 @@ from dockerfile_ast.dockerfile_items.instructions import ONBUILDInstruction
 from dockerfile_ast.dockerfile_items.instructions import STOPSIGNALInstruction
 from dockerfile_ast.dockerfile_items.instructions import HEALTHCHECKInstruction
 from dockerfile_ast.dockerfile_items.instructions import SHELLInstruction
-from dockerfile_ast.dockerfile_items.utils import InstructionEnum
+from dockerfile_ast.dockerfile_items.utils import HEREDOC_PATTERN, InstructionEnum, strip_heredoc_bodies
+
+
+# 変数のスコープやシェルを変更する命令の種類
+_SCOPE_INSTRUCTION_TYPES: FrozenSet[InstructionEnum] = frozenset([
+    InstructionEnum.FROM, InstructionEnum.ARG, InstructionEnum.ENV, InstructionEnum.SHELL
+])
+
+# SHELL命令がない場合にシェル形式の命令を実行するシェル
+_DEFAULT_SHELL: Tuple[str, ...] = ("/bin/sh", "-c")
+
+# パーサディレクティブ（例：`# escape=``）
+_PARSER_DIRECTIVE_PATTERN = re.compile(r"#\s*([A-Za-z]+)\s*=\s*(\S+)")
+
+# 定数のみからなるポート範囲（例：`30000-32767`）
+_PORT_RANGE_PATTERN = re.compile(r"(\d+)-(\d+)")
+_MAX_PORT_NUM: int = 65535
+
+# 命令ごとに必要な引数の最小個数
+_MINIMUM_ARGUMENT_COUNTS: Dict[InstructionEnum, int] = {
+    InstructionEnum.ADD: 2,
+    InstructionEnum.ARG: 1,
+    InstructionEnum.COPY: 2,
+    InstructionEnum.FROM: 1,
+    InstructionEnum.HEALTHCHECK: 1,
+    InstructionEnum.MAINTAINER: 1,
+    InstructionEnum.ONBUILD: 1,
+    InstructionEnum.STOPSIGNAL: 1,
+    InstructionEnum.WORKDIR: 1,
+}
 
 
 class DockerfileParser:
     """
     A parser of Dockerfile.
     """
+    __FINGERPRINT_FORMAT: str = (
+        "parse_level={0};error_tolerant={1};separate_instructions={2};separate_run_instructions={3};"
+        "parsed_types={4}"
+    )
 
     def __init__(
             self,
@@ -46,58 +90,316 @@ class DockerfileParser:
             parse_level: int = 1,
             separate_instructions: bool = False,
             separate_run_instructions: bool = False,
-            logger: logging.Logger = None
+            logger: logging.Logger = None,
+            lazy: bool = False,
+            error_tolerant: bool = False,
+            stats: ParseStatistics = None,
+            interner: NodeInterner = PROCESS_NODE_INTERNER,
+            include_types: Iterable[InstructionEnum] = None,
+            exclude_types: Iterable[InstructionEnum] = None
     ):
         self.__exclude_label_instructions: bool = exclude_label_instructions
-        if parse_level < 1 or 1 < parse_level:
-            raise ValueError("Illegal parse_level value (> 0): {0}".format(str(parse_level)))
+        # 構築する命令の種類（対象外の命令は構築しない．ただしFROM/ARG/ENV/SHELL命令は変数のスコープやシェルのために解析）
+        parsed_types: Set[InstructionEnum] = set(InstructionEnum) if include_types is None else set(include_types)
+        if exclude_types is not None:
+            parsed_types.difference_update(exclude_types)
+        if exclude_label_instructions:
+            parsed_types.difference_update([InstructionEnum.LABEL, InstructionEnum.MAINTAINER])
+        self.__parsed_types: FrozenSet[InstructionEnum] = frozenset(parsed_types)
+        if parse_level < 1 or 2 < parse_level:
+            raise ValueError("Illegal parse_level value (1 or 2): {0}".format(str(parse_level)))
         self.__parse_level: int = parse_level
         self.__separate_instructions: bool = separate_instructions
         self.__separate_run_instructions: bool = separate_run_instructions
+        # Trueの場合，命令の本体（ラベル・ポート・ファイルパス・変数の値など）は初回アクセス時に構築
+        # （error_tolerantの場合は構築の失敗を診断情報にするため，すぐに構築）
+        self.__lazy: bool = lazy
+        # Trueの間は，変数のスコープのためだけに解析する命令の本体を初回アクセス時に構築
+        self.__scope_only: bool = False
+        # Trueの場合，parseできない命令は例外を投げずに診断情報として記録し，汎用の命令ノードで代替
+        self.__error_tolerant: bool = error_tolerant
+        # Noneでない場合，フェーズごとの処理時間や各種カウンタを計測
+        self.__stats: ParseStatistics = stats
+        # 定数のみからなる値ノードを共有するintern表（Noneの場合は共有しない）
+        self.__interner: NodeInterner = interner
         if logger is None:
-            self.__logger: logging.Logger = dockerfile_ast.utils.init_logger(logging.WARNING, None, logging.WARNING)
+            self.__logger: logging.Logger = dockerfile_ast.utils.default_logger()
         else:
             self.__logger: logging.Logger = logger
 
+        # 出力されないデバッグログのためにメッセージを生成しないよう，parseごとにレベルを確認
+        self.__debug_enabled: bool = False
         self.__filename: str = None
         self.__raw_code: str = None
         self.__cst: Tuple[dockerfile.Command] = None
+        # 命令の行番号ごとのヒアドキュメント
+        self.__heredocs: Dict[int, Tuple[Heredoc, ...]] = dict()
         # ARG変数の辞書型（変数名がキー）
         self.__arg_variables: Dict[str, BuildTimeVariable] = dict()
         # ENV変数の辞書型（変数名がキー）
         self.__env_variables: Dict[str, EnvironmentVariable] \
             = dockerfile_ast.dockerfile_items.bash_items.utils.init_environment_variables()
+        # 最初のFROM命令より前に宣言されたARG変数の辞書型（最初のFROM命令までNone）
+        self.__global_arg_variables: Dict[str, BuildTimeVariable] = None
+        # ビルドステージ名（小文字）ごとのENV変数の辞書型
+        self.__stage_env_variables: Dict[str, Dict[str, EnvironmentVariable]] = dict()
+        # シェル形式の命令を実行するシェル，ビルドステージ名（小文字）ごとのシェル
+        self.__shell: Tuple[str, ...] = _DEFAULT_SHELL
+        self.__stage_shells: Dict[str, Tuple[str, ...]] = dict()
+        self.__stage_name: str = None
+
+    @property
+    def parsed_types(self) -> FrozenSet[InstructionEnum]:
+        """
+        Returns
+        -------
+        __parsed_types : FrozenSet[InstructionEnum]
+            Types of Dockerfile Instructions whose nodes are built.
+        """
+        return self.__parsed_types
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Returns
+        -------
+        fingerprint : str
+            Fingerprint of the options changing Dockerfile ASTs this parser builds,
+            so that Dockerfile ASTs cached by a parser with other options are not reused.
+            Lazy mode, statistics and interning do not change Dockerfile ASTs, so they are not a part of it.
+        """
+        parsed_type_names: str = ",".join(sorted(item.value for item in self.__parsed_types))
+        return self.__FINGERPRINT_FORMAT.format(
+            self.__parse_level, self.__error_tolerant, self.__separate_instructions, self.__separate_run_instructions,
+            parsed_type_names
+        )
+
+    @property
+    def stats(self) -> ParseStatistics:
+        """
+        Returns
+        -------
+        __stats : ParseStatistics or None
+            Statistics of parsing Dockerfiles (None if not instrumented).
+        """
+        return self.__stats
 
     def parse(self, raw_code: str) -> DockerfileAST:
+        self.__debug_enabled = self.__logger.isEnabledFor(logging.DEBUG)
         self.__filename = None
         self.__raw_code = raw_code
-        self.__cst = dockerfile.parse_string(raw_code)
+        cst_code, self.__heredocs = self.__measure(ParseStatistics.CST_PHASE, strip_heredoc_bodies, raw_code)
+        self.__cst = self.__parse_cst(cst_code, dockerfile.parse_string, cst_code)
         self.__arg_variables = dict()
         self.__env_variables = dockerfile_ast.dockerfile_items.bash_items.utils.init_environment_variables()
+        self.__global_arg_variables = None
+        self.__stage_env_variables = dict()
+        self.__shell = _DEFAULT_SHELL
+        self.__stage_shells = dict()
+        self.__stage_name = None
         return self.__parse_instructions()
 
     def parse_file(self, filename: str) -> DockerfileAST:
+        self.__debug_enabled = self.__logger.isEnabledFor(logging.DEBUG)
         self.__filename = filename
         with open(filename) as fp:
             self.__raw_code = fp.read()
-        self.__cst = dockerfile.parse_file(filename)
+        cst_code, self.__heredocs = self.__measure(ParseStatistics.CST_PHASE, strip_heredoc_bodies, self.__raw_code)
+        if len(self.__heredocs) > 0:
+            self.__cst = self.__parse_cst(cst_code, dockerfile.parse_string, cst_code)
+        else:
+            self.__cst = self.__parse_cst(cst_code, dockerfile.parse_file, filename)
         self.__arg_variables = dict()
         self.__env_variables = dockerfile_ast.dockerfile_items.bash_items.utils.init_environment_variables()
+        self.__global_arg_variables = None
+        self.__stage_env_variables = dict()
+        self.__shell = _DEFAULT_SHELL
+        self.__stage_shells = dict()
+        self.__stage_name = None
         return self.__parse_instructions()
 
+    def parse_columnar(self, raw_code: str, string_table: StringTable = None) -> ColumnarDockerfileAST:
+        """
+        Parse Dockerfile into a columnar AST without building nodes of Dockerfile Instructions.
+
+        Parameters
+        ----------
+        raw_code : str
+            Dockerfile source code.
+        string_table : StringTable or None
+            String table shared by columnar ASTs of a corpus (a new table if None).
+
+        Returns
+        -------
+        columnar_ast : ColumnarDockerfileAST
+            Columnar Dockerfile AST.
+        """
+        cst: Tuple[dockerfile.Command] = self.__parse_columnar_cst(raw_code)
+        return self.__build_columnar_ast(cst, raw_code, None, string_table)
+
+    def parse_file_columnar(self, filename: str, string_table: StringTable = None) -> ColumnarDockerfileAST:
+        """
+        Parse Dockerfile into a columnar AST without building nodes of Dockerfile Instructions.
+
+        Parameters
+        ----------
+        filename : str
+            Dockerfile name.
+        string_table : StringTable or None
+            String table shared by columnar ASTs of a corpus (a new table if None).
+
+        Returns
+        -------
+        columnar_ast : ColumnarDockerfileAST
+            Columnar Dockerfile AST.
+        """
+        with open(filename) as fp:
+            raw_code: str = fp.read()
+        cst: Tuple[dockerfile.Command] = self.__parse_columnar_cst(raw_code)
+        return self.__build_columnar_ast(cst, raw_code, filename, string_table)
+
+    def __parse_cst(self, cst_code: str, cst_parser: Callable, *args) -> Sequence:
+        """
+        Parse Dockerfile source code into CST by `cst_parser`.
+
+        In error-tolerant mode, if the whole source code cannot be parsed (``GoParseError``),
+        Dockerfile Instructions are parsed one by one, and Dockerfile Instructions which cannot be parsed
+        are replaced by their diagnostics (``ParseDiagnostic``).
+        """
+        try:
+            return self.__measure(ParseStatistics.CST_PHASE, cst_parser, *args)
+        except GoParseError:
+            if not self.__error_tolerant:
+                raise
+        cst: List[Union[dockerfile.Command, ParseDiagnostic]] = list()
+        escape_directive, chunks = _split_instruction_sources(cst_code)
+        for line_num, chunk in chunks:
+            try:
+                chunk_cst: Tuple[dockerfile.Command] = self.__measure(
+                    ParseStatistics.CST_PHASE, dockerfile.parse_string, escape_directive + chunk
+                )
+            except GoParseError as e:
+                instruction: Instruction = Instruction(line_num, chunk.strip())
+                cst.append(ParseDiagnostic(line_num, str(e), instruction))
+                continue
+            # 命令ごとに解析したCSTの行番号を元のソースコードの行番号に変換
+            line_num_offset: int = line_num - 1 - escape_directive.count("\n")
+            cst.extend([
+                cst_instruction._replace(
+                    start_line=cst_instruction.start_line + line_num_offset,
+                    end_line=cst_instruction.end_line + line_num_offset
+                )
+                for cst_instruction in chunk_cst
+            ])
+        return cst
+
+    def __parse_columnar_cst(self, raw_code: str) -> Tuple[dockerfile.Command]:
+        # ヒアドキュメントの本体は列指向ASTの行にしない（ノードも構築しない）
+        cst_code, _ = self.__measure(ParseStatistics.CST_PHASE, strip_heredoc_bodies, raw_code)
+        return self.__measure(ParseStatistics.CST_PHASE, dockerfile.parse_string, cst_code)
+
+    def __build_columnar_ast(
+            self,
+            cst: Tuple[dockerfile.Command],
+            raw_code: str,
+            filename: str,
+            string_table: StringTable
+    ) -> ColumnarDockerfileAST:
+        if string_table is None:
+            string_table = StringTable()
+        if len(self.__parsed_types) < len(InstructionEnum):
+            # 対象外の種類の命令を除外（未定義の命令は除外しない）
+            excluded_names: Set[str] = {item.value for item in InstructionEnum if item not in self.__parsed_types}
+            cst = [cst_instruction for cst_instruction in cst if cst_instruction.cmd.upper() not in excluded_names]
+        columnar_ast: ColumnarDockerfileAST = ColumnarDockerfileAST.from_cst(cst, raw_code, string_table)
+        if self.__stats is not None:
+            self.__stats.add_file(filename, len(raw_code.encode("utf-8")))
+        return columnar_ast
+
     def __parse_instructions(self) -> DockerfileAST:
         instructions: List[Instruction] = list()
+        diagnostics: List[ParseDiagnostic] = list()
         for cst_instruction in self.__cst:
-            tmp: List[Instruction] = self.__parse_instruction(cst_instruction)
+            if isinstance(cst_instruction, ParseDiagnostic):
+                # CSTに解析できなかった命令
+                diagnostics.append(cst_instruction)
+                instructions.append(cst_instruction.instruction)
+                continue
+            if self.__stats is not None:
+                start: float = time.perf_counter()
+                measured_seconds: float = self.__measured_seconds()
+            if self.__error_tolerant:
+                tmp: List[Instruction] = self.__parse_instruction_tolerantly(cst_instruction, diagnostics)
+            else:
+                tmp: List[Instruction] = self.__parse_selected_instruction(cst_instruction)
+            if self.__stats is not None:
+                elapsed_seconds: float = time.perf_counter() - start
+                self.__stats.add_instruction(cst_instruction.cmd.upper(), elapsed_seconds)
+                # bashlex・正規表現・CSTのフェーズ以外をノード構築の時間とみなす
+                self.__stats.add_phase_seconds(
+                    ParseStatistics.NODE_PHASE, elapsed_seconds - (self.__measured_seconds() - measured_seconds)
+                )
             if tmp is None:
                 # Skip instructions not subject to parse
                 continue
             instructions.extend(tmp)
-        return DockerfileAST(instructions, self.__raw_code)
+        if self.__stats is not None:
+            self.__stats.add_file(self.__filename, len(self.__raw_code.encode("utf-8")))
+        return DockerfileAST(instructions, self.__raw_code, diagnostics)
+
+    def __parse_instruction_tolerantly(
+            self,
+            cst_instruction: dockerfile.Command,
+            diagnostics: List[ParseDiagnostic]
+    ) -> List[Instruction]:
+        # 失敗した命令が途中まで追加した変数を取り消せるよう，スコープを退避（ARG/ENVはコピーオンライトのため参照のみ）
+        arg_variables: Dict[str, BuildTimeVariable] = self.__arg_variables
+        env_variables: Dict[str, EnvironmentVariable] = self.__env_variables
+        try:
+            return self.__parse_selected_instruction(cst_instruction)
+        except (ValueError, bashlex.errors.ParsingError) as e:
+            # GoParseErrorはValueErrorのサブクラス
+            self.__arg_variables = arg_variables
+            self.__env_variables = env_variables
+            instruction: Instruction = Instruction(cst_instruction.start_line, cst_instruction.original)
+            if isinstance(e, bashlex.errors.ParsingError):
+                message: str = e.message
+            else:
+                # 診断情報は行番号を持つため，エラーメッセージから位置情報を除去
+                message: str = str(e)
+                position: str = _error_position(cst_instruction.start_line, self.__filename)
+                if message.startswith(position):
+                    message = message[len(position):]
+            diagnostics.append(ParseDiagnostic(cst_instruction.start_line, message, instruction))
+            return [instruction]
+
+    def __parse_selected_instruction(self, cst_instruction: dockerfile.Command) -> List[Instruction]:
+        instruction_enum = InstructionEnum.of(cst_instruction.cmd)
+        if instruction_enum in self.__parsed_types:
+            return self.__parse_instruction(cst_instruction)
+        if instruction_enum in _SCOPE_INSTRUCTION_TYPES:
+            # 後続の命令が参照する変数のスコープを更新（本体は参照されるまで構築しない）
+            self.__scope_only = True
+            try:
+                self.__parse_instruction(cst_instruction)
+            finally:
+                self.__scope_only = False
+        return None
 
     def __parse_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int = 0) -> List[Instruction]:
-        self.__logger.debug(repr(cst_instruction))
+        if self.__debug_enabled:
+            self.__logger.debug(
+                "%s instruction: %r", cst_instruction.cmd, cst_instruction,
+                extra={"dockerfile": self.__filename, "line_num": cst_instruction.start_line + line_num_offset}
+            )
         instruction_enum = InstructionEnum.of(cst_instruction.cmd)
+        if len(cst_instruction.value) < _MINIMUM_ARGUMENT_COUNTS.get(instruction_enum, 0):
+            _raise_go_parse_error(
+                "{0} requires at least {1} argument(s)".format(
+                    instruction_enum.value, _MINIMUM_ARGUMENT_COUNTS[instruction_enum]
+                ),
+                cst_instruction.start_line + line_num_offset, self.__filename
+            )
         if instruction_enum == InstructionEnum.FROM:
             # FROM instruction
             return self.__parse_from_instruction(cst_instruction, line_num_offset)
@@ -163,7 +465,6 @@ class DockerfileParser:
 
     def __parse_from_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[FROMInstruction]:
-        # TODO: Need to implement
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
 
@@ -173,11 +474,41 @@ class DockerfileParser:
         FROM [--platform=<platform>] <image>[@<digest>] [AS <name>]
         """
 
-        return [FROMInstruction(line_num + line_num_offset, raw_code)]
+        if self.__global_arg_variables is None:
+            self.__global_arg_variables = self.__arg_variables
+        # FROM命令はグローバルなARG変数のみ参照可能
+        arg_variables: Dict[str, BuildTimeVariable] = self.__global_arg_variables
+
+        params: Tuple[str] = cst_instruction.value
+        if len(params) == 3 and params[1].upper() == "AS":
+            str_as_name: str = params[2]
+        elif len(params) == 1:
+            str_as_name = None
+        else:
+            _raise_go_parse_error("FROM requires either one or three arguments", line_num, self.__filename)
+        str_platform: str = _find_flag_value(cst_instruction.flags, "platform")
+        str_name, str_tag, str_digest = _split_image_reference(params[0])
+        image: DockerImage = self.__build(functools.partial(
+            _parse_docker_image,
+            str_name, str_tag, str_digest, str_as_name, str_platform, arg_variables, self.__stats, self.__interner
+        ))
+
+        # 新しいビルドステージ：ARG変数はリセットし，ENV変数とシェルはベースとなるステージから継承
+        if self.__stage_name is not None:
+            self.__stage_env_variables[self.__stage_name] = self.__env_variables
+            self.__stage_shells[self.__stage_name] = self.__shell
+        self.__stage_name = None if str_as_name is None else str_as_name.lower()
+        self.__arg_variables = dict()
+        if str_tag is None and str_digest is None and params[0].lower() in self.__stage_env_variables:
+            self.__env_variables = self.__stage_env_variables[params[0].lower()]
+            self.__shell = self.__stage_shells[params[0].lower()]
+        else:
+            self.__env_variables = dockerfile_ast.dockerfile_items.bash_items.utils.init_environment_variables()
+            self.__shell = _DEFAULT_SHELL
+        return [FROMInstruction(image, line_num, raw_code)]
 
     def __parse_run_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[RUNInstruction]:
-        # TODO: Need to implement
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
 
@@ -186,11 +517,13 @@ class DockerfileParser:
         RUN ["executable", "param1", "param2"]  # exec form
         """
 
-        return [RUNInstruction(line_num, raw_code)]
+        return [RUNInstruction(
+            line_num, raw_code, self.__shell_form_script(cst_instruction), self.__heredocs.get(line_num),
+            self.__build_argv(cst_instruction), cst_instruction.json
+        )]
 
     def __parse_cmd_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[CMDInstruction]:
-        # TODO: Need to implement
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
 
@@ -200,121 +533,105 @@ class DockerfileParser:
         CMD command param1 param2  # shell form
         """
 
-        return [CMDInstruction(line_num, raw_code)]
+        return [CMDInstruction(
+            line_num, raw_code, self.__shell_form_script(cst_instruction), self.__build_argv(cst_instruction),
+            cst_instruction.json
+        )]
 
     def __parse_label_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[LABELInstruction]:
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
 
-        instructions: List[LABELInstruction] = list()
-        docker_labels: List[DockerLabel] = list()
-
         # イテレータを使ってリストから2個ずつ取得（変数名->変数の値の順で格納されているため）
         value_iterator = iter(cst_instruction.value)
-        for label_name, str_value in zip(value_iterator, value_iterator):
-            label_value: BashValueNode = BashParser.simple_parse_bash_concat(
-                str_value, self.__arg_variables, self.__env_variables
-            )
-            docker_labels.append(DockerLabel(label_name, label_value))
-            if self.__separate_instructions:
-                instructions.append(LABELInstruction(docker_labels, line_num, raw_code))
-                docker_labels.clear()
-        if not self.__separate_instructions:
-            instructions.append(LABELInstruction(docker_labels, line_num, raw_code))
-        return instructions
+        label_params: List[Tuple[str, str]] = list(zip(value_iterator, value_iterator))
+        return [
+            LABELInstruction(self.__build_in_scope(_parse_docker_labels, params), line_num, raw_code)
+            for params in self.__group_params(label_params)
+        ]
 
     def __parse_maintainer_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[LABELInstruction]:
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
 
-        maintainer_name: BashValueNode = BashParser.simple_parse_bash_concat(
-            cst_instruction.value[0], self.__arg_variables, self.__env_variables
-        )
-        docker_label: DockerLabel = DockerLabel(DockerLabel.MAINTAINER_NAME, maintainer_name)
-        return [LABELInstruction([docker_label], line_num, raw_code)]
+        label_params: List[Tuple[str, str]] = [(DockerLabel.MAINTAINER_NAME, cst_instruction.value[0])]
+        docker_labels: Tuple[DockerLabel, ...] = self.__build_in_scope(_parse_docker_labels, label_params)
+        return [LABELInstruction(docker_labels, line_num, raw_code)]
 
     def __parse_expose_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[EXPOSEInstruction]:
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
 
-        docker_ports: List[DockerPort] = list()
-        instructions: List[EXPOSEInstruction] = list()
         for str_value in cst_instruction.value:
-            tokens: str = str_value.split("/")
-            if len(tokens) < 2:
-                port_num: BashValueNode = BashParser.simple_parse_bash_concat(
-                    str_value, self.__arg_variables, self.__env_variables
-                )
-                protocol = None
-                docker_ports.append(DockerPort(port_num, protocol))
-            elif len(tokens[1]) < 1:
+            tokens: List[str] = str_value.split("/")
+            if len(tokens) > 1 and len(tokens[1]) < 1:
                 _raise_go_parse_error("Protocol is not declared.", line_num, self.__filename)
-            else:
-                port_num: BashValueNode = BashParser.simple_parse_bash_concat(
-                    tokens[0], self.__arg_variables, self.__env_variables
+            port_range_match = _PORT_RANGE_PATTERN.fullmatch(tokens[0])
+            if port_range_match is not None \
+                    and not int(port_range_match.group(1)) <= int(port_range_match.group(2)) <= _MAX_PORT_NUM:
+                _raise_go_parse_error(
+                    "Invalid range specified for the Container port: " + tokens[0], line_num, self.__filename
                 )
-                protocol: BashValueNode = BashParser.simple_parse_bash_concat(
-                    tokens[1], self.__arg_variables, self.__env_variables
-                )
-                docker_ports.append(DockerPort(port_num, protocol))
-            if self.__separate_instructions:
-                instructions.append(EXPOSEInstruction(docker_ports, line_num, raw_code))
-                docker_ports.clear()
-        if not self.__separate_instructions:
-            instructions.append(EXPOSEInstruction(docker_ports, line_num, raw_code))
-        return instructions
+        return [
+            EXPOSEInstruction(self.__build_in_scope(_parse_docker_ports, str_values), line_num, raw_code)
+            for str_values in self.__group_params(cst_instruction.value)
+        ]
 
     def __parse_env_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[ENVInstruction]:
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
 
-        instructions: List[ENVInstruction] = list()
-        variables: List[EnvironmentVariable] = list()
-
         param_iterator = iter(cst_instruction.value)
-        for variable_name, str_value in zip(param_iterator, param_iterator):
-            # 右辺の変数代入値からparse
-            variable_value: BashValueNode = BashParser.simple_parse_bash_concat(
-                str_value, self.__arg_variables, self.__env_variables
-            )
+        env_params: List[Tuple[str, str]] = list(zip(param_iterator, param_iterator))
+        # 右辺の変数代入値からparse（同一ENV命令内の変数参照は，この命令より前の変数の値を参照する）
+        variable_values: List[BashValueNode] = [
+            self.__build_in_scope(BashParser.simple_parse_bash_concat, str_value) for _, str_value in env_params
+        ]
+        # 以前の命令が参照するスコープを書き換えないよう，コピーしてから変数を追加
+        self.__env_variables = self.__env_variables.copy()
+
+        variables: List[EnvironmentVariable] = list()
+        for (variable_name, _), variable_value in zip(env_params, variable_values):
             # 宣言済みか否かにかかわらず，新しくENV変数ノードを追加．
             variable: EnvironmentVariable = EnvironmentVariable(variable_name, variable_value)
             self.__env_variables[variable_name] = variable
             variables.append(variable)
-            if self.__separate_instructions:
-                instructions.append(ENVInstruction(variables, line_num, raw_code))
-                variables.clear()
-        if not self.__separate_instructions:
-            instructions.append(ENVInstruction(variables, line_num, raw_code))
-        return instructions
+        return [
+            ENVInstruction(grouped_variables, line_num, raw_code)
+            for grouped_variables in self.__group_params(variables)
+        ]
 
     def __parse_add_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[ADDInstruction]:
         # Todo: Need to implement parse options `--chown=<user>:<group>`
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
-        source_filepath, destination_filepaths = _parse_source_and_destination_filepaths(
-            cst_instruction.value, self.__arg_variables, self.__env_variables
-        )
-        return [ADDInstruction(source_filepath, destination_filepaths, line_num, raw_code)]
+        heredocs: Tuple[Heredoc, ...] = self.__heredocs.get(line_num)
+        str_source, str_destinations = _split_filepath_params(cst_instruction.value, heredocs)
+        source_filepath: Filepath = None if str_source is None else self.__build_in_scope(_parse_filepath, str_source)
+        destination_filepaths: Tuple[Filepath, ...] = self.__build_in_scope(_parse_filepaths, str_destinations)
+        return [ADDInstruction(source_filepath, destination_filepaths, line_num, raw_code, heredocs)]
 
     def __parse_copy_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[COPYInstruction]:
         # Todo: Need to implement parse options `--chown=<user>:<group>`
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
-        source_filepath, destination_filepaths = _parse_source_and_destination_filepaths(
-            cst_instruction.value, self.__arg_variables, self.__env_variables
+        heredocs: Tuple[Heredoc, ...] = self.__heredocs.get(line_num)
+        str_source, str_destinations = _split_filepath_params(cst_instruction.value, heredocs)
+        source_filepath: Filepath = None if str_source is None else self.__build_in_scope(_parse_filepath, str_source)
+        destination_filepaths: Tuple[Filepath, ...] = self.__build_in_scope(_parse_filepaths, str_destinations)
+        from_stage: BashValueNode = self.__build_in_scope(
+            BashParser.simple_parse_bash_concat, _find_flag_value(cst_instruction.flags, "from")
         )
-        return [COPYInstruction(source_filepath, destination_filepaths, line_num, raw_code)]
+        return [COPYInstruction(source_filepath, destination_filepaths, line_num, raw_code, from_stage, heredocs)]
 
     def __parse_entrypoint_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[ENTRYPOINTInstruction]:
-        # TODO: Need to implement
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
 
@@ -323,30 +640,22 @@ class DockerfileParser:
         ENTRYPOINT command param1 param2 # shell form
         """
 
-        return [ENTRYPOINTInstruction(line_num, raw_code)]
+        return [ENTRYPOINTInstruction(
+            line_num, raw_code, self.__shell_form_script(cst_instruction), self.__build_argv(cst_instruction),
+            cst_instruction.json
+        )]
 
     def __parse_volume_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[VOLUMEInstruction]:
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
-
-        filepaths: List[Filepath] = list()
-        instructions: List[VOLUMEInstruction] = list()
-        for str_value in cst_instruction.value:
-            value: BashValueNode = BashParser.simple_parse_bash_concat(
-                str_value, self.__arg_variables, self.__env_variables
-            )
-            filepaths.append(Filepath(value))
-            if self.__separate_instructions:
-                instructions.append(VOLUMEInstruction(filepaths, line_num, raw_code))
-                filepaths.clear()
-        if not self.__separate_instructions:
-            instructions.append(VOLUMEInstruction(filepaths, line_num, raw_code))
-        return instructions
+        return [
+            VOLUMEInstruction(self.__build_in_scope(_parse_filepaths, str_values), line_num, raw_code)
+            for str_values in self.__group_params(cst_instruction.value)
+        ]
 
     def __parse_user_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[USERInstruction]:
-        # TODO: Need to implement
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
 
@@ -355,16 +664,21 @@ class DockerfileParser:
         USER <UID>[:<GID>]
         """
 
-        return [USERInstruction(line_num, raw_code)]
+        if len(cst_instruction.value) != 1:
+            _raise_go_parse_error("USER requires exactly one argument", line_num, self.__filename)
+        str_user, str_group = _split_user_group(cst_instruction.value[0])
+        if len(str_user) < 1:
+            _raise_go_parse_error("USER requires a user name or UID", line_num, self.__filename)
+        user: BashValueNode = self.__build_in_scope(BashParser.simple_parse_bash_concat, str_user)
+        group: BashValueNode = self.__build_in_scope(BashParser.simple_parse_bash_concat, str_group)
+        return [USERInstruction(user, group, line_num, raw_code)]
 
     def __parse_workdir_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[WORKDIRInstruction]:
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
-        value: BashValueNode = BashParser.simple_parse_bash_concat(
-            cst_instruction.value[0], self.__arg_variables, self.__env_variables
-        )
-        return [WORKDIRInstruction(Filepath(value), line_num, raw_code)]
+        work_dir: Filepath = self.__build_in_scope(_parse_filepath, cst_instruction.value[0])
+        return [WORKDIRInstruction(work_dir, line_num, raw_code)]
 
     def __parse_arg_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[ARGInstruction]:
@@ -373,8 +687,11 @@ class DockerfileParser:
 
         # '='がある場合とない場合で処理を分岐
         if len(cst_instruction.value) < 2:
-            tokens = cst_instruction.value[0].split("=")
-            self.__logger.debug(tokens)
+            tokens = cst_instruction.value[0].split("=", 1)
+            if self.__debug_enabled:
+                self.__logger.debug(
+                    "ARG tokens: %s", tokens, extra={"dockerfile": self.__filename, "line_num": line_num}
+                )
             variable_name = tokens[0]
             if len(tokens) > 1:
                 # '='がある場合
@@ -386,15 +703,25 @@ class DockerfileParser:
             variable_name = cst_instruction.value[0]
             str_value = cst_instruction.value[1]
 
+        if str_value is None and self.__global_arg_variables is not None \
+                and variable_name in self.__global_arg_variables.keys():
+            # グローバルなARG変数の再宣言はそのデフォルト値を引き継ぐ
+            value: BashValueNode = self.__build(functools.partial(
+                getattr, self.__global_arg_variables[variable_name], "value"
+            ))
+        else:
+            value = None
+
         if variable_name in self.__env_variables.keys():
             _raise_go_parse_error(variable_name + " is Environment Variable.", line_num, self.__filename)
         elif variable_name in self.__arg_variables.keys():
             _raise_go_parse_error(variable_name + " is already declared.", line_num, self.__filename)
-        # 先に右辺をparse
-        value: BashValueNode = BashParser.simple_parse_bash_concat(
-            str_value, self.__arg_variables, self.__env_variables
-        )
+        if value is None and str_value is not None:
+            # 先に右辺をparse
+            value = self.__build_in_scope(BashParser.simple_parse_bash_concat, str_value)
         variable: BuildTimeVariable = BuildTimeVariable(variable_name, value)
+        # 以前の命令が参照するスコープを書き換えないよう，コピーしてから変数を追加
+        self.__arg_variables = self.__arg_variables.copy()
         self.__arg_variables[variable_name] = variable
         return [ARGInstruction(variable, line_num, raw_code)]
 
@@ -412,18 +739,23 @@ class DockerfileParser:
         param = re.sub(r"^[Oo][Nn][Bb][Uu][Ii][Ll][Dd]\s+", "", raw_code)
 
         # generate CST of an instruction this ONBUILD instruction has as a parameter
-        param_cst_instruction: dockerfile.Command = dockerfile.parse_string(param)[0]
+        param_cst_instruction: dockerfile.Command = self.__measure(
+            ParseStatistics.CST_PHASE, dockerfile.parse_string, param
+        )[0]
+        if self.__stats is not None:
+            self.__stats.count_reparse(InstructionEnum.ONBUILD.value)
+        # ONBUILD SHELLは子イメージのビルド時に実行されるため，このDockerfileのシェルは変更しない
+        shell: Tuple[str, ...] = self.__shell
         param_instructions: List[Instruction] = self.__parse_instruction(param_cst_instruction, line_num - 1)
+        self.__shell = shell
         return [ONBUILDInstruction(param_instructions, line_num, raw_code)]
 
     def __parse_stopsignal_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[STOPSIGNALInstruction]:
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
-        value: BashValueNode = BashParser.simple_parse_bash_concat(
-            cst_instruction.value[0], self.__arg_variables, self.__env_variables
-        )
-        return [STOPSIGNALInstruction(SystemCallSignal(value), line_num, raw_code)]
+        signal: SystemCallSignal = self.__build_in_scope(_parse_system_call_signal, cst_instruction.value[0])
+        return [STOPSIGNALInstruction(signal, line_num, raw_code)]
 
     def __parse_healthcheck_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[HEALTHCHECKInstruction]:
@@ -455,13 +787,16 @@ class DockerfileParser:
         if re.match(r"[Nn][Oo][Nn][Ee]", param):
             param_instructions = None
         else:
-            param_cst_instruction: dockerfile.Command = dockerfile.parse_string(param)[0]
+            param_cst_instruction: dockerfile.Command = self.__measure(
+                ParseStatistics.CST_PHASE, dockerfile.parse_string, param
+            )[0]
+            if self.__stats is not None:
+                self.__stats.count_reparse(InstructionEnum.HEALTHCHECK.value)
             param_instructions: List[Instruction] = self.__parse_instruction(param_cst_instruction, line_num - 1)
         return [HEALTHCHECKInstruction(param_instructions, line_num, raw_code)]
 
     def __parse_shell_instruction(self, cst_instruction: dockerfile.Command, line_num_offset: int) \
             -> List[SHELLInstruction]:
-        # TODO: Need to implement
         line_num: int = cst_instruction.start_line + line_num_offset
         raw_code: str = cst_instruction.original
 
@@ -469,35 +804,300 @@ class DockerfileParser:
         SHELL ["executable", "parameters"]
         """
 
-        return [SHELLInstruction(line_num, raw_code)]
+        if not cst_instruction.json:
+            _raise_go_parse_error("SHELL requires the arguments to be in JSON form", line_num, self.__filename)
+        elif len(cst_instruction.value) < 1:
+            _raise_go_parse_error("SHELL requires at least one argument", line_num, self.__filename)
+        # 後続のシェル形式の命令を実行するシェルを変更
+        self.__shell = tuple(cst_instruction.value)
+        return [SHELLInstruction(self.__build_argv(cst_instruction), line_num, raw_code)]
+
+    def __shell_form_script(self, cst_instruction: dockerfile.Command) -> str:
+        """
+        Return the shell script of shell form which is parsed lazily at parse level 2
+        (None if exec form or parse level 1).
+        """
+        if self.__parse_level < 2 or cst_instruction.json:
+            return None
+        return cst_instruction.value[0]
 
+    def __build_argv(self, cst_instruction: dockerfile.Command) -> Tuple[BashConstant, ...]:
+        """
+        Build the command line of exec form (JSON array decoded by ``dockerfile.parse_string``),
+        or of shell form run by the current shell.
+        """
+        if cst_instruction.json:
+            str_argv: Tuple[str, ...] = tuple(cst_instruction.value)
+        else:
+            str_argv: Tuple[str, ...] = self.__shell + tuple(cst_instruction.value[:1])
+        return self.__build(functools.partial(_parse_argv, str_argv, self.__interner))
 
-def _parse_source_and_destination_filepaths(
-        cst_instruction_params: List[str],
+    def __build(self, builder: Callable[[], Any]) -> Any:
+        """
+        Build a part of Dockerfile AST now, or on first access in lazy mode.
+        Scopes of ARG/ENV variables passed to `builder` must not be modified afterwards.
+        In error-tolerant mode, parts are always built now, so that their errors are recorded as diagnostics.
+        """
+        if (self.__lazy or self.__scope_only) and not self.__error_tolerant:
+            return LazyValue(builder)
+        return builder()
+
+    def __build_in_scope(self, function: Callable[..., Any], *args) -> Any:
+        """
+        Build a part of Dockerfile AST by `function(*args, arg_variables, env_variables, stats, interner)`
+        in the current scope of ARG/ENV variables.
+        """
+        return self.__build(functools.partial(
+            function, *args, self.__arg_variables, self.__env_variables, self.__stats, self.__interner
+        ))
+
+    def __measure(self, phase: str, function: Callable[..., Any], *args) -> Any:
+        """
+        Call a function, measuring its elapsed time if instrumented.
+        """
+        if self.__stats is None:
+            return function(*args)
+        return self.__stats.measure(phase, function, *args)
+
+    def __measured_seconds(self) -> float:
+        """
+        Return cumulative seconds of phases measured apart from building nodes.
+        """
+        phase_seconds: Dict[str, float] = self.__stats.phase_seconds
+        return sum(phase_seconds[phase] for phase in ParseStatistics.PHASES if phase != ParseStatistics.NODE_PHASE)
+
+    def __group_params(self, params: Sequence[Any]) -> List[List[Any]]:
+        """
+        Group parameters of an instruction into one group per instruction to be generated.
+        """
+        if self.__separate_instructions:
+            return [[param] for param in params]
+        return [list(params)]
+
+
+def _parse_docker_image(
+        str_name: str,
+        str_tag: str,
+        str_digest: str,
+        str_as_name: str,
+        str_platform: str,
         arg_variables: Dict[str, BuildTimeVariable],
-        env_variables: Dict[str, EnvironmentVariable]
-) -> Tuple[Filepath, List[Filepath]]:
-    param_iterator = iter(cst_instruction_params)
-    next_param: str = next(param_iterator)
-    value: BashValueNode = BashParser.simple_parse_bash_concat(next_param, arg_variables, env_variables)
-    source_filepath: Filepath = Filepath(value)
-
-    destination_filepaths: List[Filepath] = list()
-    while True:
-        try:
-            next_param: str = next(param_iterator)
-            value: BashValueNode = BashParser.simple_parse_bash_concat(next_param, arg_variables, env_variables)
-            destination_filepaths.append(Filepath(value))
-        except StopIteration:
-            break
-    return source_filepath, destination_filepaths
+        stats: ParseStatistics,
+        interner: NodeInterner
+) -> DockerImage:
+    name: BashValueNode = BashParser.simple_parse_bash_concat(str_name, arg_variables, None, stats, interner)
+    tag: BashValueNode = BashParser.simple_parse_bash_concat(str_tag, arg_variables, None, stats, interner)
+    digest: BashValueNode = BashParser.simple_parse_bash_concat(str_digest, arg_variables, None, stats, interner)
+    as_name: BashValueNode = BashParser.simple_parse_bash_concat(str_as_name, arg_variables, None, stats, interner)
+    platform: BashValueNode = BashParser.simple_parse_bash_concat(str_platform, arg_variables, None, stats, interner)
+    return DockerImage(name, tag, digest, as_name, platform)
+
+
+def _parse_docker_labels(
+        label_params: List[Tuple[str, str]],
+        arg_variables: Dict[str, BuildTimeVariable],
+        env_variables: Dict[str, EnvironmentVariable],
+        stats: ParseStatistics,
+        interner: NodeInterner
+) -> Tuple[DockerLabel, ...]:
+    docker_labels: List[DockerLabel] = list()
+    for label_name, str_value in label_params:
+        label_value: BashValueNode = BashParser.simple_parse_bash_concat(
+            str_value, arg_variables, env_variables, stats, interner
+        )
+        docker_labels.append(DockerLabel(label_name, label_value))
+    return tuple(docker_labels)
+
+
+def _parse_docker_ports(
+        str_values: List[str],
+        arg_variables: Dict[str, BuildTimeVariable],
+        env_variables: Dict[str, EnvironmentVariable],
+        stats: ParseStatistics,
+        interner: NodeInterner
+) -> Tuple[Union[DockerPort, DockerPortRange], ...]:
+    docker_ports: List[Union[DockerPort, DockerPortRange]] = list()
+    for str_value in str_values:
+        tokens: List[str] = str_value.split("/")
+        if len(tokens) < 2:
+            protocol = None
+        else:
+            protocol: BashValueNode = BashParser.simple_parse_bash_concat(
+                tokens[1], arg_variables, env_variables, stats, interner
+            )
+        port_range_match = _PORT_RANGE_PATTERN.fullmatch(tokens[0])
+        if port_range_match is not None:
+            # ポート範囲は展開せず，両端の整数のみ保持
+            docker_ports.append(
+                DockerPortRange(int(port_range_match.group(1)), int(port_range_match.group(2)), protocol)
+            )
+            continue
+        port_num: BashValueNode = BashParser.simple_parse_bash_concat(
+            tokens[0], arg_variables, env_variables, stats, interner
+        )
+        docker_ports.append(DockerPort(port_num, protocol) if interner is None else interner.port(port_num, protocol))
+    return tuple(docker_ports)
+
+
+def _parse_filepath(
+        str_value: str,
+        arg_variables: Dict[str, BuildTimeVariable],
+        env_variables: Dict[str, EnvironmentVariable],
+        stats: ParseStatistics,
+        interner: NodeInterner
+) -> Filepath:
+    value: BashValueNode = BashParser.simple_parse_bash_concat(str_value, arg_variables, env_variables, stats, interner)
+    return Filepath(value) if interner is None else interner.filepath(value)
+
+
+def _parse_filepaths(
+        str_values: List[str],
+        arg_variables: Dict[str, BuildTimeVariable],
+        env_variables: Dict[str, EnvironmentVariable],
+        stats: ParseStatistics,
+        interner: NodeInterner
+) -> Tuple[Filepath, ...]:
+    return tuple(_parse_filepath(str_value, arg_variables, env_variables, stats, interner) for str_value in str_values)
+
+
+def _parse_system_call_signal(
+        str_value: str,
+        arg_variables: Dict[str, BuildTimeVariable],
+        env_variables: Dict[str, EnvironmentVariable],
+        stats: ParseStatistics,
+        interner: NodeInterner
+) -> SystemCallSignal:
+    value: BashValueNode = BashParser.simple_parse_bash_concat(str_value, arg_variables, env_variables, stats, interner)
+    return SystemCallSignal(value)
+
+
+def _find_flag_value(flags: Tuple[str], flag_name: str) -> str:
+    """
+    Find the value of the flag `--<flag_name>=<value>` (None if not given).
+    """
+    prefix = "--" + flag_name + "="
+    for flag in flags:
+        if flag.lower().startswith(prefix):
+            return flag[len(prefix):]
+    return None
+
+
+def _split_image_reference(reference: str) -> Tuple[str, str, str]:
+    """
+    Split Docker image reference `<name>[:<tag>][@<digest>]` into its name, tag and digest.
+    Colons and at signs in `${...}` and in the registry host (e.g. `localhost:5000/foo`) are not separators.
+    """
+    # ${...}の内側の区切り文字は無視する
+    separator_indexes: List[int] = list()
+    depth: int = 0
+    for index, char in enumerate(reference):
+        if char == "{" and index > 0 and reference[index - 1] == "$":
+            depth += 1
+        elif char == "}" and depth > 0:
+            depth -= 1
+        elif depth == 0 and char in ":@/":
+            separator_indexes.append(index)
+
+    digest: str = None
+    at_indexes = [index for index in separator_indexes if reference[index] == "@"]
+    if len(at_indexes) > 0:
+        digest = reference[at_indexes[0] + 1:]
+        separator_indexes = [index for index in separator_indexes if index < at_indexes[0]]
+        reference = reference[:at_indexes[0]]
+    tag: str = None
+    if len(separator_indexes) > 0 and reference[separator_indexes[-1]] == ":":
+        tag = reference[separator_indexes[-1] + 1:]
+        reference = reference[:separator_indexes[-1]]
+    return reference, tag, digest
+
+
+def _parse_argv(str_argv: Tuple[str, ...], interner: NodeInterner) -> Tuple[BashConstant, ...]:
+    # 実行形式の引数は変数展開されない
+    if interner is None:
+        return tuple(BashConstant(str_arg) for str_arg in str_argv)
+    return tuple(interner.constant(str_arg) for str_arg in str_argv)
+
+
+def _split_user_group(str_value: str) -> Tuple[str, str]:
+    """
+    Split the argument of USER Instruction into the user and group at `:` outside of `${...}`.
+    The group is None if not declared or empty.
+    """
+    depth: int = 0
+    for index, char in enumerate(str_value):
+        if char == "{" and str_value[index - 1:index] == "$":
+            depth += 1
+        elif char == "}" and depth > 0:
+            depth -= 1
+        elif char == ":" and depth == 0:
+            return str_value[:index], str_value[index + 1:] or None
+    return str_value, None
+
+
+def _split_filepath_params(
+        str_values: Tuple[str, ...],
+        heredocs: Tuple[Heredoc, ...]
+) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Split arguments of ADD or COPY Instruction into the source and destinations excluding heredocs (`<<EOF`).
+    The source is None if all sources are heredocs.
+    """
+    if heredocs is not None:
+        str_values = tuple(str_value for str_value in str_values if not HEREDOC_PATTERN.fullmatch(str_value))
+        if len(str_values) < 2:
+            return None, str_values
+    return str_values[0], str_values[1:]
+
+
+def _split_instruction_sources(cst_code: str) -> Tuple[str, List[Tuple[int, str]]]:
+    """
+    Split Dockerfile source code into the source code of each Dockerfile Instruction,
+    joining lines continued by the escape character (with comment and empty lines between them).
+
+    Returns
+    -------
+    escape_directive, chunks : Tuple[str, List[Tuple[int, str]]]
+        Line of the escape parser directive to be prepended to each source code (empty if the default `\\`),
+        and line numbers and source code of Dockerfile Instructions.
+    """
+    escape: str = "\\"
+    escape_directive: str = ""
+    is_directive: bool = True
+    chunks: List[Tuple[int, str]] = list()
+    chunk_line_num: int = None
+    chunk_lines: List[str] = list()
+    for line_num, line in enumerate(cst_code.splitlines(keepends=True), 1):
+        stripped_line: str = line.strip()
+        if is_directive:
+            # パーサディレクティブは先頭のコメント行のみ
+            directive_match = _PARSER_DIRECTIVE_PATTERN.fullmatch(stripped_line)
+            is_directive = directive_match is not None
+            if is_directive and directive_match.group(1).lower() == "escape" and len(directive_match.group(2)) == 1:
+                escape = directive_match.group(2)
+                escape_directive = "# escape={0}\n".format(escape)
+        is_comment: bool = len(stripped_line) < 1 or stripped_line.startswith("#")
+        if len(chunk_lines) < 1:
+            if is_comment:
+                continue
+            chunk_line_num = line_num
+        chunk_lines.append(line)
+        if is_comment or stripped_line.endswith(escape):
+            continue
+        chunks.append((chunk_line_num, "".join(chunk_lines)))
+        chunk_lines = list()
+    if len(chunk_lines) > 0:
+        chunks.append((chunk_line_num, "".join(chunk_lines)))
+    return escape_directive, chunks
 
 
 def _raise_go_parse_error(msg: str, line_num: int, filename: str = None):
+    raise GoParseError(_error_position(line_num, filename) + msg)
+
+
+def _error_position(line_num: int, filename: str = None) -> str:
     if filename is None:
-        PARSE_ERROR_FORMAT = "{0}: {1}"
-        error_message = PARSE_ERROR_FORMAT.format(line_num, msg)
+        PARSE_ERROR_POSITION_FORMAT = "{0}: "
+        return PARSE_ERROR_POSITION_FORMAT.format(line_num)
     else:
-        PARSE_ERROR_FORMAT_FILENAME = "{0}: {1}: {2}"
-        error_message = PARSE_ERROR_FORMAT_FILENAME.format(filename, line_num, msg)
-    raise GoParseError(error_message)
+        PARSE_ERROR_POSITION_FORMAT_FILENAME = "{0}: {1}: "
+        return PARSE_ERROR_POSITION_FORMAT_FILENAME.format(filename, line_num)
@@ -0,0 +1,854 @@
+import ctypes
+import ctypes.util
+from enum import Enum
+import fnmatch
+import hashlib
+import logging
+import os
+import pickle
+import select
+import struct
+import time
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+import bashlex.errors
+
+from dockerfile_ast.dockerfile_ast import DockerfileAST
+from dockerfile_ast.dockerfile_parser import DockerfileParser
+from dockerfile_ast.utils import materialize_all
+
+
+# Dockerfileとみなすファイル名のパターン
+DOCKERFILE_PATTERNS: Tuple[str, ...] = ("Dockerfile", "Dockerfile.*", "*.Dockerfile", "*.dockerfile")
+
+
+class WatchEventType(Enum):
+    """
+    Enumerated kinds of changes of Dockerfiles in a watched directory.
+    """
+    ADDED = "ADDED"
+    REMOVED = "REMOVED"
+    MODIFIED = "MODIFIED"
+    FAILED = "FAILED"
+
+    def __str__(self):
+        return self.value
+
+
+class WatchEvent:
+    """
+    A change of a Dockerfile in a watched directory.
+
+    Attributes
+    ----------
+    __event_type : WatchEventType
+        Kind of this change.
+    __filename : str
+        Dockerfile name.
+    __dockerfile_ast : DockerfileAST
+        Dockerfile AST after this change (None if removed or failed).
+    __error : Exception
+        Error of reading or parsing the Dockerfile (None unless failed).
+    """
+    __REPR_FORMAT: str = "{0}(event_type={1}, filename={2}, error={3})"
+
+    def __init__(
+            self,
+            event_type: WatchEventType,
+            filename: str,
+            dockerfile_ast: DockerfileAST = None,
+            error: Exception = None
+    ):
+        """
+        Parameters
+        ----------
+        event_type : WatchEventType
+            Kind of this change.
+        filename : str
+            Dockerfile name.
+        dockerfile_ast : DockerfileAST or None
+            Dockerfile AST after this change (None if removed or failed).
+        error : Exception or None
+            Error of reading or parsing the Dockerfile (None unless failed).
+        """
+        self.__event_type: WatchEventType = event_type
+        self.__filename: str = filename
+        self.__dockerfile_ast: DockerfileAST = dockerfile_ast
+        self.__error: Exception = error
+
+    @property
+    def event_type(self) -> WatchEventType:
+        """
+        Returns
+        -------
+        __event_type : WatchEventType
+            Kind of this change.
+        """
+        return self.__event_type
+
+    @property
+    def filename(self) -> str:
+        """
+        Returns
+        -------
+        __filename : str
+            Dockerfile name.
+        """
+        return self.__filename
+
+    @property
+    def dockerfile_ast(self) -> DockerfileAST:
+        """
+        Returns
+        -------
+        __dockerfile_ast : DockerfileAST or None
+            Dockerfile AST after this change (None if removed or failed).
+        """
+        return self.__dockerfile_ast
+
+    @property
+    def error(self) -> Exception:
+        """
+        Returns
+        -------
+        __error : Exception or None
+            Error of reading or parsing the Dockerfile (None unless failed).
+        """
+        return self.__error
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(self.__event_type), repr(self.__filename), repr(self.__error)
+        )
+
+    def __str__(self):
+        if self.__error is not None:
+            return "{0} {1}: {2}".format(self.__event_type, self.__filename, self.__error)
+        return "{0} {1}".format(self.__event_type, self.__filename)
+
+
+class ParseCacheEntry:
+    """
+    A Dockerfile AST cached with the state of its Dockerfile.
+
+    Attributes
+    ----------
+    __mtime_ns : int
+        Modification time of the Dockerfile in nanoseconds.
+    __size : int
+        Size of the Dockerfile in bytes.
+    __digest : str
+        SHA-256 digest of the Dockerfile content.
+    __dockerfile_ast : DockerfileAST
+        Dockerfile AST (None if the Dockerfile failed to parse).
+    """
+    __REPR_FORMAT: str = "{0}(mtime_ns={1}, size={2}, digest={3})"
+
+    def __init__(self, mtime_ns: int, size: int, digest: str, dockerfile_ast: DockerfileAST):
+        """
+        Parameters
+        ----------
+        mtime_ns : int
+            Modification time of the Dockerfile in nanoseconds.
+        size : int
+            Size of the Dockerfile in bytes.
+        digest : str
+            SHA-256 digest of the Dockerfile content.
+        dockerfile_ast : DockerfileAST or None
+            Dockerfile AST (None if the Dockerfile failed to parse).
+        """
+        self.__mtime_ns: int = mtime_ns
+        self.__size: int = size
+        self.__digest: str = digest
+        self.__dockerfile_ast: DockerfileAST = dockerfile_ast
+
+    @property
+    def mtime_ns(self) -> int:
+        """
+        Returns
+        -------
+        __mtime_ns : int
+            Modification time of the Dockerfile in nanoseconds.
+        """
+        return self.__mtime_ns
+
+    @property
+    def size(self) -> int:
+        """
+        Returns
+        -------
+        __size : int
+            Size of the Dockerfile in bytes.
+        """
+        return self.__size
+
+    @property
+    def digest(self) -> str:
+        """
+        Returns
+        -------
+        __digest : str
+            SHA-256 digest of the Dockerfile content.
+        """
+        return self.__digest
+
+    @property
+    def dockerfile_ast(self) -> DockerfileAST:
+        """
+        Returns
+        -------
+        __dockerfile_ast : DockerfileAST or None
+            Dockerfile AST (None if the Dockerfile failed to parse).
+        """
+        return self.__dockerfile_ast
+
+    def is_fresh(self, stat_result: os.stat_result) -> bool:
+        """
+        Return True if the Dockerfile has the same modification time and size as cached.
+        """
+        return self.__mtime_ns == stat_result.st_mtime_ns and self.__size == stat_result.st_size
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(self.__mtime_ns), repr(self.__size), repr(self.__digest)
+        )
+
+
+class ParseCache:
+    """
+    A cache of Dockerfile ASTs (filename is the key) persisted by pickle, so that restarts of watch mode are warm.
+
+    The cache file records the fingerprint of parser options (``DockerfileParser.fingerprint``) next to its version,
+    and Dockerfile ASTs cached by a parser with other options are dropped instead of reused.
+    Bodies of Dockerfile Instructions parsed in lazy mode are built before saved.
+    Since the whole cache is pickled on each save, ``save_if_due`` saves at most once per `save_interval` seconds.
+
+    Attributes
+    ----------
+    __filename : str
+        Cache file name (not persisted if None).
+    __save_interval : float
+        Minimum interval in seconds between saves by ``save_if_due``.
+    __fingerprint : str
+        Fingerprint of options of the parser building cached Dockerfile ASTs (None if not bound to a parser).
+    __entries : Dict[str, ParseCacheEntry]
+        Cached Dockerfile ASTs (absolute Dockerfile name is the key).
+    __unsaved_filenames : Set[str]
+        Dockerfile names of entries put after loaded or saved, whose lazy values may not be built yet.
+    __is_modified : bool
+        True if entries have been modified after loaded or saved.
+    __saved_time : float
+        Time (``time.monotonic``) of the last save (None if not saved).
+    """
+    __REPR_FORMAT: str = "{0}(filename={1}, size={2}, fingerprint={3})"
+    __PICKLE_VERSION: int = 8
+
+    def __init__(self, filename: str = None, save_interval: float = 10.0):
+        """
+        Parameters
+        ----------
+        filename : str or None
+            Cache file name (not persisted if None).
+        save_interval : float
+            Minimum interval in seconds between saves by ``save_if_due``.
+        """
+        self.__filename: str = filename
+        self.__save_interval: float = save_interval
+        self.__fingerprint: str = None
+        self.__entries: Dict[str, ParseCacheEntry] = dict()
+        self.__unsaved_filenames: Set[str] = set()
+        self.__is_modified: bool = False
+        self.__saved_time: float = None
+
+    @property
+    def filename(self) -> str:
+        """
+        Returns
+        -------
+        __filename : str or None
+            Cache file name (not persisted if None).
+        """
+        return self.__filename
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Returns
+        -------
+        __fingerprint : str or None
+            Fingerprint of options of the parser building cached Dockerfile ASTs (None if not bound to a parser).
+        """
+        return self.__fingerprint
+
+    def bind(self, fingerprint: str):
+        """
+        Bind this cache to options of a parser, dropping entries cached by a parser with other options.
+
+        Parameters
+        ----------
+        fingerprint : str
+            Fingerprint of parser options (``DockerfileParser.fingerprint``).
+        """
+        if fingerprint == self.__fingerprint:
+            return
+        if len(self.__entries) > 0:
+            self.__entries = dict()
+            self.__unsaved_filenames = set()
+            self.__is_modified = True
+        self.__fingerprint = fingerprint
+
+    def get(self, filename: str) -> ParseCacheEntry:
+        """
+        Return the cached entry of a Dockerfile (None if not cached).
+        """
+        return self.__entries.get(filename)
+
+    def put(self, filename: str, entry: ParseCacheEntry):
+        """
+        Cache an entry of a Dockerfile.
+        """
+        self.__entries[filename] = entry
+        self.__unsaved_filenames.add(filename)
+        self.__is_modified = True
+
+    def remove(self, filename: str):
+        """
+        Remove the cached entry of a Dockerfile if exists.
+        """
+        if self.__entries.pop(filename, None) is not None:
+            self.__unsaved_filenames.discard(filename)
+            self.__is_modified = True
+
+    def filenames(self) -> List[str]:
+        """
+        Return Dockerfile names of cached entries.
+        """
+        return list(self.__entries)
+
+    def load(self) -> bool:
+        """
+        Load entries from the cache file.
+
+        If this cache is bound to parser options, entries cached by a parser with other options are not loaded,
+        otherwise this cache is bound to the parser options of the cache file.
+
+        Returns
+        -------
+        is_loaded : bool
+            True if loaded (False if the cache file does not exist, is incompatible or has other parser options).
+        """
+        if self.__filename is None or not os.path.isfile(self.__filename):
+            return False
+        try:
+            with open(self.__filename, "rb") as fp:
+                version, fingerprint, entries = pickle.load(fp)
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, ImportError, pickle.UnpicklingError):
+            return False
+        if version != self.__PICKLE_VERSION:
+            return False
+        if self.__fingerprint is not None and fingerprint != self.__fingerprint:
+            return False
+        self.__fingerprint = fingerprint
+        self.__entries = entries
+        self.__unsaved_filenames = set()
+        self.__is_modified = False
+        return True
+
+    def save(self):
+        """
+        Save entries into the cache file if modified (atomically replacing the cache file).
+        """
+        if self.__filename is None or not self.__is_modified:
+            return
+        # 前回の保存以降に追加されたASTのみ，遅延構築された値を構築（構築前の値はCSTを参照しpickleできない）
+        for filename in self.__unsaved_filenames:
+            dockerfile_ast: DockerfileAST = self.__entries[filename].dockerfile_ast
+            materialize_all((dockerfile_ast.instructions, dockerfile_ast.diagnostics))
+        directory: str = os.path.dirname(self.__filename)
+        if len(directory) > 0:
+            os.makedirs(directory, exist_ok=True)
+        tmp_filename: str = "{0}.{1}.tmp".format(self.__filename, os.getpid())
+        with open(tmp_filename, "wb") as fp:
+            pickle.dump(
+                (self.__PICKLE_VERSION, self.__fingerprint, self.__entries), fp, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(tmp_filename, self.__filename)
+        self.__unsaved_filenames = set()
+        self.__is_modified = False
+        self.__saved_time = time.monotonic()
+
+    def save_if_due(self) -> bool:
+        """
+        Save entries into the cache file if modified and `save_interval` seconds have passed since the last save,
+        so that a burst of changes is saved at once.
+
+        Returns
+        -------
+        is_saved : bool
+            True if saved.
+        """
+        if self.__filename is None or not self.__is_modified:
+            return False
+        if self.__saved_time is not None and time.monotonic() - self.__saved_time < self.__save_interval:
+            return False
+        self.save()
+        return True
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(self.__filename), repr(len(self.__entries)), repr(self.__fingerprint)
+        )
+
+
+class DockerfileIndex:
+    """
+    An index of Dockerfile ASTs in a directory tree, which re-parses only changed Dockerfiles.
+
+    A Dockerfile is re-parsed only if its modification time or size changed and its SHA-256 digest changed.
+    The cache is bound to options of the parser, so that Dockerfile ASTs built with other options are not reused,
+    and saved by ``ParseCache.save_if_due`` after each scan (call ``ParseCache.save`` to save pending changes).
+    Dockerfile ASTs parsed in lazy mode are built when indexed, so that Dockerfiles whose Instructions cannot be built
+    are reported as FAILED events instead of failing on access or on save.
+    Dockerfiles failed to parse are recorded with their state, and reported again only after their content changes.
+
+    Attributes
+    ----------
+    __directory : str
+        Absolute name of the indexed directory.
+    __parser : DockerfileParser
+        Parser of Dockerfiles.
+    __cache : ParseCache
+        Cache of Dockerfile ASTs shared with restarts.
+    __patterns : Tuple[str, ...]
+        Patterns of Dockerfile names.
+    __entries : Dict[str, ParseCacheEntry]
+        Indexed Dockerfile ASTs (absolute Dockerfile name is the key).
+    __failed_entries : Dict[str, ParseCacheEntry]
+        States of Dockerfiles failed to parse, without Dockerfile ASTs (absolute Dockerfile name is the key).
+    """
+    __REPR_FORMAT: str = "{0}(directory={1}, size={2})"
+
+    def __init__(
+            self,
+            directory: str,
+            parser: DockerfileParser = None,
+            cache: ParseCache = None,
+            patterns: Iterable[str] = DOCKERFILE_PATTERNS
+    ):
+        """
+        Parameters
+        ----------
+        directory : str
+            Directory to be indexed.
+        parser : DockerfileParser or None
+            Parser of Dockerfiles (default parser if None).
+        cache : ParseCache or None
+            Cache of Dockerfile ASTs shared with restarts (not cached if None).
+        patterns : Iterable[str]
+            Patterns of Dockerfile names.
+        """
+        self.__directory: str = os.path.abspath(directory)
+        self.__parser: DockerfileParser = DockerfileParser() if parser is None else parser
+        self.__cache: ParseCache = ParseCache() if cache is None else cache
+        self.__cache.bind(self.__parser.fingerprint)
+        self.__patterns: Tuple[str, ...] = tuple(patterns)
+        self.__entries: Dict[str, ParseCacheEntry] = dict()
+        self.__failed_entries: Dict[str, ParseCacheEntry] = dict()
+
+    @property
+    def directory(self) -> str:
+        """
+        Returns
+        -------
+        __directory : str
+            Absolute name of the indexed directory.
+        """
+        return self.__directory
+
+    @property
+    def cache(self) -> ParseCache:
+        """
+        Returns
+        -------
+        __cache : ParseCache
+            Cache of Dockerfile ASTs shared with restarts.
+        """
+        return self.__cache
+
+    def get(self, filename: str) -> DockerfileAST:
+        """
+        Return the Dockerfile AST of an indexed Dockerfile (None if not indexed).
+        """
+        entry: ParseCacheEntry = self.__entries.get(os.path.abspath(filename))
+        return None if entry is None else entry.dockerfile_ast
+
+    def filenames(self) -> List[str]:
+        """
+        Return absolute names of indexed Dockerfiles.
+        """
+        return sorted(self.__entries)
+
+    def is_dockerfile(self, filename: str) -> bool:
+        """
+        Return True if the base name of `filename` matches a pattern of Dockerfile names.
+        """
+        basename: str = os.path.basename(filename)
+        return any(fnmatch.fnmatchcase(basename, pattern) for pattern in self.__patterns)
+
+    def scan(self, directories: Iterable[str] = None) -> List[WatchEvent]:
+        """
+        Scan directory trees, and update the index and the cache.
+
+        Parameters
+        ----------
+        directories : Iterable[str] or None
+            Directory trees to be scanned (the whole indexed directory if None).
+
+        Returns
+        -------
+        events : List[WatchEvent]
+            Changes of Dockerfiles in the directory trees.
+        """
+        if directories is None:
+            directories = [self.__directory]
+        events: List[WatchEvent] = list()
+        seen_filenames: Set[str] = set()
+        scanned_directories: List[str] = list()
+        for directory in directories:
+            directory = os.path.abspath(directory)
+            scanned_directories.append(directory)
+            for dir_path, _, filenames in os.walk(directory):
+                for basename in filenames:
+                    filename: str = os.path.join(dir_path, basename)
+                    if filename in seen_filenames or not self.is_dockerfile(basename):
+                        continue
+                    seen_filenames.add(filename)
+                    event: WatchEvent = self.__update(filename)
+                    if event is not None:
+                        events.append(event)
+
+        # 走査したディレクトリ配下で見つからなかったファイルは削除されたとみなす
+        for filename in list(self.__failed_entries):
+            if filename not in seen_filenames and any(
+                    filename.startswith(os.path.join(directory, "")) for directory in scanned_directories
+            ):
+                del self.__failed_entries[filename]
+        for filename in list(self.__entries):
+            if filename in seen_filenames:
+                continue
+            if any(filename.startswith(os.path.join(directory, "")) for directory in scanned_directories):
+                del self.__entries[filename]
+                self.__cache.remove(filename)
+                events.append(WatchEvent(WatchEventType.REMOVED, filename))
+        if len(scanned_directories) == 1 and scanned_directories[0] == self.__directory:
+            # 停止中に削除されたファイルのキャッシュを破棄
+            for filename in self.__cache.filenames():
+                if filename not in seen_filenames and filename.startswith(os.path.join(self.__directory, "")):
+                    self.__cache.remove(filename)
+        self.__cache.save_if_due()
+        return events
+
+    def __update(self, filename: str) -> WatchEvent:
+        """
+        Update the index entry of a Dockerfile, and return its change (None if not changed).
+        """
+        try:
+            stat_result: os.stat_result = os.stat(filename)
+        except FileNotFoundError:
+            return None
+        entry: ParseCacheEntry = self.__entries.get(filename)
+        if entry is not None and entry.is_fresh(stat_result):
+            return None
+        failed_entry: ParseCacheEntry = self.__failed_entries.get(filename)
+        if failed_entry is not None and failed_entry.is_fresh(stat_result):
+            return None
+        is_indexed: bool = entry is not None
+        if entry is None:
+            entry = self.__cache.get(filename)
+            if entry is not None and entry.is_fresh(stat_result):
+                # 前回の起動時のキャッシュを再利用
+                self.__entries[filename] = entry
+                return WatchEvent(WatchEventType.ADDED, filename, entry.dockerfile_ast)
+
+        try:
+            with open(filename, "rb") as fp:
+                content: bytes = fp.read()
+        except OSError as e:
+            return WatchEvent(WatchEventType.FAILED, filename, error=e)
+        digest: str = hashlib.sha256(content).hexdigest()
+        if failed_entry is not None and failed_entry.digest == digest:
+            # 内容が変わらなければ再びparseに失敗するため，状態のみ更新
+            self.__failed_entries[filename] = ParseCacheEntry(
+                stat_result.st_mtime_ns, stat_result.st_size, digest, None
+            )
+            return None
+        if entry is not None and entry.digest == digest:
+            # 更新日時のみ変更された場合はparseしない
+            entry = ParseCacheEntry(stat_result.st_mtime_ns, stat_result.st_size, digest, entry.dockerfile_ast)
+            self.__entries[filename] = entry
+            self.__cache.put(filename, entry)
+            return None if is_indexed else WatchEvent(WatchEventType.ADDED, filename, entry.dockerfile_ast)
+
+        try:
+            dockerfile_ast: DockerfileAST = self.__parser.parse(content.decode("utf-8"))
+            # 遅延構築される値も構築（構築できないASTはキャッシュに入れない）
+            materialize_all((dockerfile_ast.instructions, dockerfile_ast.diagnostics))
+        except (ValueError, UnicodeDecodeError, bashlex.errors.ParsingError) as e:
+            # GoParseErrorはValueErrorのサブクラス
+            if is_indexed:
+                del self.__entries[filename]
+            self.__cache.remove(filename)
+            self.__failed_entries[filename] = ParseCacheEntry(
+                stat_result.st_mtime_ns, stat_result.st_size, digest, None
+            )
+            return WatchEvent(WatchEventType.FAILED, filename, error=e)
+        self.__failed_entries.pop(filename, None)
+        entry = ParseCacheEntry(stat_result.st_mtime_ns, stat_result.st_size, digest, dockerfile_ast)
+        self.__entries[filename] = entry
+        self.__cache.put(filename, entry)
+        return WatchEvent(WatchEventType.MODIFIED if is_indexed else WatchEventType.ADDED, filename, dockerfile_ast)
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(self.__directory), repr(len(self.__entries)))
+
+
+class DockerfileWatcher:
+    """
+    A watcher of a directory tree, which emits changes of Dockerfiles as a stream of events.
+
+    Changes are notified by inotify where available (Linux), otherwise the directory tree is polled.
+
+    Attributes
+    ----------
+    __index : DockerfileIndex
+        Index of Dockerfile ASTs in the watched directory.
+    __interval : float
+        Polling interval (or timeout of waiting for inotify events) in seconds.
+    __inotify : _Inotify
+        inotify instance (None if polling).
+    __logger : logging.Logger
+        Logger.
+    """
+    __REPR_FORMAT: str = "{0}(index={1}, interval={2}, inotify={3})"
+
+    def __init__(
+            self,
+            index: DockerfileIndex,
+            interval: float = 1.0,
+            use_inotify: bool = True,
+            logger: logging.Logger = None
+    ):
+        """
+        Parameters
+        ----------
+        index : DockerfileIndex
+            Index of Dockerfile ASTs in the watched directory.
+        interval : float
+            Polling interval (or timeout of waiting for inotify events) in seconds.
+        use_inotify : bool
+            True if inotify is used where available.
+        logger : logging.Logger or None
+            Logger (logger of this module if None).
+        """
+        self.__index: DockerfileIndex = index
+        self.__interval: float = interval
+        self.__logger: logging.Logger = logging.getLogger(__name__) if logger is None else logger
+        self.__inotify: _Inotify = _Inotify.open() if use_inotify else None
+        if self.__inotify is None:
+            self.__logger.debug("inotify is not available: polling %s", index.directory)
+        else:
+            self.__inotify.add_tree(index.directory)
+
+    @property
+    def index(self) -> DockerfileIndex:
+        """
+        Returns
+        -------
+        __index : DockerfileIndex
+            Index of Dockerfile ASTs in the watched directory.
+        """
+        return self.__index
+
+    @property
+    def uses_inotify(self) -> bool:
+        """
+        Returns
+        -------
+        uses_inotify : bool
+            True if changes are notified by inotify.
+        """
+        return self.__inotify is not None
+
+    def poll(self, timeout: float = None) -> List[WatchEvent]:
+        """
+        Wait for changes and return them.
+
+        Parameters
+        ----------
+        timeout : float or None
+            Seconds to wait (the interval if None).
+
+        Returns
+        -------
+        events : List[WatchEvent]
+            Changes of Dockerfiles (empty if nothing changed).
+        """
+        if timeout is None:
+            timeout = self.__interval
+        if self.__inotify is None:
+            time.sleep(timeout)
+            return self.__index.scan()
+
+        directories: Set[str] = self.__inotify.read_changed_directories(timeout)
+        if directories is None:
+            # イベントが溢れた場合は全体を走査
+            self.__inotify.add_tree(self.__index.directory)
+            return self.__index.scan()
+        if len(directories) < 1:
+            return list()
+        for directory in directories:
+            self.__inotify.add_tree(directory)
+        return self.__index.scan(directories)
+
+    def events(self) -> Iterator[WatchEvent]:
+        """
+        Generate changes of Dockerfiles forever, starting with the initial index (``ADDED`` events).
+
+        Yields
+        ------
+        event : WatchEvent
+            Change of a Dockerfile.
+        """
+        for event in self.__index.scan():
+            yield event
+        while True:
+            for event in self.poll():
+                yield event
+
+    def close(self):
+        """
+        Release inotify instance, and save pending changes of the cache.
+        """
+        self.__index.cache.save()
+        if self.__inotify is not None:
+            self.__inotify.close()
+            self.__inotify = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(self.__index), repr(self.__interval), repr(self.uses_inotify)
+        )
+
+
+class _Inotify:
+    """
+    A minimal inotify binding through ctypes, watching directories.
+    """
+    # inotify(7)のフラグ
+    IN_MODIFY: int = 0x00000002
+    IN_ATTRIB: int = 0x00000004
+    IN_CLOSE_WRITE: int = 0x00000008
+    IN_MOVED_FROM: int = 0x00000040
+    IN_MOVED_TO: int = 0x00000080
+    IN_CREATE: int = 0x00000100
+    IN_DELETE: int = 0x00000200
+    IN_DELETE_SELF: int = 0x00000400
+    IN_MOVE_SELF: int = 0x00000800
+    IN_Q_OVERFLOW: int = 0x00004000
+    IN_IGNORED: int = 0x00008000
+    IN_ONLYDIR: int = 0x01000000
+    IN_NONBLOCK: int = 0o4000
+    IN_CLOEXEC: int = 0o2000000
+    WATCH_MASK: int = (
+        IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+    )
+    __EVENT_HEADER: struct.Struct = struct.Struct("iIII")
+
+    def __init__(self, libc: ctypes.CDLL, fd: int):
+        self.__libc: ctypes.CDLL = libc
+        self.__fd: int = fd
+        # watch descriptorごとのディレクトリ名
+        self.__directories: Dict[int, str] = dict()
+
+    @staticmethod
+    def open() -> "_Inotify":
+        """
+        Return a new inotify instance (None if inotify is not available).
+        """
+        library_name: str = ctypes.util.find_library("c")
+        if library_name is None:
+            return None
+        try:
+            libc: ctypes.CDLL = ctypes.CDLL(library_name, use_errno=True)
+        except OSError:
+            return None
+        if not hasattr(libc, "inotify_init1"):
+            return None
+        fd: int = libc.inotify_init1(_Inotify.IN_NONBLOCK | _Inotify.IN_CLOEXEC)
+        if fd < 0:
+            return None
+        return _Inotify(libc, fd)
+
+    def add_tree(self, directory: str):
+        """
+        Watch a directory and its descendants.
+        """
+        for dir_path, _, _ in os.walk(directory):
+            wd: int = self.__libc.inotify_add_watch(self.__fd, os.fsencode(dir_path), self.WATCH_MASK)
+            if wd >= 0:
+                self.__directories[wd] = dir_path
+
+    def read_changed_directories(self, timeout: float) -> Set[str]:
+        """
+        Wait for events and return directories whose entries changed.
+
+        Returns
+        -------
+        directories : Set[str] or None
+            Changed directories (empty if timed out, None if the event queue overflowed).
+        """
+        readable, _, _ = select.select([self.__fd], [], [], timeout)
+        directories: Set[str] = set()
+        while len(readable) > 0:
+            try:
+                buffer: bytes = os.read(self.__fd, 65536)
+            except BlockingIOError:
+                break
+            offset: int = 0
+            while offset < len(buffer):
+                wd, mask, _, name_length = self.__EVENT_HEADER.unpack_from(buffer, offset)
+                offset += self.__EVENT_HEADER.size + name_length
+                if mask & self.IN_Q_OVERFLOW:
+                    return None
+                directory: str = self.__directories.get(wd)
+                if mask & self.IN_IGNORED:
+                    self.__directories.pop(wd, None)
+                if directory is None:
+                    continue
+                if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                    directory = os.path.dirname(directory)
+                directories.add(directory)
+            # 連続した変更（エディタの保存など）をまとめて処理
+            readable, _, _ = select.select([self.__fd], [], [], 0.05)
+        return directories
+
+    def close(self):
+        os.close(self.__fd)
@@ -0,0 +1,348 @@
+import os
+import posixpath
+import re
+from typing import Dict, Iterator, List, Pattern, Tuple
+
+
+class Dockerignore:
+    """
+    Patterns of `.dockerignore` compiled into a matcher of paths in a build context.
+
+    Docker (BuildKit) semantics are followed: a path is ignored if the last pattern matching the path or one of its
+    parent directories is not an exception (`!`), and `**` matches any number of directories (including none).
+
+    Literal patterns (without wildcards) are stored in a trie of path components, and the other patterns are
+    combined into one regular expression whose alternatives are in reverse order,
+    so that each path is matched once against each instead of against each pattern.
+
+    Attributes
+    ----------
+    __patterns : List[str]
+        Cleaned patterns (exceptions are prefixed with `!`) in the order of declaration.
+    __literal_trie : Dict[str, Tuple[int, Dict]]
+        Trie of path components of literal patterns,
+        whose nodes are the index of the last literal pattern ending at the node (-1 if none) and child nodes.
+    __regex : Pattern
+        Combined regular expression of patterns with wildcards, whose group `p<index>` is the matched pattern
+        (None if no such pattern).
+    __exception_parts : List[List[Pattern]]
+        Regular expressions of path components of exception patterns (None for components with `**`),
+        in order to judge whether an ignored directory can be pruned.
+    """
+    __REPR_FORMAT: str = "{0}(patterns={1})"
+
+    def __init__(self, patterns: List[str]):
+        """
+        Parameters
+        ----------
+        patterns : List[str]
+            Cleaned patterns (exceptions are prefixed with `!`) in the order of declaration.
+        """
+        self.__patterns: List[str] = patterns
+        self.__literal_trie: Dict[str, Tuple[int, Dict]] = dict()
+        self.__exception_parts: List[List[Pattern]] = list()
+        regex_alternatives: List[str] = list()
+        for index, pattern in enumerate(patterns):
+            is_exception: bool = pattern.startswith("!")
+            path_pattern: str = pattern[1:] if is_exception else pattern
+            if is_exception:
+                self.__exception_parts.append([
+                    None if "**" in part else re.compile(translate_pattern(part), re.DOTALL)
+                    for part in path_pattern.split("/")
+                ])
+            if _WILDCARD_PATTERN.search(path_pattern) is None:
+                self.__add_literal(index, path_pattern)
+            else:
+                regex_alternatives.append("(?P<p{0}>{1}(?:/.*)?)".format(index, translate_pattern(path_pattern)))
+        self.__regex: Pattern = None
+        if len(regex_alternatives) > 0:
+            # 後のパターンが優先されるため，逆順に並べて最初に一致した選択肢を採用
+            self.__regex = re.compile("|".join(reversed(regex_alternatives)), re.DOTALL)
+
+    def __add_literal(self, index: int, path_pattern: str):
+        node: Dict[str, List] = self.__literal_trie
+        parts: List[str] = path_pattern.split("/")
+        for depth, part in enumerate(parts):
+            child: List = node.get(part)
+            if child is None:
+                child = [-1, dict()]
+                node[part] = child
+            if depth == len(parts) - 1:
+                child[0] = index
+            node = child[1]
+
+    @property
+    def patterns(self) -> List[str]:
+        """
+        Returns
+        -------
+        __patterns : List[str]
+            Cleaned patterns (exceptions are prefixed with `!`) in the order of declaration.
+        """
+        return self.__patterns
+
+    def matched_pattern(self, path: str) -> int:
+        """
+        Return the index of the last pattern matching a path or one of its parent directories.
+
+        Parameters
+        ----------
+        path : str
+            Path relative to the build context (`/`-separated).
+
+        Returns
+        -------
+        index : int
+            Index of the pattern in ``patterns`` (-1 if no pattern matches).
+        """
+        index: int = -1
+        node: Dict = self.__literal_trie
+        for part in path.split("/"):
+            child: List = node.get(part)
+            if child is None:
+                break
+            index = max(index, child[0])
+            node = child[1]
+        if self.__regex is not None:
+            match = self.__regex.fullmatch(path)
+            if match is not None:
+                index = max(index, int(match.lastgroup[1:]))
+        return index
+
+    def is_ignored(self, path: str) -> bool:
+        """
+        Return whether a path in the build context is ignored.
+
+        Parameters
+        ----------
+        path : str
+            Path relative to the build context (`/`-separated).
+
+        Returns
+        -------
+        is_ignored : bool
+            True if the path is ignored.
+        """
+        index: int = self.matched_pattern(path)
+        return index >= 0 and not self.__patterns[index].startswith("!")
+
+    def can_prune(self, directory: str) -> bool:
+        """
+        Return whether an ignored directory can be skipped, i.e. no exception pattern may match a path under it.
+
+        Parameters
+        ----------
+        directory : str
+            Path of the directory relative to the build context (`/`-separated).
+
+        Returns
+        -------
+        can_prune : bool
+            True if all paths under the directory are ignored.
+        """
+        directory_parts: List[str] = directory.split("/")
+        for exception_parts in self.__exception_parts:
+            may_match: bool = True
+            for directory_part, exception_part in zip(directory_parts, exception_parts):
+                if exception_part is None:
+                    break
+                if exception_part.fullmatch(directory_part) is None:
+                    may_match = False
+                    break
+            if may_match:
+                return False
+        return True
+
+    def walk(self, context_directory: str) -> Iterator[Tuple[str, os.DirEntry]]:
+        """
+        Walk files in a build context which are not ignored, skipping ignored directories where possible.
+
+        Symbolic links are not followed, and are regarded as files as Docker sends them as they are.
+        Note that Docker sends the Dockerfile and `.dockerignore` even if they are ignored.
+
+        Parameters
+        ----------
+        context_directory : str
+            Build context directory.
+
+        Yields
+        ------
+        path, entry : Tuple[str, os.DirEntry]
+            Path relative to the build context (`/`-separated) and the directory entry of each file.
+        """
+        stack: List[Tuple[str, str]] = [(context_directory, "")]
+        while len(stack) > 0:
+            directory, relative_directory = stack.pop()
+            with os.scandir(directory) as entries:
+                sorted_entries: List[os.DirEntry] = sorted(entries, key=lambda entry: entry.name)
+            subdirectories: List[Tuple[str, str]] = list()
+            for entry in sorted_entries:
+                path: str = relative_directory + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    # 例外パターンが一致しえなければ，無視されるディレクトリの中は走査しない
+                    if self.is_ignored(path) and self.can_prune(path):
+                        continue
+                    subdirectories.append((entry.path, path + "/"))
+                elif not self.is_ignored(path):
+                    yield path, entry
+            # 名前順に走査するため，逆順に積む
+            stack.extend(reversed(subdirectories))
+
+    def context_size(self, context_directory: str) -> Tuple[int, int]:
+        """
+        Return the number of files and bytes in a build context which are not ignored.
+
+        Parameters
+        ----------
+        context_directory : str
+            Build context directory.
+
+        Returns
+        -------
+        num_files, num_bytes : Tuple[int, int]
+            Number of files and their total size in bytes.
+        """
+        num_files: int = 0
+        num_bytes: int = 0
+        for _, entry in self.walk(context_directory):
+            num_files += 1
+            num_bytes += entry.stat(follow_symlinks=False).st_size
+        return num_files, num_bytes
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(self.__patterns))
+
+
+class DockerignoreParser:
+    """
+    A parser of `.dockerignore`.
+    """
+
+    def parse(self, raw_code: str) -> Dockerignore:
+        """
+        Parse `.dockerignore` source code.
+
+        Parameters
+        ----------
+        raw_code : str
+            `.dockerignore` source code.
+
+        Returns
+        -------
+        dockerignore : Dockerignore
+            Compiled patterns.
+
+        Raises
+        ------
+        ValueError
+            If a pattern is illegal (e.g. `!` alone).
+        """
+        patterns: List[str] = list()
+        for line in raw_code.splitlines():
+            pattern: str = line.strip()
+            if len(pattern) < 1 or pattern.startswith("#"):
+                continue
+            prefix: str = ""
+            if pattern.startswith("!"):
+                if len(pattern) == 1:
+                    raise ValueError("DockerignoreParser: illegal exclusion pattern: \"!\"")
+                prefix, pattern = "!", pattern[1:].strip()
+            pattern = posixpath.normpath(pattern)
+            if len(pattern) > 1 and pattern.startswith("/"):
+                pattern = pattern.lstrip("/")
+            if pattern == ".":
+                # ビルドコンテキストのルートには一致しない
+                continue
+            patterns.append(prefix + pattern)
+        return Dockerignore(patterns)
+
+    def parse_file(self, filename: str) -> Dockerignore:
+        """
+        Parse a `.dockerignore` file.
+
+        Parameters
+        ----------
+        filename : str
+            `.dockerignore` file name.
+
+        Returns
+        -------
+        dockerignore : Dockerignore
+            Compiled patterns.
+        """
+        with open(filename) as fp:
+            return self.parse(fp.read())
+
+    def parse_context(self, context_directory: str) -> Dockerignore:
+        """
+        Parse `.dockerignore` in the root of a build context (no pattern if it does not exist).
+
+        Parameters
+        ----------
+        context_directory : str
+            Build context directory.
+
+        Returns
+        -------
+        dockerignore : Dockerignore
+            Compiled patterns.
+        """
+        filename: str = os.path.join(context_directory, DOCKERIGNORE_FILENAME)
+        if not os.path.isfile(filename):
+            return Dockerignore(list())
+        return self.parse_file(filename)
+
+
+def translate_pattern(pattern: str, double_star: bool = True) -> str:
+    """
+    Translate a path pattern into a regular expression, as Docker does.
+
+    `*` and `?` do not match `/`, a character class `[...]` (`[^...]` is negated) is kept as it is,
+    and `\\` escapes the next character as Go `filepath.Match` does.
+
+    Parameters
+    ----------
+    pattern : str
+        Path pattern (`/`-separated), e.g. a `.dockerignore` pattern or a source of COPY/ADD Instruction.
+    double_star : bool
+        True if `**` matches any number of directories as in `.dockerignore`
+        (False if `**` is the same as `*` as in sources of COPY/ADD Instructions).
+
+    Returns
+    -------
+    regex : str
+        Regular expression matching whole paths (to be compiled with ``re.DOTALL``).
+    """
+    regex: List[str] = list()
+    index: int = 0
+    while index < len(pattern):
+        char: str = pattern[index]
+        index += 1
+        if char == "*":
+            if double_star and index < len(pattern) and pattern[index] == "*":
+                index += 1
+                # `**/`は`**`として扱う
+                if index < len(pattern) and pattern[index] == "/":
+                    index += 1
+                regex.append(".*" if index == len(pattern) else "(?:.*/)?")
+            else:
+                regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "\\" and index < len(pattern):
+            regex.append(re.escape(pattern[index]))
+            index += 1
+        elif char == "[" and "]" in pattern[index + 1:]:
+            # 文字クラスはそのまま（`[^...]`は否定）
+            end: int = pattern.index("]", index + 1)
+            regex.append(pattern[index - 1:end + 1])
+            index = end + 1
+        else:
+            regex.append(re.escape(char))
+    return "".join(regex)
+
+
+DOCKERIGNORE_FILENAME: str = ".dockerignore"
+# ワイルドカードを含むパターン
+_WILDCARD_PATTERN = re.compile(r"[*?\[\\]")
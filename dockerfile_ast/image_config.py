@@ -0,0 +1,335 @@
+import itertools
+import posixpath
+from typing import Callable, Dict, Iterable, List
+
+from dockerfile_ast.dockerfile_items.bash_items.nodes import EnvironmentVariable
+from dockerfile_ast.dockerfile_items.instructions import CMDInstruction, ENTRYPOINTInstruction, ENVInstruction
+from dockerfile_ast.dockerfile_items.instructions import EXPOSEInstruction, FROMInstruction, Instruction
+from dockerfile_ast.dockerfile_items.instructions import LABELInstruction, ONBUILDInstruction, USERInstruction
+from dockerfile_ast.dockerfile_items.instructions import VOLUMEInstruction, WORKDIRInstruction
+from dockerfile_ast.dockerfile_items.nodes import DockerImage, DockerPortRange
+from dockerfile_ast.variable_resolver import VariableResolver
+
+
+class ImageConfig:
+    """
+    A config of Docker image, which is inherited by Docker images built FROM it.
+
+    Build-time variables (ARG) are not a part of image config, since their scope ends at the end of build stage.
+    Configs may be shared by caches (e.g. ``DockerfileAST.image_configs``), so they must not be modified.
+
+    Attributes
+    ----------
+    __env : Dict[str, str]
+        Values of environment variables (variable name is the key).
+    __labels : Dict[str, str]
+        Values of labels (label name is the key).
+    __work_dir : str
+        Absolute working directory (None if not declared).
+    __user : str
+        User (and group) given by `USER <user>[:<group>]` (None if not declared).
+    __exposed_ports : List[str]
+        Exposed ports such as `80/tcp` or `30000-32767/udp` in the order of declaration.
+    __cmd : List[str]
+        Command line of CMD Instruction (None if not declared or reset by ENTRYPOINT Instruction).
+    __entrypoint : List[str]
+        Command line of ENTRYPOINT Instruction (None if not declared).
+    __volumes : List[str]
+        Mount points of volumes in the order of declaration.
+    __on_build : List[Instruction]
+        Trigger Instructions of ONBUILD Instructions, run when a Docker image is built FROM this Docker image.
+    """
+    __REPR_FORMAT: str = (
+        "{0}(env={1}, labels={2}, work_dir={3}, user={4}, exposed_ports={5}, cmd={6}, entrypoint={7}, volumes={8}, "
+        "on_build={9})"
+    )
+
+    def __init__(
+            self,
+            env: Dict[str, str] = None,
+            labels: Dict[str, str] = None,
+            work_dir: str = None,
+            user: str = None,
+            exposed_ports: List[str] = None,
+            cmd: List[str] = None,
+            entrypoint: List[str] = None,
+            volumes: List[str] = None,
+            on_build: List[Instruction] = None
+    ):
+        """
+        Parameters
+        ----------
+        env : Dict[str, str] or None
+            Values of environment variables (variable name is the key).
+        labels : Dict[str, str] or None
+            Values of labels (label name is the key).
+        work_dir : str or None
+            Absolute working directory.
+        user : str or None
+            User (and group) given by `USER <user>[:<group>]`.
+        exposed_ports : List[str] or None
+            Exposed ports such as `80/tcp` or `30000-32767/udp`.
+        cmd : List[str] or None
+            Command line of CMD Instruction.
+        entrypoint : List[str] or None
+            Command line of ENTRYPOINT Instruction.
+        volumes : List[str] or None
+            Mount points of volumes.
+        on_build : List[Instruction] or None
+            Trigger Instructions of ONBUILD Instructions.
+        """
+        self.__env: Dict[str, str] = dict() if env is None else env
+        self.__labels: Dict[str, str] = dict() if labels is None else labels
+        self.__work_dir: str = work_dir
+        self.__user: str = user
+        self.__exposed_ports: List[str] = list() if exposed_ports is None else exposed_ports
+        self.__cmd: List[str] = cmd
+        self.__entrypoint: List[str] = entrypoint
+        self.__volumes: List[str] = list() if volumes is None else volumes
+        self.__on_build: List[Instruction] = list() if on_build is None else on_build
+
+    @property
+    def env(self) -> Dict[str, str]:
+        """
+        Returns
+        -------
+        __env : Dict[str, str]
+            Values of environment variables (variable name is the key).
+        """
+        return self.__env
+
+    @property
+    def labels(self) -> Dict[str, str]:
+        """
+        Returns
+        -------
+        __labels : Dict[str, str]
+            Values of labels (label name is the key).
+        """
+        return self.__labels
+
+    @property
+    def work_dir(self) -> str:
+        """
+        Returns
+        -------
+        __work_dir : str or None
+            Absolute working directory (None if not declared).
+        """
+        return self.__work_dir
+
+    @property
+    def user(self) -> str:
+        """
+        Returns
+        -------
+        __user : str or None
+            User (and group) given by `USER <user>[:<group>]` (None if not declared).
+        """
+        return self.__user
+
+    @property
+    def exposed_ports(self) -> List[str]:
+        """
+        Returns
+        -------
+        __exposed_ports : List[str]
+            Exposed ports such as `80/tcp` or `30000-32767/udp` in the order of declaration.
+        """
+        return self.__exposed_ports
+
+    @property
+    def cmd(self) -> List[str]:
+        """
+        Returns
+        -------
+        __cmd : List[str] or None
+            Command line of CMD Instruction (None if not declared or reset by ENTRYPOINT Instruction).
+        """
+        return self.__cmd
+
+    @property
+    def entrypoint(self) -> List[str]:
+        """
+        Returns
+        -------
+        __entrypoint : List[str] or None
+            Command line of ENTRYPOINT Instruction (None if not declared).
+        """
+        return self.__entrypoint
+
+    @property
+    def volumes(self) -> List[str]:
+        """
+        Returns
+        -------
+        __volumes : List[str]
+            Mount points of volumes in the order of declaration.
+        """
+        return self.__volumes
+
+    @property
+    def on_build(self) -> List[Instruction]:
+        """
+        Returns
+        -------
+        __on_build : List[Instruction]
+            Trigger Instructions of ONBUILD Instructions, run when a Docker image is built FROM this Docker image.
+        """
+        return self.__on_build
+
+    def apply(self, instructions: Iterable[Instruction], build_args: Dict[str, str] = None) -> "ImageConfig":
+        """
+        Return the config of Docker image built by Dockerfile Instructions of a build stage
+        FROM the Docker image of this config.
+
+        Docker semantics are followed:
+
+        * ONBUILD triggers of this config run before the Dockerfile Instructions, and are not inherited further
+        * later ENV, LABEL, USER, CMD and ENTRYPOINT Instructions override earlier ones
+        * relative WORKDIR Instructions are joined to the current working directory
+        * ENTRYPOINT Instruction resets CMD inherited from the base image (unless CMD is declared in the build stage)
+        * EXPOSE and VOLUME Instructions add to the inherited ports and volumes
+
+        Variables not declared in the build stage (including defaults of Docker images such as `PATH`)
+        refer to environment variables of this config.
+
+        Parameters
+        ----------
+        instructions : Iterable[Instruction]
+            Dockerfile Instructions of the build stage (excluding its FROM Instruction).
+        build_args : Dict[str, str] or None
+            Values of `--build-arg` options (variable name is the key).
+
+        Returns
+        -------
+        image_config : ImageConfig
+            Config of the built Docker image.
+        """
+        stage_instructions: List[Instruction] = list(itertools.chain(self.__on_build, instructions))
+        declared_variables: List[EnvironmentVariable] = [
+            variable
+            for instruction in stage_instructions if isinstance(instruction, ENVInstruction)
+            for variable in instruction.variables
+        ]
+        resolver: VariableResolver = VariableResolver(build_args, self.__env, declared_variables)
+        env: Dict[str, str] = dict(self.__env)
+        labels: Dict[str, str] = dict(self.__labels)
+        work_dir: str = self.__work_dir
+        user: str = self.__user
+        # 順序付きの集合としてdictを使用
+        exposed_ports: Dict[str, None] = dict.fromkeys(self.__exposed_ports)
+        cmd: List[str] = self.__cmd
+        entrypoint: List[str] = self.__entrypoint
+        volumes: Dict[str, None] = dict.fromkeys(self.__volumes)
+        on_build: List[Instruction] = list()
+        is_cmd_declared: bool = False
+        for instruction in stage_instructions:
+            if isinstance(instruction, ENVInstruction):
+                for variable in instruction.variables:
+                    env[variable.name] = resolver.resolve(variable)
+            elif isinstance(instruction, LABELInstruction):
+                for label in instruction.labels:
+                    labels[label.name] = resolver.resolve(label.value)
+            elif isinstance(instruction, WORKDIRInstruction):
+                work_dir = _join_work_dir(work_dir, resolver.resolve(instruction.work_dir))
+            elif isinstance(instruction, USERInstruction):
+                user = resolver.resolve(instruction.user)
+                if instruction.group is not None:
+                    user += ":" + resolver.resolve(instruction.group)
+            elif isinstance(instruction, EXPOSEInstruction):
+                for port in instruction.ports:
+                    if isinstance(port, DockerPortRange):
+                        port_num: str = "{0}-{1}".format(port.start, port.end)
+                    else:
+                        port_num: str = resolver.resolve(port.port_num)
+                    protocol: str = "tcp" if port.protocol is None else resolver.resolve(port.protocol).lower()
+                    exposed_ports[port_num + "/" + protocol] = None
+            elif isinstance(instruction, CMDInstruction) and instruction.argv is not None:
+                cmd = [resolver.resolve(arg) for arg in instruction.argv]
+                is_cmd_declared = True
+            elif isinstance(instruction, ENTRYPOINTInstruction) and instruction.argv is not None:
+                entrypoint = [resolver.resolve(arg) for arg in instruction.argv]
+                if not is_cmd_declared:
+                    cmd = None
+            elif isinstance(instruction, VOLUMEInstruction):
+                for volume in instruction.volumes:
+                    volumes[resolver.resolve(volume)] = None
+            elif isinstance(instruction, ONBUILDInstruction):
+                on_build.extend(instruction.param_instructions)
+        return ImageConfig(
+            env, labels, work_dir, user, list(exposed_ports), cmd, entrypoint, list(volumes), on_build
+        )
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(self.__env), repr(self.__labels), repr(self.__work_dir), repr(self.__user),
+            repr(self.__exposed_ports), repr(self.__cmd), repr(self.__entrypoint), repr(self.__volumes),
+            repr(self.__on_build)
+        )
+
+
+def evaluate_stage_configs(
+        instructions: Iterable[Instruction],
+        build_args: Dict[str, str] = None,
+        base_config: Callable[[str], ImageConfig] = None
+) -> List[ImageConfig]:
+    """
+    Evaluate configs of Docker images built by all build stages of a Dockerfile in one forward pass.
+
+    A build stage built FROM an earlier build stage (`FROM <stage>`) inherits the config of that build stage.
+
+    Parameters
+    ----------
+    instructions : Iterable[Instruction]
+        Dockerfile Instructions of the Dockerfile.
+    build_args : Dict[str, str] or None
+        Values of `--build-arg` options (variable name is the key).
+    base_config : Callable[[str], ImageConfig] or None
+        Function returning the config of an external Docker image given its reference such as `ubuntu:22.04`
+        (external Docker images have empty configs if None).
+
+    Returns
+    -------
+    image_configs : List[ImageConfig]
+        Configs of build stages in declaration order.
+    """
+    resolver: VariableResolver = VariableResolver(build_args)
+    stage_indexes: Dict[str, int] = dict()
+    image_configs: List[ImageConfig] = list()
+    stage_base_config: ImageConfig = None
+    stage_instructions: List[Instruction] = list()
+    for instruction in instructions:
+        if not isinstance(instruction, FROMInstruction):
+            if stage_base_config is not None:
+                stage_instructions.append(instruction)
+            # 最初のFROMより前のARGはイメージの設定に含まれない
+            continue
+        if stage_base_config is not None:
+            image_configs.append(stage_base_config.apply(stage_instructions, build_args))
+            stage_instructions = list()
+        image: DockerImage = instruction.image
+        reference: str = resolver.resolve(image.name)
+        if image.tag is None and image.digest is None and reference.lower() in stage_indexes:
+            stage_base_config = image_configs[stage_indexes[reference.lower()]]
+        else:
+            if image.tag is not None:
+                reference += ":" + resolver.resolve(image.tag)
+            if image.digest is not None:
+                reference += "@" + resolver.resolve(image.digest)
+            stage_base_config = ImageConfig() if base_config is None else base_config(reference)
+        if image.as_name is not None:
+            stage_indexes[resolver.resolve(image.as_name).lower()] = len(image_configs)
+    if stage_base_config is not None:
+        image_configs.append(stage_base_config.apply(stage_instructions, build_args))
+    return image_configs
+
+
+def _join_work_dir(work_dir: str, path: str) -> str:
+    """
+    Return the working directory after `WORKDIR <path>` (relative paths are joined to `work_dir`).
+    """
+    if not path.startswith("/"):
+        path = posixpath.join("/" if work_dir is None else work_dir, path)
+    return posixpath.normpath(path)
@@ -0,0 +1,310 @@
+import functools
+from typing import Dict, Hashable, Iterable, List, Set, Union
+
+from dockerfile_ast.build_stage_graph import BuildStage, BuildStageGraph
+from dockerfile_ast.dockerfile_ast import DockerfileAST
+from dockerfile_ast.dockerfile_items.nodes import DockerImage
+from dockerfile_ast.image_config import ImageConfig, evaluate_stage_configs
+from dockerfile_ast.variable_resolver import VariableResolver
+
+
+class ImageInheritanceGraph:
+    """
+    An inheritance graph of Docker images built by Dockerfiles of a corpus (e.g. a monorepo).
+
+    Each Dockerfile builds Docker images of given names, and inherits the config (including ONBUILD triggers)
+    of the Docker image its target build stage is built FROM (through `FROM <stage>` chains in the Dockerfile).
+    If the base image is built by another Dockerfile of the corpus, the Dockerfile is its child,
+    otherwise (external Docker images and `scratch`) the Dockerfile is a root starting from an empty config.
+
+    Configs of Docker images are memoized, and each is computed once from the config of its parent,
+    so that configs of all Dockerfiles of a corpus are computed in linear time.
+    Build-time variables (ARG) are not inherited, as in Docker.
+
+    Attributes
+    ----------
+    __base_references : Dict[Hashable, str]
+        Normalized references of base images (key of Dockerfile is the key).
+    __dockerfile_asts : Dict[Hashable, DockerfileAST]
+        Dockerfile ASTs (key of Dockerfile is the key).
+    __targets : Dict[Hashable, int]
+        Indexes of target build stages (key of Dockerfile is the key).
+    __build_args : Dict[Hashable, Dict[str, str]]
+        Values of `--build-arg` options (key of Dockerfile is the key).
+    __image_names : Dict[Hashable, List[str]]
+        Normalized names of Docker images built by each Dockerfile (key of Dockerfile is the key).
+    __producers : Dict[str, Hashable]
+        Keys of Dockerfiles building Docker images (normalized image name is the key).
+    __configs : Dict[Hashable, ImageConfig]
+        Memoized configs of Docker images (key of Dockerfile is the key).
+    """
+    __REPR_FORMAT: str = "{0}(dockerfiles={1}, images={2})"
+
+    def __init__(self):
+        self.__base_references: Dict[Hashable, str] = dict()
+        self.__dockerfile_asts: Dict[Hashable, DockerfileAST] = dict()
+        self.__targets: Dict[Hashable, int] = dict()
+        self.__build_args: Dict[Hashable, Dict[str, str]] = dict()
+        self.__image_names: Dict[Hashable, List[str]] = dict()
+        self.__producers: Dict[str, Hashable] = dict()
+        self.__configs: Dict[Hashable, ImageConfig] = dict()
+
+    def add(
+            self,
+            key: Hashable,
+            dockerfile_ast: DockerfileAST,
+            image_names: Iterable[str],
+            target: Union[str, int] = None,
+            build_args: Dict[str, str] = None
+    ):
+        """
+        Add a Dockerfile building Docker images (replacing the Dockerfile of the same key).
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the Dockerfile (e.g. Dockerfile name).
+        dockerfile_ast : DockerfileAST
+            Dockerfile AST.
+        image_names : Iterable[str]
+            Names of Docker images built by the Dockerfile (e.g. `registry.example.com/base:1.0`).
+        target : str or int or None
+            Target build stage name or index (the last build stage if None).
+        build_args : Dict[str, str] or None
+            Values of `--build-arg` options (variable name is the key).
+
+        Raises
+        ------
+        ValueError
+            If a Docker image is built by another Dockerfile, or the Dockerfile has no target build stage.
+        """
+        normalized_names: List[str] = [normalize_image_reference(image_name) for image_name in image_names]
+        for image_name in normalized_names:
+            producer: Hashable = self.__producers.get(image_name, key)
+            if producer != key:
+                raise ValueError("ImageInheritanceGraph: {0} is built by both {1} and {2}.".format(
+                    image_name, repr(producer), repr(key)
+                ))
+        resolver: VariableResolver = VariableResolver(build_args)
+        stage_graph: BuildStageGraph = BuildStageGraph.of(dockerfile_ast, resolver)
+        # 対象ステージから`FROM <stage>`をたどり，ファイル外のイメージから始まるステージを探す
+        target_stage: BuildStage = stage_graph.stage(target)
+        root_stage: BuildStage = target_stage
+        while root_stage.base_stage is not None:
+            root_stage = stage_graph.stages[root_stage.base_stage]
+
+        self.__remove(key)
+        self.__base_references[key] = _resolve_image_reference(root_stage.from_instruction.image, resolver)
+        self.__dockerfile_asts[key] = dockerfile_ast
+        self.__targets[key] = target_stage.index
+        self.__build_args[key] = dict() if build_args is None else dict(build_args)
+        self.__image_names[key] = normalized_names
+        for image_name in normalized_names:
+            self.__producers[image_name] = key
+
+    def remove(self, key: Hashable):
+        """
+        Remove a Dockerfile.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the Dockerfile.
+        """
+        if key not in self.__base_references:
+            raise ValueError("ImageInheritanceGraph: {0} is not added.".format(repr(key)))
+        self.__remove(key)
+
+    def __remove(self, key: Hashable):
+        for image_name in self.__image_names.pop(key, list()):
+            del self.__producers[image_name]
+        self.__base_references.pop(key, None)
+        self.__dockerfile_asts.pop(key, None)
+        self.__targets.pop(key, None)
+        self.__build_args.pop(key, None)
+        # 子孫の設定が変わりうるため，メモを破棄
+        self.__configs.clear()
+
+    def keys(self) -> List[Hashable]:
+        """
+        Return keys of added Dockerfiles in the order of addition.
+        """
+        return list(self.__base_references.keys())
+
+    def base_image(self, key: Hashable) -> str:
+        """
+        Return the normalized reference of the Docker image a Dockerfile is built FROM (e.g. `ubuntu:22.04`).
+        """
+        return self.__base_references[key]
+
+    def image_names(self, key: Hashable) -> List[str]:
+        """
+        Return normalized names of Docker images built by a Dockerfile.
+        """
+        return self.__image_names[key]
+
+    def producer(self, image_name: str) -> Hashable:
+        """
+        Return the key of Dockerfile building a Docker image (None if not built in the corpus).
+        """
+        return self.__producers.get(normalize_image_reference(image_name))
+
+    def parent(self, key: Hashable) -> Hashable:
+        """
+        Return the key of Dockerfile building the base image of a Dockerfile (None if the base image is external).
+        """
+        return self.__producers.get(self.__base_references[key])
+
+    def children(self, key: Hashable) -> List[Hashable]:
+        """
+        Return keys of Dockerfiles built FROM Docker images built by a Dockerfile.
+        """
+        image_names: Set[str] = set(self.__image_names[key])
+        return [child for child, base_reference in self.__base_references.items() if base_reference in image_names]
+
+    def topological_order(self) -> List[Hashable]:
+        """
+        Return keys of Dockerfiles in an order where every Dockerfile follows its ancestors.
+
+        Returns
+        -------
+        keys : List[Hashable]
+            Keys of Dockerfiles.
+
+        Raises
+        ------
+        ValueError
+            If Docker images inherit each other cyclically.
+        """
+        ordered_keys: List[Hashable] = list()
+        visited: Set[Hashable] = set()
+        for key in self.__base_references:
+            ancestors: List[Hashable] = self.__unvisited_ancestors(key, visited)
+            visited.update(ancestors)
+            ordered_keys.extend(reversed(ancestors))
+        return ordered_keys
+
+    def image_config(self, key: Hashable) -> ImageConfig:
+        """
+        Return the config of Docker images built by a Dockerfile, including the config inherited from its ancestors.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the Dockerfile.
+
+        Returns
+        -------
+        image_config : ImageConfig
+            Config of the Docker images.
+
+        Raises
+        ------
+        ValueError
+            If Docker images inherit each other cyclically.
+        """
+        image_config: ImageConfig = self.__configs.get(key)
+        if image_config is not None:
+            return image_config
+        # メモ化されていない祖先だけを根の側から計算
+        ancestors: List[Hashable] = self.__unvisited_ancestors(key, self.__configs)
+        parent: Hashable = self.parent(ancestors[-1])
+        for ancestor in reversed(ancestors):
+            dockerfile_ast: DockerfileAST = self.__dockerfile_asts[ancestor]
+            build_args: Dict[str, str] = self.__build_args[ancestor]
+            if parent is None:
+                # 外部イメージから始まる場合はASTにキャッシュされた設定を共有
+                image_config = dockerfile_ast.image_config(self.__targets[ancestor], build_args)
+            else:
+                image_configs: List[ImageConfig] = evaluate_stage_configs(
+                    dockerfile_ast.instructions, build_args,
+                    functools.partial(_base_config, self.__base_references[ancestor], self.__configs[parent])
+                )
+                image_config = image_configs[self.__targets[ancestor]]
+            self.__configs[ancestor] = image_config
+            parent = ancestor
+        return image_config
+
+    def inherited_config(self, key: Hashable) -> ImageConfig:
+        """
+        Return the config a Dockerfile inherits from its base image (empty if the base image is external).
+        """
+        parent: Hashable = self.parent(key)
+        return ImageConfig() if parent is None else self.image_config(parent)
+
+    def __unvisited_ancestors(self, key: Hashable, visited) -> List[Hashable]:
+        """
+        Return `key` and its ancestors up to (excluding) the first visited one, from `key` toward the root.
+        """
+        ancestors: List[Hashable] = list()
+        ancestor_set: Set[Hashable] = set()
+        ancestor: Hashable = key
+        while ancestor is not None and ancestor not in visited:
+            if ancestor in ancestor_set:
+                raise ValueError("ImageInheritanceGraph: cyclic inheritance of Docker images: {0}".format(
+                    " -> ".join([repr(ancestor) for ancestor in ancestors + [ancestor]])
+                ))
+            ancestors.append(ancestor)
+            ancestor_set.add(ancestor)
+            ancestor = self.parent(ancestor)
+        return ancestors
+
+    def __contains__(self, key: Hashable):
+        return key in self.__base_references
+
+    def __len__(self):
+        return len(self.__base_references)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(len(self)), repr(len(self.__producers)))
+
+
+def normalize_image_reference(reference: str) -> str:
+    """
+    Normalize a Docker image reference so that references of the same Docker image are equal
+    (e.g. `docker.io/library/ubuntu` to `ubuntu:latest`).
+
+    Parameters
+    ----------
+    reference : str
+        Docker image reference.
+
+    Returns
+    -------
+    normalized_reference : str
+        Normalized Docker image reference.
+    """
+    for registry in _DEFAULT_REGISTRIES:
+        if reference.startswith(registry):
+            reference = reference[len(registry):]
+            if reference.startswith(_OFFICIAL_REPOSITORY_PREFIX) and reference.count("/") == 1:
+                reference = reference[len(_OFFICIAL_REPOSITORY_PREFIX):]
+            break
+    # タグもダイジェストもなければlatestタグ
+    if "@" not in reference and ":" not in reference[reference.rfind("/") + 1:]:
+        reference += ":latest"
+    return reference
+
+
+def _base_config(base_reference: str, inherited_config: ImageConfig, reference: str) -> ImageConfig:
+    """
+    Return the config of Docker image referred by a FROM Instruction (empty unless it is the inherited one).
+    """
+    return inherited_config if normalize_image_reference(reference) == base_reference else ImageConfig()
+
+
+def _resolve_image_reference(image: DockerImage, resolver: VariableResolver) -> str:
+    """
+    Return the normalized reference of Docker image referred by a FROM Instruction.
+    """
+    reference: str = resolver.resolve(image.name)
+    if image.tag is not None:
+        reference += ":" + resolver.resolve(image.tag)
+    if image.digest is not None:
+        reference += "@" + resolver.resolve(image.digest)
+    return normalize_image_reference(reference)
+
+
+_DEFAULT_REGISTRIES = ("docker.io/", "index.docker.io/", "registry-1.docker.io/")
+_OFFICIAL_REPOSITORY_PREFIX = "library/"
@@ -0,0 +1,434 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import mmap
+import os
+import re
+from typing import Dict, Iterable, List, Tuple
+
+from dockerfile_ast.build_context_index import BuildContextIndex, is_remote_source, matches_source
+from dockerfile_ast.build_context_index import normalize_context_path
+from dockerfile_ast.build_stage_graph import BuildStage, BuildStageGraph
+from dockerfile_ast.dockerfile_ast import DockerfileAST
+from dockerfile_ast.dockerfile_items.instructions import ARGInstruction, COPYInstruction, FileCopyInstruction
+from dockerfile_ast.dockerfile_items.instructions import Instruction, RUNInstruction
+from dockerfile_ast.dockerfile_items.nodes import DockerImage
+from dockerfile_ast.variable_resolver import VariableResolver
+
+
+class FileHashStore:
+    """
+    A store of SHA-256 digests of files, which re-hashes only files whose modification time or size changed.
+
+    Files are hashed in parallel threads via ``mmap`` (``hashlib`` releases the GIL while hashing),
+    and digests are persisted as JSON, so that unchanged files are not hashed again across runs.
+
+    Attributes
+    ----------
+    __filename : str
+        Store file name (not persisted if None).
+    __max_workers : int
+        Maximum number of threads hashing files (the default of ``ThreadPoolExecutor`` if None).
+    __entries : Dict[str, Tuple[int, int, str]]
+        Modification times in nanoseconds, sizes and digests of files (absolute filename is the key).
+    __is_modified : bool
+        True if entries have been modified after loaded or saved.
+    """
+    __REPR_FORMAT: str = "{0}(filename={1}, size={2})"
+    __JSON_VERSION: int = 1
+
+    def __init__(self, filename: str = None, max_workers: int = None):
+        """
+        Parameters
+        ----------
+        filename : str or None
+            Store file name (not persisted if None).
+        max_workers : int or None
+            Maximum number of threads hashing files.
+        """
+        self.__filename: str = filename
+        self.__max_workers: int = max_workers
+        self.__entries: Dict[str, Tuple[int, int, str]] = dict()
+        self.__is_modified: bool = False
+
+    @property
+    def filename(self) -> str:
+        """
+        Returns
+        -------
+        __filename : str or None
+            Store file name (not persisted if None).
+        """
+        return self.__filename
+
+    def digests(self, filenames: Iterable[str]) -> Dict[str, str]:
+        """
+        Return SHA-256 digests of files, hashing only files not stored or changed.
+
+        Parameters
+        ----------
+        filenames : Iterable[str]
+            File names.
+
+        Returns
+        -------
+        digests : Dict[str, str]
+            Hexadecimal digests (file name as given is the key).
+        """
+        digests: Dict[str, str] = dict()
+        stale: List[Tuple[str, str, os.stat_result]] = list()
+        for filename in filenames:
+            abs_filename: str = os.path.abspath(filename)
+            stat_result: os.stat_result = os.stat(abs_filename)
+            entry: Tuple[int, int, str] = self.__entries.get(abs_filename)
+            if entry is not None and entry[0] == stat_result.st_mtime_ns and entry[1] == stat_result.st_size:
+                digests[filename] = entry[2]
+            else:
+                stale.append((filename, abs_filename, stat_result))
+        if len(stale) > 0:
+            with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+                stale_digests = executor.map(_hash_file, [abs_filename for _, abs_filename, _ in stale])
+                for (filename, abs_filename, stat_result), digest in zip(stale, stale_digests):
+                    digests[filename] = digest
+                    self.__entries[abs_filename] = (stat_result.st_mtime_ns, stat_result.st_size, digest)
+            self.__is_modified = True
+        return digests
+
+    def load(self) -> bool:
+        """
+        Load entries from the store file.
+
+        Returns
+        -------
+        is_loaded : bool
+            True if loaded (False if the store file does not exist or is incompatible).
+        """
+        if self.__filename is None or not os.path.isfile(self.__filename):
+            return False
+        try:
+            with open(self.__filename) as fp:
+                content = json.load(fp)
+            if content.get("version") != self.__JSON_VERSION:
+                return False
+            entries: Dict[str, Tuple[int, int, str]] = {
+                filename: (int(mtime_ns), int(size), str(digest))
+                for filename, (mtime_ns, size, digest) in content["files"].items()
+            }
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return False
+        self.__entries = entries
+        self.__is_modified = False
+        return True
+
+    def save(self):
+        """
+        Save entries into the store file if modified (atomically replacing the store file).
+        """
+        if self.__filename is None or not self.__is_modified:
+            return
+        directory: str = os.path.dirname(self.__filename)
+        if len(directory) > 0:
+            os.makedirs(directory, exist_ok=True)
+        tmp_filename: str = "{0}.{1}.tmp".format(self.__filename, os.getpid())
+        with open(tmp_filename, "w") as fp:
+            json.dump({"version": self.__JSON_VERSION, "files": self.__entries}, fp)
+        os.replace(tmp_filename, self.__filename)
+        self.__is_modified = False
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(self.__filename), repr(len(self.__entries)))
+
+
+class LayerCacheAnalyzer:
+    """
+    An analyzer simulating BuildKit-style cache keys of Dockerfile Instructions against a local build context,
+    in order to predict which layers a change invalidates before running `docker build`.
+
+    The cache key of each Dockerfile Instruction chains the cache key of the previous Dockerfile Instruction
+    (or of the base image or build stage), the Instruction text, the values of ARG variables in scope it uses,
+    and the content of its sources: digests of files in the build context for COPY/ADD Instructions,
+    the cache key of the build stage for `COPY --from=<stage>`, or the image reference for `COPY --from=<image>`.
+    A RUN Instruction uses all ARG variables in scope (they are its environment variables),
+    and any other Dockerfile Instruction uses ARG variables referred to by its text (e.g. `$VERSION`),
+    so that a changed ARG value invalidates from the first Instruction using it, not from the ARG Instruction.
+    This approximates BuildKit, where metadata Instructions such as ENV or LABEL do not create layers.
+    Files ignored by `.dockerignore` of the build context are not sent to the builder, so they never invalidate.
+
+    Attributes
+    ----------
+    __context_directory : str
+        Absolute name of the build context directory.
+    __hash_store : FileHashStore
+        Store of digests of files in the build context.
+    __context_index : BuildContextIndex
+        Directory index of files in the build context, built on first use.
+    """
+    __REPR_FORMAT: str = "{0}(context_directory={1}, hash_store={2})"
+
+    def __init__(self, context_directory: str, hash_store: FileHashStore = None):
+        """
+        Parameters
+        ----------
+        context_directory : str
+            Build context directory.
+        hash_store : FileHashStore or None
+            Store of digests of files in the build context (not persisted if None).
+        """
+        self.__context_directory: str = os.path.abspath(context_directory)
+        self.__hash_store: FileHashStore = FileHashStore() if hash_store is None else hash_store
+        self.__context_index: BuildContextIndex = BuildContextIndex(self.__context_directory)
+
+    @property
+    def context_directory(self) -> str:
+        """
+        Returns
+        -------
+        __context_directory : str
+            Absolute name of the build context directory.
+        """
+        return self.__context_directory
+
+    @property
+    def hash_store(self) -> FileHashStore:
+        """
+        Returns
+        -------
+        __hash_store : FileHashStore
+            Store of digests of files in the build context.
+        """
+        return self.__hash_store
+
+    @property
+    def context_index(self) -> BuildContextIndex:
+        """
+        Returns
+        -------
+        __context_index : BuildContextIndex
+            Directory index of files in the build context, built on first use.
+        """
+        return self.__context_index
+
+    def layer_keys(
+            self,
+            dockerfile_ast: DockerfileAST,
+            build_args: Dict[str, str] = None
+    ) -> List[List[Tuple[Instruction, str]]]:
+        """
+        Compute cache keys of Dockerfile Instructions of each build stage.
+
+        Parameters
+        ----------
+        dockerfile_ast : DockerfileAST
+            Dockerfile AST.
+        build_args : Dict[str, str] or None
+            Values of `--build-arg` options (variable name is the key).
+
+        Returns
+        -------
+        layer_keys : List[List[Tuple[Instruction, str]]]
+            Dockerfile Instructions (starting with the FROM Instruction) and their cache keys (hexadecimal digests)
+            of each build stage in declaration order.
+        """
+        resolver: VariableResolver = VariableResolver(build_args)
+        stage_graph: BuildStageGraph = BuildStageGraph.of(dockerfile_ast, resolver)
+        stage_keys: List[str] = list()
+        layer_keys: List[List[Tuple[Instruction, str]]] = list()
+        for stage in stage_graph.stages:
+            if stage.base_stage is None:
+                key: str = _chain_key("", "FROM", _image_reference(stage.from_instruction.image, resolver))
+            else:
+                key: str = stage_keys[stage.base_stage]
+            keys: List[Tuple[Instruction, str]] = [(stage.from_instruction, key)]
+            # ARG変数はステージごとのスコープ
+            arg_values: Dict[str, str] = dict()
+            for instruction in stage.instructions:
+                if isinstance(instruction, ARGInstruction):
+                    arg_values[instruction.variable.name] = resolver.resolve(instruction.variable)
+                content: str = ""
+                if isinstance(instruction, FileCopyInstruction):
+                    dependency: int = _stage_dependency(stage_graph, stage, instruction, resolver)
+                    if dependency is not None:
+                        content = stage_keys[dependency]
+                    elif _is_image_copy(instruction):
+                        # Dockerイメージからのコピーはビルドコンテキストに依存しないため，イメージの参照を内容とする
+                        content = resolver.resolve(instruction.from_stage)
+                    else:
+                        content = self.__sources_digest(_source_patterns(instruction, resolver))
+                used_names: List[str] = [name for name in sorted(arg_values) if _uses_arg(instruction, name)]
+                key = _chain_key(
+                    key, instruction.raw_code,
+                    "\n".join(["{0}={1}".format(name, arg_values[name]) for name in used_names]), content
+                )
+                keys.append((instruction, key))
+            stage_keys.append(key)
+            layer_keys.append(keys)
+        self.__hash_store.save()
+        return layer_keys
+
+    def invalidated_layers(
+            self,
+            dockerfile_ast: DockerfileAST,
+            changed_filenames: Iterable[str],
+            build_args: Dict[str, str] = None
+    ) -> List[Instruction]:
+        """
+        Predict the first Dockerfile Instruction of each build stage whose cache a change of files invalidates,
+        without hashing files.
+
+        A COPY/ADD Instruction is invalidated if its sources include a changed file,
+        or it copies from an invalidated build stage (`COPY --from=<image>` is never invalidated by files).
+        A build stage built FROM an invalidated build stage is invalidated from its FROM Instruction.
+        All Dockerfile Instructions following an invalidated one in the build stage are invalidated as well.
+
+        Parameters
+        ----------
+        dockerfile_ast : DockerfileAST
+            Dockerfile AST.
+        changed_filenames : Iterable[str]
+            Changed (added, modified or removed) files, relative to the build context directory or absolute.
+        build_args : Dict[str, str] or None
+            Values of `--build-arg` options (variable name is the key).
+
+        Returns
+        -------
+        invalidated_instructions : List[Instruction]
+            First invalidated Dockerfile Instruction of each build stage in declaration order
+            (None if the cache of the build stage is still valid).
+        """
+        changed_paths: List[str] = [self.__relative_path(filename) for filename in changed_filenames]
+        changed_paths = [path for path in changed_paths if not self.__context_index.dockerignore.is_ignored(path)]
+        resolver: VariableResolver = VariableResolver(build_args)
+        stage_graph: BuildStageGraph = BuildStageGraph.of(dockerfile_ast, resolver)
+        invalidated_instructions: List[Instruction] = list()
+        for stage in stage_graph.stages:
+            invalidated_instruction: Instruction = None
+            if stage.base_stage is not None and invalidated_instructions[stage.base_stage] is not None:
+                invalidated_instruction = stage.from_instruction
+            for instruction in stage.instructions:
+                if invalidated_instruction is not None:
+                    break
+                if not isinstance(instruction, FileCopyInstruction):
+                    continue
+                dependency: int = _stage_dependency(stage_graph, stage, instruction, resolver)
+                if dependency is not None:
+                    is_invalidated: bool = invalidated_instructions[dependency] is not None
+                elif _is_image_copy(instruction):
+                    is_invalidated: bool = False
+                else:
+                    is_invalidated: bool = any(
+                        matches_source(pattern, path)
+                        for pattern in _source_patterns(instruction, resolver) if not is_remote_source(pattern)
+                        for path in changed_paths
+                    )
+                if is_invalidated:
+                    invalidated_instruction = instruction
+            invalidated_instructions.append(invalidated_instruction)
+        return invalidated_instructions
+
+    def __sources_digest(self, patterns: List[str]) -> str:
+        """
+        Return the digest of files matched by source patterns of a COPY/ADD Instruction.
+        """
+        lines: List[str] = list()
+        for pattern in patterns:
+            if is_remote_source(pattern):
+                # リモートのソースは取得しないと内容が分からないため，URLのみを鍵に含める
+                lines.append(pattern)
+                continue
+            paths: List[str] = self.__context_index.expand(pattern)
+            digests: Dict[str, str] = self.__hash_store.digests(
+                [os.path.join(self.__context_directory, path) for path in paths]
+            )
+            lines.append(pattern)
+            for path in paths:
+                lines.append("{0}\0{1}".format(path, digests[os.path.join(self.__context_directory, path)]))
+        return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+    def __relative_path(self, filename: str) -> str:
+        if os.path.isabs(filename):
+            filename = os.path.relpath(filename, self.__context_directory)
+        return normalize_context_path(filename.replace(os.sep, "/"))
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(self.__context_directory), repr(self.__hash_store)
+        )
+
+
+def _hash_file(filename: str) -> str:
+    """
+    Return the SHA-256 digest of a file, mapping it into memory instead of reading it.
+    """
+    with open(filename, "rb") as fp:
+        if os.fstat(fp.fileno()).st_size == 0:
+            return hashlib.sha256(b"").hexdigest()
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return hashlib.sha256(mapped).hexdigest()
+
+
+def _chain_key(parent_key: str, *values: str) -> str:
+    return hashlib.sha256("\0".join((parent_key,) + values).encode("utf-8")).hexdigest()
+
+
+def _image_reference(image: DockerImage, resolver: VariableResolver) -> str:
+    reference: str = resolver.resolve(image.name)
+    if image.tag is not None:
+        reference += ":" + resolver.resolve(image.tag)
+    if image.digest is not None:
+        reference += "@" + resolver.resolve(image.digest)
+    if image.platform is not None:
+        reference += " " + resolver.resolve(image.platform)
+    return reference
+
+
+def _uses_arg(instruction: Instruction, name: str) -> bool:
+    """
+    Return True if a Dockerfile Instruction uses an ARG variable
+    (RUN Instructions use all ARG variables in scope as environment variables).
+    """
+    if isinstance(instruction, RUNInstruction):
+        return True
+    return re.search(r"\$\{?" + re.escape(name) + r"(?!\w)", instruction.raw_code) is not None
+
+
+def _source_patterns(instruction: FileCopyInstruction, resolver: VariableResolver) -> List[str]:
+    """
+    Return source patterns of a COPY/ADD Instruction (all arguments but the destination, excluding heredocs).
+    """
+    return [resolver.resolve(source) for source in instruction.sources]
+
+
+def _is_image_copy(instruction: FileCopyInstruction) -> bool:
+    """
+    Return True if a COPY/ADD Instruction copies from `--from=<name>` instead of the build context
+    (a Docker image unless ``_stage_dependency`` finds the build stage).
+    """
+    return isinstance(instruction, COPYInstruction) and instruction.from_stage is not None
+
+
+def _stage_dependency(
+        stage_graph: BuildStageGraph,
+        stage: BuildStage,
+        instruction: FileCopyInstruction,
+        resolver: VariableResolver
+) -> int:
+    """
+    Return the index of build stage a `COPY --from=<stage>` Instruction copies from
+    (None if it copies from the build context or a Docker image).
+    """
+    if not isinstance(instruction, COPYInstruction) or instruction.from_stage is None:
+        return None
+    reference: str = resolver.resolve(instruction.from_stage)
+    if reference.isdigit():
+        return int(reference) if int(reference) < stage.index else None
+    try:
+        dependency: int = stage_graph.stage(reference).index
+    except ValueError:
+        # Dockerイメージからのコピー
+        return None
+    return dependency if dependency < stage.index else None
@@ -0,0 +1,163 @@
+import enum
+import gc
+import logging
+import sys
+import types
+from typing import Any, Dict, Iterable, List, Set
+
+from dockerfile_ast.node_interner import NodeInterner
+from dockerfile_ast.parse_statistics import ParseStatistics
+
+
+class MemoryFootprint:
+    """
+    Bytes of objects referred by Dockerfile ASTs, accounted by class.
+
+    Object graphs of Dockerfile ASTs are walked once, and each object is counted once
+    however many nodes or ASTs share it (e.g. nodes interned by ``NodeInterner``, scopes of ARG/ENV variables
+    shared by Instructions built in lazy mode), so that a footprint of a corpus is not more than its actual size.
+    Instance dicts of nodes are counted as a part of the nodes.
+    Objects not owned by ASTs (e.g. classes, functions, ``NodeInterner`` and ``ParseStatistics`` referred by
+    Instructions not built yet in lazy mode) are not counted.
+
+    Accumulated Dockerfile ASTs must not be released until accounting is finished,
+    since objects are identified by ``id()``.
+
+    Attributes
+    ----------
+    __class_bytes : Dict[str, int]
+        Bytes of objects of each class (class name is the key).
+    __class_counts : Dict[str, int]
+        Number of objects of each class (class name is the key).
+    __seen_ids : Set[int]
+        IDs of counted objects.
+    """
+    __REPR_FORMAT: str = "{0}(total_bytes={1}, objects={2})"
+
+    def __init__(self):
+        self.__class_bytes: Dict[str, int] = dict()
+        self.__class_counts: Dict[str, int] = dict()
+        self.__seen_ids: Set[int] = set()
+
+    @property
+    def class_bytes(self) -> Dict[str, int]:
+        """
+        Returns
+        -------
+        __class_bytes : Dict[str, int]
+            Bytes of objects of each class (class name is the key).
+        """
+        return self.__class_bytes
+
+    @property
+    def class_counts(self) -> Dict[str, int]:
+        """
+        Returns
+        -------
+        __class_counts : Dict[str, int]
+            Number of objects of each class (class name is the key).
+        """
+        return self.__class_counts
+
+    @property
+    def total_bytes(self) -> int:
+        """
+        Returns
+        -------
+        total_bytes : int
+            Bytes of all counted objects.
+        """
+        return sum(self.__class_bytes.values())
+
+    def add(self, root: Any) -> int:
+        """
+        Count objects referred by an object (e.g. ``DockerfileAST``) which have not been counted yet.
+
+        Parameters
+        ----------
+        root : Any
+            Object to be walked (e.g. ``DockerfileAST``, ``Instruction`` or a list of them).
+
+        Returns
+        -------
+        added_bytes : int
+            Bytes of newly counted objects.
+        """
+        added_bytes: int = 0
+        stack: List[Any] = [root]
+        while len(stack) > 0:
+            obj: Any = stack.pop()
+            if id(obj) in self.__seen_ids or _is_excluded(obj):
+                continue
+            self.__seen_ids.add(id(obj))
+            size: int = sys.getsizeof(obj)
+            if type(obj).__module__.startswith(_PACKAGE_NAME) and hasattr(obj, "__dict__"):
+                # ノードのインスタンス辞書はノードの一部として計上
+                instance_dict: Dict[str, Any] = vars(obj)
+                self.__seen_ids.add(id(instance_dict))
+                size += sys.getsizeof(instance_dict)
+                stack.extend(instance_dict.values())
+            else:
+                stack.extend(gc.get_referents(obj))
+            class_name: str = type(obj).__name__
+            self.__class_bytes[class_name] = self.__class_bytes.get(class_name, 0) + size
+            self.__class_counts[class_name] = self.__class_counts.get(class_name, 0) + 1
+            added_bytes += size
+        return added_bytes
+
+    def summary(self) -> str:
+        """
+        Format bytes by class as human-readable text.
+
+        Returns
+        -------
+        summary : str
+            Human-readable text.
+        """
+        lines = ["total: {0} B, objects: {1}".format(self.total_bytes, sum(self.__class_counts.values()))]
+        for class_name in sorted(self.__class_bytes, key=self.__class_bytes.get, reverse=True):
+            lines.append("  {0:<24} {1:>12} B {2:>8}".format(
+                class_name, self.__class_bytes[class_name], self.__class_counts[class_name]
+            ))
+        return "\n".join(lines)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(self.total_bytes), repr(sum(self.__class_counts.values()))
+        )
+
+
+def corpus_memory_footprint(dockerfile_asts: Iterable[Any]) -> MemoryFootprint:
+    """
+    Account memory of a corpus of Dockerfile ASTs, counting objects shared by the ASTs once.
+
+    Parameters
+    ----------
+    dockerfile_asts : Iterable[DockerfileAST]
+        Dockerfile ASTs, which must not be released until this function returns.
+
+    Returns
+    -------
+    memory_footprint : MemoryFootprint
+        Bytes of the corpus by class.
+    """
+    memory_footprint: MemoryFootprint = MemoryFootprint()
+    for dockerfile_ast in dockerfile_asts:
+        memory_footprint.add(dockerfile_ast)
+    return memory_footprint
+
+
+def _is_excluded(obj: Any) -> bool:
+    """
+    Return True if `obj` is not owned by Dockerfile ASTs.
+    """
+    return obj is None or isinstance(obj, _EXCLUDED_TYPES)
+
+
+_PACKAGE_NAME: str = "dockerfile_ast"
+# ASTが所有しないオブジェクト（クラス，関数，遅延構築前の命令が参照するparserの状態など）
+_EXCLUDED_TYPES = (
+    bool, type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType, types.CodeType,
+    enum.Enum, logging.Logger, NodeInterner, ParseStatistics
+)
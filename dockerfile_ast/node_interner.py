@@ -0,0 +1,170 @@
+import sys
+import weakref
+from typing import Dict, Tuple
+
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashConstant
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashValueNode
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashVariable
+from dockerfile_ast.dockerfile_items.bash_items.nodes import Filepath
+from dockerfile_ast.dockerfile_items.nodes import DockerPort
+
+
+class NodeInterner:
+    """
+    An intern table of immutable value nodes (flyweights).
+
+    Each distinct ``BashConstant``, plain ``BashVariable`` (neither ARG nor ENV variable),
+    and ``DockerPort``/``Filepath`` consisting only of constants exists once per table,
+    so that a large corpus of Dockerfile ASTs shares them and equal nodes are identical.
+
+    ``PROCESS_NODE_INTERNER`` is the process-wide table holding weak references,
+    so that nodes no longer referred by any AST are released.
+    Create a ``NodeInterner`` for a corpus session in order to hold nodes until it is released or cleared.
+
+    Attributes
+    ----------
+    __weak : bool
+        True if this table holds weak references to nodes.
+    __constants : Dict[str, BashConstant]
+        Interned Bash constants (value is the key).
+    __variables : Dict[str, BashVariable]
+        Interned plain Bash variables (name is the key).
+    __ports : Dict[Tuple[str, str], DockerPort]
+        Interned Docker ports (port number and protocol are the key).
+    __filepaths : Dict[str, Filepath]
+        Interned filepaths (filepath is the key).
+    """
+    __REPR_FORMAT: str = "{0}(weak={1}, size={2})"
+
+    def __init__(self, weak: bool = False):
+        """
+        Parameters
+        ----------
+        weak : bool
+            True if this table holds weak references to nodes.
+        """
+        self.__weak: bool = weak
+        table_type = weakref.WeakValueDictionary if weak else dict
+        self.__constants: Dict[str, BashConstant] = table_type()
+        self.__variables: Dict[str, BashVariable] = table_type()
+        self.__ports: Dict[Tuple[str, str], DockerPort] = table_type()
+        self.__filepaths: Dict[str, Filepath] = table_type()
+
+    @property
+    def weak(self) -> bool:
+        """
+        Returns
+        -------
+        __weak : bool
+            True if this table holds weak references to nodes.
+        """
+        return self.__weak
+
+    def constant(self, value: str) -> BashConstant:
+        """
+        Return the interned Bash constant.
+
+        Parameters
+        ----------
+        value : str
+            Value of the constant.
+
+        Returns
+        -------
+        bash_constant : BashConstant
+            Interned Bash constant.
+        """
+        node: BashConstant = self.__constants.get(value)
+        if node is None:
+            value = sys.intern(value)
+            node = BashConstant(value)
+            self.__constants[value] = node
+        return node
+
+    def variable(self, name: str) -> BashVariable:
+        """
+        Return the interned plain Bash variable (neither ARG nor ENV variable).
+
+        Parameters
+        ----------
+        name : str
+            Name of the variable.
+
+        Returns
+        -------
+        bash_variable : BashVariable
+            Interned Bash variable.
+        """
+        node: BashVariable = self.__variables.get(name)
+        if node is None:
+            name = sys.intern(name)
+            node = BashVariable(name)
+            self.__variables[name] = node
+        return node
+
+    def port(self, port_num: BashValueNode, protocol: BashValueNode = None) -> DockerPort:
+        """
+        Return the interned Docker port if it consists only of constants, otherwise a new Docker port.
+
+        Parameters
+        ----------
+        port_num : BashValueNode
+            Port number of the port.
+        protocol : BashValueNode or None
+            Ethernet protocol of the port.
+
+        Returns
+        -------
+        docker_port : DockerPort
+            Docker port.
+        """
+        if not isinstance(port_num, BashConstant) or not (protocol is None or isinstance(protocol, BashConstant)):
+            return DockerPort(port_num, protocol)
+        key: Tuple[str, str] = (port_num.value, None if protocol is None else protocol.value)
+        node: DockerPort = self.__ports.get(key)
+        if node is None:
+            node = DockerPort(self.constant(key[0]), None if protocol is None else self.constant(key[1]))
+            self.__ports[key] = node
+        return node
+
+    def filepath(self, value: BashValueNode) -> Filepath:
+        """
+        Return the interned filepath if it is a constant, otherwise a new filepath.
+
+        Parameters
+        ----------
+        value : BashValueNode
+            Concrete filepath.
+
+        Returns
+        -------
+        filepath : Filepath
+            Filepath.
+        """
+        if not isinstance(value, BashConstant):
+            return Filepath(value)
+        node: Filepath = self.__filepaths.get(value.value)
+        if node is None:
+            node = Filepath(self.constant(value.value))
+            self.__filepaths[value.value] = node
+        return node
+
+    def clear(self):
+        """
+        Release all interned nodes (nodes already referred by ASTs are not affected).
+        """
+        self.__constants.clear()
+        self.__variables.clear()
+        self.__ports.clear()
+        self.__filepaths.clear()
+
+    def __len__(self):
+        return len(self.__constants) + len(self.__variables) + len(self.__ports) + len(self.__filepaths)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(self.__weak), repr(len(self)))
+
+
+# プロセス全体で共有する（弱参照の）intern表
+PROCESS_NODE_INTERNER: NodeInterner = NodeInterner(weak=True)
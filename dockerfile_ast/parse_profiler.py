@@ -0,0 +1,202 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class ParseProfiler:
+    """
+    A profiler of parsing and visiting Dockerfiles of a corpus, in order to find where time and memory go.
+
+    Each call of ``profile`` runs under ``cProfile`` (whose stats are aggregated over all calls)
+    and ``tracemalloc`` (which records the peak of traced memory during the call,
+    and the allocation sites of memory left allocated after the call).
+    ``tracemalloc`` is started on the first call of ``profile`` and stopped by ``close``.
+
+    Timings are inflated by both profilers, so compare them only with each other
+    (use ``ParseStatistics`` or ``benchmarks`` for absolute timings).
+
+    Attributes
+    ----------
+    __profile : cProfile.Profile
+        Profile aggregated over all calls of ``profile``.
+    __file_seconds : Dict[str, float]
+        Elapsed seconds of each profiled Dockerfile (Dockerfile name is the key).
+    __file_peak_bytes : Dict[str, int]
+        Peak bytes of traced memory allocated while profiling each Dockerfile (Dockerfile name is the key).
+    __allocations : Dict[str, List[int]]
+        Bytes and number of memory blocks left allocated by each allocation site (`file:line` is the key).
+    __started_tracemalloc : bool
+        True if ``tracemalloc`` was started by this profiler.
+    """
+    __REPR_FORMAT: str = "{0}(files={1}, seconds={2})"
+
+    def __init__(self):
+        self.__profile: cProfile.Profile = cProfile.Profile()
+        self.__file_seconds: Dict[str, float] = dict()
+        self.__file_peak_bytes: Dict[str, int] = dict()
+        self.__allocations: Dict[str, List[int]] = dict()
+        self.__started_tracemalloc: bool = False
+
+    @property
+    def file_seconds(self) -> Dict[str, float]:
+        """
+        Returns
+        -------
+        __file_seconds : Dict[str, float]
+            Elapsed seconds of each profiled Dockerfile (Dockerfile name is the key).
+        """
+        return self.__file_seconds
+
+    @property
+    def file_peak_bytes(self) -> Dict[str, int]:
+        """
+        Returns
+        -------
+        __file_peak_bytes : Dict[str, int]
+            Peak bytes of traced memory allocated while profiling each Dockerfile (Dockerfile name is the key).
+        """
+        return self.__file_peak_bytes
+
+    def profile(self, filename: str, function: Callable[..., Any], *args) -> Any:
+        """
+        Call a function processing a Dockerfile (e.g. parse and visit it) under the profilers.
+
+        Parameters
+        ----------
+        filename : str
+            Dockerfile name.
+        function : Callable[..., Any]
+            Function to be called.
+        *args
+            Arguments of the function.
+
+        Returns
+        -------
+        result : Any
+            Return value of the function.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracemalloc = True
+        before: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        start_bytes: int = tracemalloc.get_traced_memory()[0]
+        start: float = time.perf_counter()
+        self.__profile.enable()
+        try:
+            return function(*args)
+        finally:
+            self.__profile.disable()
+            self.__file_seconds[filename] = self.__file_seconds.get(filename, 0.0) + time.perf_counter() - start
+            peak_bytes: int = tracemalloc.get_traced_memory()[1] - start_bytes
+            self.__file_peak_bytes[filename] = max(self.__file_peak_bytes.get(filename, 0), peak_bytes)
+            self.__add_allocations(before, tracemalloc.take_snapshot())
+
+    def __add_allocations(self, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot):
+        # スナップショット自体の確保を除外
+        filters = (tracemalloc.Filter(False, tracemalloc.__file__),)
+        for statistic in after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno"):
+            if statistic.size_diff <= 0:
+                continue
+            frame: tracemalloc.Frame = statistic.traceback[0]
+            allocation: List[int] = self.__allocations.setdefault(
+                "{0}:{1}".format(frame.filename, frame.lineno), [0, 0]
+            )
+            allocation[0] += statistic.size_diff
+            allocation[1] += statistic.count_diff
+
+    def slowest(self, n: int = 10) -> List[Tuple[str, float, int]]:
+        """
+        Return the slowest Dockerfiles.
+
+        Parameters
+        ----------
+        n : int
+            Number of Dockerfiles.
+
+        Returns
+        -------
+        slowest_files : List[Tuple[str, float, int]]
+            Dockerfile names, elapsed seconds and peak bytes of traced memory, in descending order of elapsed seconds.
+        """
+        filenames: List[str] = sorted(self.__file_seconds, key=self.__file_seconds.get, reverse=True)[:n]
+        return [(filename, self.__file_seconds[filename], self.__file_peak_bytes[filename]) for filename in filenames]
+
+    def top_allocations(self, n: int = 10) -> List[Tuple[str, int, int]]:
+        """
+        Return the allocation sites which left the most memory allocated.
+
+        Parameters
+        ----------
+        n : int
+            Number of allocation sites.
+
+        Returns
+        -------
+        allocations : List[Tuple[str, int, int]]
+            Allocation sites (`file:line`), bytes and number of memory blocks, in descending order of bytes.
+        """
+        sites: List[str] = sorted(self.__allocations, key=lambda site: self.__allocations[site][0], reverse=True)[:n]
+        return [(site, self.__allocations[site][0], self.__allocations[site][1]) for site in sites]
+
+    def dump_stats(self, filename: str):
+        """
+        Save the aggregated ``cProfile`` stats, which can be loaded by ``pstats.Stats`` (or e.g. snakeviz).
+
+        Parameters
+        ----------
+        filename : str
+            Stats file name.
+        """
+        self.__profile.dump_stats(filename)
+
+    def report(self, n: int = 10) -> str:
+        """
+        Format the slowest Dockerfiles, the top allocation sites and the top functions as human-readable text.
+
+        Parameters
+        ----------
+        n : int
+            Number of rows of each section.
+
+        Returns
+        -------
+        report : str
+            Human-readable text.
+        """
+        lines = ["files: {0}, seconds: {1:.6f}".format(len(self.__file_seconds), sum(self.__file_seconds.values()))]
+        lines.append("slowest files:")
+        for filename, seconds, peak_bytes in self.slowest(n):
+            lines.append("  {0:10.6f}s {1:>12} B peak  {2}".format(seconds, peak_bytes, filename))
+        lines.append("top allocation sites:")
+        for site, size, count in self.top_allocations(n):
+            lines.append("  {0:>12} B {1:>8} blocks  {2}".format(size, count, site))
+        lines.append("top functions:")
+        if len(self.__file_seconds) > 0:
+            stream = io.StringIO()
+            pstats.Stats(self.__profile, stream=stream).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(n)
+            lines.append(stream.getvalue().strip("\n"))
+        return "\n".join(lines)
+
+    def close(self):
+        """
+        Stop ``tracemalloc`` if it was started by this profiler.
+        """
+        if self.__started_tracemalloc:
+            tracemalloc.stop()
+            self.__started_tracemalloc = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(len(self.__file_seconds)), repr(sum(self.__file_seconds.values()))
+        )
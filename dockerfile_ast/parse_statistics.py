@@ -0,0 +1,246 @@
+import time
+from typing import Any, Callable, Dict
+
+
+class ParseStatistics:
+    """
+    Cumulative timers and counters of parsing Dockerfiles.
+
+    Pass an instance to ``dockerfile_ast.DockerfileParser`` in order to instrument it.
+    Time of each phase is accumulated in seconds:
+
+    * ``cst``: Dockerfile CST generation (including reparses on ONBUILD/HEALTHCHECK Instructions)
+    * ``bashlex``: ``bashlex.parse`` calls
+    * ``regex``: splitting Bash words into variables and constants
+    * ``node``: the rest of building Dockerfile AST nodes
+
+    Bodies of Dockerfile Instructions built on first access (lazy mode) are counted on access,
+    outside of the instruction timers.
+
+    Attributes
+    ----------
+    __phase_seconds : Dict[str, float]
+        Cumulative seconds of each phase (phase name is the key).
+    __instruction_seconds : Dict[str, float]
+        Cumulative seconds of parsing each type of Dockerfile Instructions (instruction name is the key).
+    __instruction_counts : Dict[str, int]
+        Number of parsed Dockerfile Instructions of each type (instruction name is the key).
+    __reparse_counts : Dict[str, int]
+        Number of reparses of Dockerfile Instructions nested in ONBUILD/HEALTHCHECK Instructions.
+    __bashlex_calls : int
+        Number of ``bashlex.parse`` calls.
+    __bytes_read : int
+        Bytes of parsed Dockerfile source code.
+    __files : int
+        Number of parsed Dockerfiles.
+    __callback : Callable[[ParseStatistics, str], None]
+        Function called with this instance and the filename (None if parsed from a string)
+        after each Dockerfile is parsed, e.g. in order to export metrics.
+    """
+    CST_PHASE: str = "cst"
+    BASHLEX_PHASE: str = "bashlex"
+    REGEX_PHASE: str = "regex"
+    NODE_PHASE: str = "node"
+    PHASES = (CST_PHASE, BASHLEX_PHASE, REGEX_PHASE, NODE_PHASE)
+    __REPR_FORMAT: str = "{0}(files={1}, bytes_read={2}, bashlex_calls={3}, phase_seconds={4})"
+
+    def __init__(self, callback: Callable[["ParseStatistics", str], None] = None):
+        """
+        Parameters
+        ----------
+        callback : Callable[[ParseStatistics, str], None] or None
+            Function called with this instance and the filename (None if parsed from a string)
+            after each Dockerfile is parsed.
+        """
+        self.__callback: Callable[[ParseStatistics, str], None] = callback
+        self.__phase_seconds: Dict[str, float] = dict()
+        self.__instruction_seconds: Dict[str, float] = dict()
+        self.__instruction_counts: Dict[str, int] = dict()
+        self.__reparse_counts: Dict[str, int] = dict()
+        self.__bashlex_calls: int = 0
+        self.__bytes_read: int = 0
+        self.__files: int = 0
+        self.reset()
+
+    def reset(self):
+        """
+        Reset all timers and counters.
+        """
+        self.__phase_seconds = {phase: 0.0 for phase in self.PHASES}
+        self.__instruction_seconds = dict()
+        self.__instruction_counts = dict()
+        self.__reparse_counts = dict()
+        self.__bashlex_calls = 0
+        self.__bytes_read = 0
+        self.__files = 0
+
+    @property
+    def phase_seconds(self) -> Dict[str, float]:
+        """
+        Returns
+        -------
+        __phase_seconds : Dict[str, float]
+            Cumulative seconds of each phase (phase name is the key).
+        """
+        return self.__phase_seconds
+
+    @property
+    def instruction_seconds(self) -> Dict[str, float]:
+        """
+        Returns
+        -------
+        __instruction_seconds : Dict[str, float]
+            Cumulative seconds of parsing each type of Dockerfile Instructions (instruction name is the key).
+        """
+        return self.__instruction_seconds
+
+    @property
+    def instruction_counts(self) -> Dict[str, int]:
+        """
+        Returns
+        -------
+        __instruction_counts : Dict[str, int]
+            Number of parsed Dockerfile Instructions of each type (instruction name is the key).
+        """
+        return self.__instruction_counts
+
+    @property
+    def reparse_counts(self) -> Dict[str, int]:
+        """
+        Returns
+        -------
+        __reparse_counts : Dict[str, int]
+            Number of reparses of Dockerfile Instructions nested in ONBUILD/HEALTHCHECK Instructions.
+        """
+        return self.__reparse_counts
+
+    @property
+    def bashlex_calls(self) -> int:
+        """
+        Returns
+        -------
+        __bashlex_calls : int
+            Number of ``bashlex.parse`` calls.
+        """
+        return self.__bashlex_calls
+
+    @property
+    def bytes_read(self) -> int:
+        """
+        Returns
+        -------
+        __bytes_read : int
+            Bytes of parsed Dockerfile source code.
+        """
+        return self.__bytes_read
+
+    @property
+    def files(self) -> int:
+        """
+        Returns
+        -------
+        __files : int
+            Number of parsed Dockerfiles.
+        """
+        return self.__files
+
+    def measure(self, phase: str, function: Callable[..., Any], *args) -> Any:
+        """
+        Call a function and add its elapsed time to a phase.
+
+        Parameters
+        ----------
+        phase : str
+            Phase name.
+        function : Callable[..., Any]
+            Function to be called.
+        *args
+            Arguments of the function.
+
+        Returns
+        -------
+        result : Any
+            Return value of the function.
+        """
+        start: float = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.__phase_seconds[phase] += time.perf_counter() - start
+
+    def add_instruction(self, instruction_name: str, seconds: float):
+        """
+        Add elapsed time of parsing a Dockerfile Instruction.
+        """
+        self.__instruction_seconds[instruction_name] = self.__instruction_seconds.get(instruction_name, 0.0) + seconds
+        self.__instruction_counts[instruction_name] = self.__instruction_counts.get(instruction_name, 0) + 1
+
+    def add_phase_seconds(self, phase: str, seconds: float):
+        """
+        Add elapsed time to a phase.
+        """
+        self.__phase_seconds[phase] += seconds
+
+    def count_bashlex_call(self):
+        """
+        Count a ``bashlex.parse`` call.
+        """
+        self.__bashlex_calls += 1
+
+    def count_reparse(self, instruction_name: str):
+        """
+        Count a reparse of Dockerfile Instruction nested in an ONBUILD/HEALTHCHECK Instruction.
+        """
+        self.__reparse_counts[instruction_name] = self.__reparse_counts.get(instruction_name, 0) + 1
+
+    def add_file(self, filename: str, bytes_read: int):
+        """
+        Count a parsed Dockerfile and call the callback.
+
+        Parameters
+        ----------
+        filename : str or None
+            Dockerfile name (None if parsed from a string).
+        bytes_read : int
+            Bytes of the Dockerfile source code.
+        """
+        self.__files += 1
+        self.__bytes_read += bytes_read
+        if self.__callback is not None:
+            self.__callback(self, filename)
+
+    def summary(self) -> str:
+        """
+        Format timers and counters as human-readable text.
+
+        Returns
+        -------
+        summary : str
+            Human-readable text.
+        """
+        lines = [
+            "files: {0}, bytes read: {1}, bashlex calls: {2}".format(
+                self.__files, self.__bytes_read, self.__bashlex_calls
+            ),
+            "phases:",
+        ]
+        for phase in self.PHASES:
+            lines.append("  {0:<8} {1:10.6f}s".format(phase, self.__phase_seconds[phase]))
+        lines.append("instructions:")
+        for instruction_name in sorted(self.__instruction_seconds, key=self.__instruction_seconds.get, reverse=True):
+            lines.append("  {0:<11} {1:10.6f}s {2:>8}".format(
+                instruction_name, self.__instruction_seconds[instruction_name],
+                self.__instruction_counts[instruction_name]
+            ))
+        if len(self.__reparse_counts) > 0:
+            lines.append("reparses:")
+            for instruction_name in sorted(self.__reparse_counts):
+                lines.append("  {0:<11} {1:>8}".format(instruction_name, self.__reparse_counts[instruction_name]))
+        return "\n".join(lines)
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(
+            self_class_name, repr(self.__files), repr(self.__bytes_read), repr(self.__bashlex_calls),
+            repr(self.__phase_seconds)
+        )
@@ -0,0 +1,164 @@
+import bisect
+from typing import Dict, Hashable, List, Tuple
+
+from dockerfile_ast.dockerfile_ast import DockerfileAST
+from dockerfile_ast.variable_resolver import VariableResolver
+
+
+class PortIntervalIndex:
+    """
+    An index of ports exposed by Dockerfiles of a corpus, answering which Dockerfiles expose a port.
+
+    Port ranges are kept as intervals without being expanded.
+    On first query after additions, the intervals of each protocol are sorted by their first port numbers
+    and split at their endpoints into sorted disjoint segments, each of which has only the number of intervals
+    covering its ports (O(n) memory for n intervals).
+    Each query finds the segment by a binary search, and collects the keys of the covering intervals
+    by scanning intervals starting at or before the port backwards until the number of the segment is reached.
+
+    Attributes
+    ----------
+    __intervals : Dict[str, List[Tuple[int, int, Hashable]]]
+        First and last (inclusive) port numbers and the key of Dockerfile of each interval (protocol is the key).
+    __segments : Dict[str, Tuple[List[int], List[int], List[int], List[Tuple[int, int, int]]]]
+        First port numbers of segments, numbers of intervals covering each segment,
+        and first port numbers of intervals sorted by them, along with the last port numbers and the indexes
+        (in ``__intervals``) of the intervals (protocol is the key), None if not built since the last addition.
+    """
+    __REPR_FORMAT: str = "{0}(intervals={1}, protocols={2})"
+
+    def __init__(self):
+        self.__intervals: Dict[str, List[Tuple[int, int, Hashable]]] = dict()
+        self.__segments: Dict[str, Tuple[List[int], List[int], List[int], List[Tuple[int, int, int]]]] = None
+
+    @property
+    def protocols(self) -> List[str]:
+        """
+        Returns
+        -------
+        protocols : List[str]
+            Protocols of indexed ports.
+        """
+        return list(self.__intervals.keys())
+
+    def add(self, key: Hashable, dockerfile_ast: DockerfileAST, resolver: VariableResolver = None):
+        """
+        Add ports exposed by a Dockerfile.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the Dockerfile (e.g. Dockerfile name).
+        dockerfile_ast : DockerfileAST
+            Dockerfile AST.
+        resolver : VariableResolver or None
+            Resolver of ports referring variables (such ports are skipped if None).
+        """
+        for start, end, protocol in dockerfile_ast.exposed_port_intervals(resolver):
+            self.add_interval(key, start, end, protocol)
+
+    def add_interval(self, key: Hashable, start: int, end: int, protocol: str = "tcp"):
+        """
+        Add an interval of ports exposed by a Dockerfile.
+
+        Parameters
+        ----------
+        key : Hashable
+            Key of the Dockerfile (e.g. Dockerfile name).
+        start : int
+            First port number.
+        end : int
+            Last port number (inclusive).
+        protocol : str
+            Protocol of the ports.
+        """
+        if start > end:
+            raise ValueError("Illegal port interval: {0}-{1}".format(str(start), str(end)))
+        self.__intervals.setdefault(protocol.lower(), list()).append((start, end, key))
+        self.__segments = None
+
+    def find(self, port_num: int, protocol: str = None) -> List[Hashable]:
+        """
+        Return keys of Dockerfiles exposing a port.
+
+        Parameters
+        ----------
+        port_num : int
+            Port number.
+        protocol : str or None
+            Protocol of the port (any protocol if None).
+
+        Returns
+        -------
+        keys : List[Hashable]
+            Keys of Dockerfiles (in the order of addition within each protocol).
+        """
+        if self.__segments is None:
+            self.__build()
+        protocols: List[str] = list(self.__segments.keys()) if protocol is None else [protocol.lower()]
+        keys: Dict[Hashable, None] = dict()
+        for segment_protocol in protocols:
+            segments: Tuple[List[int], List[int], List[int], List[Tuple[int, int, int]]] \
+                = self.__segments.get(segment_protocol)
+            if segments is None:
+                continue
+            starts, counts, interval_starts, sorted_intervals = segments
+            index: int = bisect.bisect_right(starts, port_num) - 1
+            if index < 0 or counts[index] < 1:
+                continue
+            # 区間を始点の降順に走査し，セグメントを覆う区間数だけ見つかれば打ち切る
+            interval_indexes: List[int] = list()
+            for interval_index in range(bisect.bisect_right(interval_starts, port_num) - 1, -1, -1):
+                _, end, order = sorted_intervals[interval_index]
+                if end >= port_num:
+                    interval_indexes.append(order)
+                    if len(interval_indexes) >= counts[index]:
+                        break
+            intervals: List[Tuple[int, int, Hashable]] = self.__intervals[segment_protocol]
+            keys.update(dict.fromkeys(intervals[order][2] for order in sorted(interval_indexes)))
+        return list(keys)
+
+    def exposes(self, port_num: int, protocol: str = None) -> bool:
+        """
+        Return whether any Dockerfile exposes a port.
+
+        Parameters
+        ----------
+        port_num : int
+            Port number.
+        protocol : str or None
+            Protocol of the port (any protocol if None).
+
+        Returns
+        -------
+        exposes : bool
+            True if any Dockerfile exposes the port.
+        """
+        return len(self.find(port_num, protocol)) > 0
+
+    def __build(self):
+        self.__segments = dict()
+        for protocol, intervals in self.__intervals.items():
+            # 区間の始点で1増やし，終点の次で1減らすイベントを，ポート番号順に走査
+            events: Dict[int, int] = dict()
+            for start, end, _ in intervals:
+                events[start] = events.get(start, 0) + 1
+                events[end + 1] = events.get(end + 1, 0) - 1
+            starts: List[int] = sorted(events.keys())
+            counts: List[int] = list()
+            count: int = 0
+            for start in starts:
+                count += events[start]
+                counts.append(count)
+            sorted_intervals: List[Tuple[int, int, int]] = sorted(
+                (start, end, order) for order, (start, end, _) in enumerate(intervals)
+            )
+            interval_starts: List[int] = [start for start, _, _ in sorted_intervals]
+            self.__segments[protocol] = (starts, counts, interval_starts, sorted_intervals)
+
+    def __len__(self):
+        return sum(len(intervals) for intervals in self.__intervals.values())
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(len(self)), repr(self.protocols))
@@ -1,13 +1,72 @@
 from abc import ABCMeta
 import logging
+import os
 import sys
+from typing import Any, Callable, Dict, List, Set, Tuple
 
 
-class DockerfileASTNode(metaclass=ABCMeta):
+class _ImmutableNodeMeta(ABCMeta):
+    """
+    A metaclass of Dockerfile AST nodes, which freezes each node after its construction.
+    """
+    def __call__(cls, *args, **kwargs):
+        node = super(_ImmutableNodeMeta, cls).__call__(*args, **kwargs)
+        object.__setattr__(node, _FROZEN_ATTRIBUTE_NAME, True)
+        return node
+
+
+class DockerfileASTNode(metaclass=_ImmutableNodeMeta):
     """
     A node of all possible syntax for Dockerfile AST.
+
+    Nodes are immutable: attributes cannot be set or deleted after construction.
+    Two nodes are equal if they are of the same class and have equal structural keys (``_key()``),
+    and the hash of a node is computed on first call of ``hash()`` and cached,
+    so that nodes can be used as keys of dicts and members of sets.
+    Comparing or hashing nodes builds their bodies if parsed in lazy mode.
     """
     __REPR_FORMAT: str = "{0}()"
+    __IMMUTABLE_MESSAGE_FORMAT: str = "{0}: {1} cannot be modified."
+
+    def _key(self) -> Tuple:
+        """
+        Return the structural key of this node, which is compared by ``__eq__`` and hashed by ``__hash__``.
+
+        Returns
+        -------
+        key : Tuple
+            Values of the attributes of this node.
+        """
+        return ()
+
+    def __setattr__(self, name: str, value: Any):
+        if _FROZEN_ATTRIBUTE_NAME in self.__dict__:
+            raise AttributeError(self.__IMMUTABLE_MESSAGE_FORMAT.format(self.__class__.__name__, name))
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name: str):
+        raise AttributeError(self.__IMMUTABLE_MESSAGE_FORMAT.format(self.__class__.__name__, name))
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        elif other.__class__ is not self.__class__:
+            return False
+        # ハッシュ値（キャッシュ済み）が異なれば構造を比較しない
+        elif hash(self) != hash(other):
+            return False
+        else:
+            return self._key() == other._key()
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        node_hash: int = self.__dict__.get(_HASH_ATTRIBUTE_NAME)
+        if node_hash is None:
+            node_hash = hash((self.__class__.__name__, self._key()))
+            object.__setattr__(self, _HASH_ATTRIBUTE_NAME, node_hash)
+        return node_hash
 
     def __repr__(self):
         self_class_name = self.__class__.__name__
@@ -18,17 +77,139 @@ class DockerfileASTNode(metaclass=ABCMeta):
         return self.__REPR_FORMAT.format(self_class_name)
 
 
+class LazyValue:
+    """
+    A value of Dockerfile AST built on first access (e.g. bodies of Dockerfile Instructions in lazy mode).
+
+    Attributes
+    ----------
+    __builder : Callable[[], Any]
+        Function building the value (None after built).
+    __value : Any
+        Built value.
+    """
+    __REPR_FORMAT: str = "{0}(is_built={1})"
+
+    def __init__(self, builder: Callable[[], Any]):
+        """
+        Parameters
+        ----------
+        builder : Callable[[], Any]
+            Function building the value.
+        """
+        self.__builder: Callable[[], Any] = builder
+        self.__value: Any = None
+
+    @property
+    def is_built(self) -> bool:
+        """
+        Returns
+        -------
+        is_built : bool
+            True if the value has been built.
+        """
+        return self.__builder is None
+
+    def get(self) -> Any:
+        """
+        Build the value on first call and return it.
+
+        Returns
+        -------
+        __value : Any
+            Built value.
+        """
+        if self.__builder is not None:
+            self.__value = self.__builder()
+            # 構築後はCSTやスコープへの参照を解放
+            self.__builder = None
+        return self.__value
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(self.is_built))
+
+
+def materialize(value: Any) -> Any:
+    """
+    Return the built value if `value` is ``LazyValue``, otherwise `value` itself.
+
+    Parameters
+    ----------
+    value : Any
+        ``LazyValue`` or a value.
+
+    Returns
+    -------
+    value : Any
+        Built value.
+    """
+    if isinstance(value, LazyValue):
+        return value.get()
+    return value
+
+
+def as_tuple(values: Any) -> Any:
+    """
+    Return `values` as a tuple in order to keep nodes immutable,
+    unless `values` is None or ``LazyValue`` (whose builder is expected to build a tuple).
+
+    Parameters
+    ----------
+    values : Iterable, LazyValue or None
+        Values.
+
+    Returns
+    -------
+    values : Tuple, LazyValue or None
+        Tuple of the values, or `values` itself.
+    """
+    if values is None or isinstance(values, (tuple, LazyValue)):
+        return values
+    return tuple(values)
+
+
+def materialize_all(root: Any):
+    """
+    Build all lazy values reachable from `root` through nodes, tuples, lists and dicts
+    (e.g. before pickling Dockerfile ASTs parsed in lazy mode, whose builders refer to the CST).
+
+    Parameters
+    ----------
+    root : Any
+        Node, ``LazyValue`` or a collection of them.
+    """
+    stack: List[Any] = [root]
+    visited_ids: Set[int] = set()
+    while len(stack) > 0:
+        value: Any = materialize(stack.pop())
+        if isinstance(value, DockerfileASTNode):
+            # internされたノードは複数の親から参照されるため一度だけ走査
+            if id(value) in visited_ids:
+                continue
+            visited_ids.add(id(value))
+            stack.extend(vars(value).values())
+        elif isinstance(value, (tuple, list)):
+            stack.extend(value)
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+
 
 def init_logger(stream_level: int, log_filename: str, file_level: int) -> logging.Logger:
     """
     Initialize ``logging.Logger`` for Dockerfile AST.
 
+    This function is idempotent: calling it again updates levels of the handlers added before
+    instead of adding new handlers, so that log messages are not duplicated.
+    The level of the logger is the lowest level of its handlers,
+    so that ``logging.Logger.isEnabledFor`` skips messages no handler emits.
+
     Parameters
     ----------
     stream_level : int
         Logging level of StreamHandler.
-    log_filename : str
-        Log file name.
+    log_filename : str or None
+        Log file name (FileHandler is not added if None or empty).
     file_level : int
         Logging level of FileHandler.
 
@@ -38,21 +219,65 @@ def init_logger(stream_level: int, log_filename: str, file_level: int) -> loggin
         logging.Logger for Dockerfile AST.
     """
     logging_logger = logging.getLogger(__name__)
-    # ログで出力するレベルを指定
-    logging_logger.setLevel(logging.DEBUG)
+    handlers: Dict[str, logging.Handler] = {handler.get_name(): handler for handler in logging_logger.handlers}
 
     # StreamHandler
-    stream_handler: logging.StreamHandler = logging.StreamHandler(sys.stderr)
+    stream_handler: logging.Handler = handlers.get(_STREAM_HANDLER_NAME)
+    if stream_handler is None:
+        stream_handler = _add_stream_handler(logging_logger)
     stream_handler.setLevel(stream_level)
-    stream_formatter: logging.Formatter = logging.Formatter("%(levelname)s: %(message)s")
-    stream_handler.setFormatter(stream_formatter)
-    logging_logger.addHandler(stream_handler)
 
     # FileHandler
-    if log_filename is not None or len(log_filename) > 0:
-        file_handler: logging.FileHandler = logging.FileHandler(log_filename)
+    if log_filename is not None and len(log_filename) > 0:
+        file_handler_name: str = _FILE_HANDLER_NAME_PREFIX + os.path.abspath(log_filename)
+        file_handler: logging.Handler = handlers.get(file_handler_name)
+        if file_handler is None:
+            file_handler = logging.FileHandler(log_filename)
+            file_handler.set_name(file_handler_name)
+            file_formatter: logging.Formatter = logging.Formatter(
+                "%(asctime)s - %(filename)s: %(levelname)s: %(message)s"
+            )
+            file_handler.setFormatter(file_formatter)
+            logging_logger.addHandler(file_handler)
         file_handler.setLevel(file_level)
-        file_formatter: logging.Formatter = logging.Formatter("%(asctime)s - %(filename)s: %(levelname)s: %(message)s")
-        file_handler.setFormatter(file_formatter)
-        logging_logger.addHandler(file_handler)
+
+    # ログで出力するレベルを指定（どのハンドラも出力しないレベルのメッセージは生成しない）
+    logging_logger.setLevel(min(handler.level for handler in logging_logger.handlers))
+    return logging_logger
+
+
+def default_logger() -> logging.Logger:
+    """
+    Return ``logging.Logger`` for Dockerfile AST used when no logger is given.
+
+    Unlike ``init_logger``, handlers and levels configured before (by ``init_logger`` or ``logging`` configuration)
+    are kept as they are: StreamHandler of WARNING level is added only if no handler handles the messages yet,
+    and the level of the logger is never changed.
+
+    Returns
+    -------
+    logging_logger : logging.Logger
+        logging.Logger for Dockerfile AST.
+    """
+    logging_logger = logging.getLogger(__name__)
+    if not logging_logger.hasHandlers():
+        _add_stream_handler(logging_logger).setLevel(logging.WARNING)
     return logging_logger
+
+
+def _add_stream_handler(logging_logger: logging.Logger) -> logging.Handler:
+    stream_handler: logging.Handler = logging.StreamHandler(sys.stderr)
+    stream_handler.set_name(_STREAM_HANDLER_NAME)
+    stream_formatter: logging.Formatter = logging.Formatter("%(levelname)s: %(message)s")
+    stream_handler.setFormatter(stream_formatter)
+    logging_logger.addHandler(stream_handler)
+    return stream_handler
+
+
+# 構築済み（変更不可）であることを示す属性名，キャッシュしたハッシュ値の属性名
+_FROZEN_ATTRIBUTE_NAME: str = "_DockerfileASTNode__frozen"
+_HASH_ATTRIBUTE_NAME: str = "_DockerfileASTNode__hash"
+
+# init_logger()とdefault_logger()が追加したハンドラの名前
+_STREAM_HANDLER_NAME: str = __name__ + ".stream"
+_FILE_HANDLER_NAME_PREFIX: str = __name__ + ".file:"
@@ -0,0 +1,195 @@
+from typing import Dict, Iterable, List, Set, Tuple
+
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashValueNode
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashConcat
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashConstant
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashParameterExpansion
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BashVariable
+from dockerfile_ast.dockerfile_items.bash_items.nodes import BuildTimeVariable
+from dockerfile_ast.dockerfile_items.bash_items.nodes import EnvironmentVariable
+from dockerfile_ast.dockerfile_items.bash_items.nodes import PredefinedEnvironmentVariable
+
+
+# Build-time variables Docker predefines without ARG Instructions
+PREDEFINED_BUILD_TIME_VARIABLE_NAMES = frozenset([
+    "HTTP_PROXY", "http_proxy", "HTTPS_PROXY", "https_proxy", "FTP_PROXY", "ftp_proxy",
+    "NO_PROXY", "no_proxy", "ALL_PROXY", "all_proxy",
+    "TARGETPLATFORM", "TARGETOS", "TARGETARCH", "TARGETVARIANT",
+    "BUILDPLATFORM", "BUILDOS", "BUILDARCH", "BUILDVARIANT",
+])
+
+
+class VariableResolver:
+    """
+    A resolver which evaluates Bash value nodes on Dockerfile AST to concrete strings.
+
+    Values of build-time variables are overridden by `--build-arg` values.
+    Variables not declared in Dockerfile (plain ``BashVariable``) are unset
+    except environment variables inherited from the base image and predefined build-time variables.
+    Environment variables inherited from the base image also override environment variables
+    which the build stage did not declare, i.e. defaults of Docker images (``PredefinedEnvironmentVariable``
+    such as `PATH`) and environment variables declared in earlier build stages.
+    Results are memoized per node, so chains of variables referring earlier variables are evaluated once.
+
+    Attributes
+    ----------
+    __build_args : Dict[str, str]
+        Values of `--build-arg` options (variable name is the key).
+    __environment : Dict[str, str]
+        Values of environment variables inherited from the base image (variable name is the key).
+    __declared_variables : Dict[int, EnvironmentVariable]
+        Environment variables declared in the build stage (id of node is the key,
+        None if all environment variables except ``PredefinedEnvironmentVariable`` are regarded as declared).
+    __cache : Dict[int, Tuple[BashValueNode, str]]
+        Memoized results (id of node is the key, and the node is kept alive with its result).
+    __resolving : List[BashValueNode]
+        Nodes being resolved, in order to detect cyclic references.
+    __resolving_ids : Set[int]
+        Ids of nodes being resolved.
+    """
+    __REPR_FORMAT: str = "{0}(build_args={1}, environment={2})"
+
+    def __init__(
+            self,
+            build_args: Dict[str, str] = None,
+            environment: Dict[str, str] = None,
+            declared_variables: Iterable[EnvironmentVariable] = None
+    ):
+        """
+        Parameters
+        ----------
+        build_args : Dict[str, str] or None
+            Values of `--build-arg` options (variable name is the key).
+        environment : Dict[str, str] or None
+            Values of environment variables inherited from the base image (variable name is the key).
+        declared_variables : Iterable[EnvironmentVariable] or None
+            Environment variables declared by ENV Instructions of the build stage
+            (all environment variables except ``PredefinedEnvironmentVariable`` are regarded as declared if None).
+        """
+        self.__build_args: Dict[str, str] = dict() if build_args is None else dict(build_args)
+        self.__environment: Dict[str, str] = dict() if environment is None else dict(environment)
+        self.__declared_variables: Dict[int, EnvironmentVariable] = None
+        if declared_variables is not None:
+            self.__declared_variables = {id(variable): variable for variable in declared_variables}
+        self.__cache: Dict[int, Tuple[BashValueNode, str]] = dict()
+        self.__resolving: List[BashValueNode] = list()
+        self.__resolving_ids: Set[int] = set()
+
+    @property
+    def build_args(self) -> Dict[str, str]:
+        """
+        Returns
+        -------
+        __build_args : Dict[str, str]
+            Values of `--build-arg` options (variable name is the key).
+        """
+        return self.__build_args
+
+    @property
+    def environment(self) -> Dict[str, str]:
+        """
+        Returns
+        -------
+        __environment : Dict[str, str]
+            Values of environment variables inherited from the base image (variable name is the key).
+        """
+        return self.__environment
+
+    def resolve(self, node: BashValueNode) -> str:
+        """
+        Evaluate Bash value node to a concrete string.
+
+        Parameters
+        ----------
+        node : BashValueNode or None
+            Bash value node (a node having a Bash value node as ``value`` such as ``Filepath`` is also accepted).
+
+        Returns
+        -------
+        value : str or None
+            Concrete string (None if `node` is None).
+
+        Raises
+        ------
+        ValueError
+            If variables refer to each other cyclically.
+        """
+        if node is None:
+            return None
+        elif isinstance(node, BashConstant):
+            return node.value
+        elif not isinstance(node, BashValueNode):
+            return self.resolve(node.value)
+
+        cached = self.__cache.get(id(node))
+        if cached is not None:
+            return cached[1]
+        if id(node) in self.__resolving_ids:
+            names = [str(n.name) for n in self.__resolving if isinstance(n, BashVariable)]
+            raise ValueError("VariableResolver: cyclic reference of variables: {0}".format(" -> ".join(names)))
+        self.__resolving.append(node)
+        self.__resolving_ids.add(id(node))
+        try:
+            value: str = self.__resolve_uncached(node)
+        finally:
+            self.__resolving.pop()
+            self.__resolving_ids.discard(id(node))
+        self.__cache[id(node)] = (node, value)
+        return value
+
+    def is_set(self, variable: BashVariable) -> bool:
+        """
+        Return whether a variable is set.
+
+        Parameters
+        ----------
+        variable : BashVariable
+            Bash variable.
+
+        Returns
+        -------
+        is_set : bool
+            True if the variable is set (even if its value is empty).
+        """
+        if isinstance(variable, EnvironmentVariable):
+            return True
+        elif isinstance(variable, BuildTimeVariable):
+            return variable.name in self.__build_args or variable.value is not None
+        elif variable.name in self.__environment:
+            return True
+        else:
+            return variable.name in PREDEFINED_BUILD_TIME_VARIABLE_NAMES and variable.name in self.__build_args
+
+    def __resolve_uncached(self, node: BashValueNode) -> str:
+        if isinstance(node, BuildTimeVariable):
+            if node.name in self.__build_args:
+                return self.__build_args[node.name]
+            return "" if node.value is None else self.resolve(node.value)
+        elif isinstance(node, EnvironmentVariable):
+            # ビルドステージで宣言されていない環境変数はベースイメージの値を優先
+            if node.name in self.__environment and not self.__is_declared(node):
+                return self.__environment[node.name]
+            return self.resolve(node.value)
+        elif isinstance(node, BashVariable):
+            if node.name in self.__environment:
+                return self.__environment[node.name]
+            return self.__build_args.get(node.name, "") if self.is_set(node) else ""
+        elif isinstance(node, BashConcat):
+            return "".join([self.resolve(value) for value in node.values])
+        elif isinstance(node, BashParameterExpansion):
+            is_empty: bool = not self.is_set(node.variable) or len(self.resolve(node.variable)) < 1
+            if node.operator == BashParameterExpansion.DEFAULT_OPERATOR:
+                return self.resolve(node.word) if is_empty else self.resolve(node.variable)
+            else:
+                return "" if is_empty else self.resolve(node.word)
+        else:
+            raise ValueError("VariableResolver: {0} cannot be resolved.".format(node.__class__.__name__))
+
+    def __is_declared(self, variable: EnvironmentVariable) -> bool:
+        if isinstance(variable, PredefinedEnvironmentVariable):
+            return False
+        return self.__declared_variables is None or id(variable) in self.__declared_variables
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(self.__build_args), repr(self.__environment))
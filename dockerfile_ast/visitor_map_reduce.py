@@ -0,0 +1,234 @@
+import copy
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, List, Sequence, Tuple
+
+import bashlex.errors
+
+from dockerfile_ast.dockerfile_ast import DockerfileAST, DockerfileASTVisitor
+from dockerfile_ast.dockerfile_parser import DockerfileParser
+from dockerfile_ast.dockerfile_watcher import ParseCache, ParseCacheEntry
+
+
+class VisitorMapReduce:
+    """
+    A driver running Dockerfile AST visitors over a corpus in a process pool and reducing their results.
+
+    Each worker process parses Dockerfiles (or loads them from a ``ParseCache`` file), runs a visitor on each AST,
+    and sends back only ``DockerfileASTVisitor.result()`` of the visitors, never the ASTs.
+    Dockerfiles are dispatched in chunks in order to amortize the overhead of inter-process communication.
+
+    Worker processes are spawned (not forked) because the Go runtime of ``dockerfile`` does not survive fork,
+    so `visitor_factory`, `reducer`, `combiner` and `parser_factory` must be picklable
+    (e.g. functions or classes defined at the module level of an importable module).
+
+    `initial` must be an identity value of the reduction (e.g. 0 for addition or an empty ``Counter``),
+    since it is folded in once per chunk (if a combiner is given) and once in the parent.
+    Each chunk and the parent start from their own deep copies of `initial`,
+    so that reducers and combiners may update accumulated values in place.
+
+    Attributes
+    ----------
+    __visitor_factory : Callable[[DockerfileAST], DockerfileASTVisitor]
+        Function creating a visitor of a Dockerfile AST (e.g. a subclass of ``DockerfileASTVisitor``).
+    __reducer : Callable[[Any, Any], Any]
+        Function reducing the accumulated value and the result of a visitor into a new accumulated value.
+    __initial : Any
+        Initial accumulated value.
+    __combiner : Callable[[Any, Any], Any]
+        Function combining accumulated values of chunks (None if results of visitors are reduced by the parent).
+    __parser_factory : Callable[[], DockerfileParser]
+        Function creating a parser of Dockerfiles in each worker process.
+    __max_workers : int
+        Maximum number of worker processes (visitors run in this process if 1).
+    __chunk_size : int
+        Number of Dockerfiles dispatched to a worker process at once.
+    __failures : List[Tuple[str, str]]
+        Dockerfile names and error messages of Dockerfiles which could not be parsed or loaded in the last run.
+    """
+    __REPR_FORMAT: str = "{0}(max_workers={1}, chunk_size={2})"
+
+    def __init__(
+            self,
+            visitor_factory: Callable[[DockerfileAST], DockerfileASTVisitor],
+            reducer: Callable[[Any, Any], Any],
+            initial: Any = None,
+            combiner: Callable[[Any, Any], Any] = None,
+            parser_factory: Callable[[], DockerfileParser] = DockerfileParser,
+            max_workers: int = None,
+            chunk_size: int = 32
+    ):
+        """
+        Parameters
+        ----------
+        visitor_factory : Callable[[DockerfileAST], DockerfileASTVisitor]
+            Function creating a visitor of a Dockerfile AST (e.g. a subclass of ``DockerfileASTVisitor``).
+        reducer : Callable[[Any, Any], Any]
+            Function reducing the accumulated value and the result of a visitor into a new accumulated value.
+        initial : Any
+            Initial accumulated value, which must be an identity value of the reduction.
+        combiner : Callable[[Any, Any], Any] or None
+            Function combining accumulated values of chunks.
+            If given, each worker process reduces its chunk from `initial` and sends back only the accumulated value.
+        parser_factory : Callable[[], DockerfileParser]
+            Function creating a parser of Dockerfiles in each worker process.
+        max_workers : int or None
+            Maximum number of worker processes (the number of processors if None, visitors run in this process if 1).
+        chunk_size : int
+            Number of Dockerfiles dispatched to a worker process at once.
+        """
+        if chunk_size < 1:
+            raise ValueError("Illegal chunk_size value (1 or more): {0}".format(str(chunk_size)))
+        self.__visitor_factory: Callable[[DockerfileAST], DockerfileASTVisitor] = visitor_factory
+        self.__reducer: Callable[[Any, Any], Any] = reducer
+        self.__initial: Any = initial
+        self.__combiner: Callable[[Any, Any], Any] = combiner
+        self.__parser_factory: Callable[[], DockerfileParser] = parser_factory
+        self.__max_workers: int = max_workers
+        self.__chunk_size: int = chunk_size
+        self.__failures: List[Tuple[str, str]] = list()
+
+    @property
+    def failures(self) -> List[Tuple[str, str]]:
+        """
+        Returns
+        -------
+        __failures : List[Tuple[str, str]]
+            Dockerfile names and error messages of Dockerfiles which could not be parsed or loaded in the last run.
+        """
+        return self.__failures
+
+    def run_files(self, filenames: Sequence[str]) -> Any:
+        """
+        Parse Dockerfiles, run visitors on them and reduce their results.
+
+        Parameters
+        ----------
+        filenames : Sequence[str]
+            Dockerfile names.
+
+        Returns
+        -------
+        accumulated_value : Any
+            Reduced results of visitors (in the order of `filenames`).
+        """
+        return self.__run(filenames, None)
+
+    def run_cache(self, cache_filename: str, filenames: Sequence[str] = None) -> Any:
+        """
+        Run visitors on Dockerfile ASTs stored in a ``ParseCache`` file and reduce their results.
+
+        Parameters
+        ----------
+        cache_filename : str
+            Cache file name saved by ``ParseCache``.
+        filenames : Sequence[str] or None
+            Dockerfile names in the cache (all cached Dockerfiles if None).
+
+        Returns
+        -------
+        accumulated_value : Any
+            Reduced results of visitors (in the order of `filenames`).
+        """
+        if filenames is None:
+            cache: ParseCache = ParseCache(cache_filename)
+            if not cache.load():
+                raise ValueError("{0}: cannot load Dockerfile ASTs.".format(cache_filename))
+            filenames = sorted(cache.filenames())
+        return self.__run(filenames, cache_filename)
+
+    def __run(self, filenames: Sequence[str], cache_filename: str) -> Any:
+        self.__failures = list()
+        chunks: List[Sequence[str]] = [
+            filenames[index:index + self.__chunk_size] for index in range(0, len(filenames), self.__chunk_size)
+        ]
+        task = (self.__visitor_factory, self.__reducer, self.__initial, self.__combiner)
+        accumulated_value: Any = copy.deepcopy(self.__initial)
+        if self.__max_workers == 1:
+            _init_worker(self.__parser_factory, cache_filename)
+            for chunk in chunks:
+                accumulated_value = self.__merge(accumulated_value, _map_chunk(task, chunk))
+            return accumulated_value
+
+        # Goのランタイムはforkされた子プロセスで動かないため，spawnでワーカープロセスを起動
+        with ProcessPoolExecutor(
+                max_workers=self.__max_workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker, initargs=(self.__parser_factory, cache_filename)
+        ) as executor:
+            futures: List[Future] = [executor.submit(_map_chunk, task, chunk) for chunk in chunks]
+            # 結果の順序を保つため，投入した順に集約
+            for future in futures:
+                accumulated_value = self.__merge(accumulated_value, future.result())
+        return accumulated_value
+
+    def __merge(self, accumulated_value: Any, chunk_result: Tuple[Any, List[Tuple[str, str]]]) -> Any:
+        value, failures = chunk_result
+        self.__failures.extend(failures)
+        if self.__combiner is not None:
+            return self.__combiner(accumulated_value, value)
+        for result in value:
+            accumulated_value = self.__reducer(accumulated_value, result)
+        return accumulated_value
+
+    def __repr__(self):
+        self_class_name = self.__class__.__name__
+        return self.__REPR_FORMAT.format(self_class_name, repr(self.__max_workers), repr(self.__chunk_size))
+
+
+# ワーカープロセスごとのparserとキャッシュ
+_worker_parser: DockerfileParser = None
+_worker_cache: ParseCache = None
+
+
+def _init_worker(parser_factory: Callable[[], DockerfileParser], cache_filename: str):
+    global _worker_parser, _worker_cache
+    _worker_parser = parser_factory()
+    _worker_cache = None
+    if cache_filename is not None:
+        _worker_cache = ParseCache(cache_filename)
+        _worker_cache.load()
+
+
+def _map_chunk(task: Tuple, filenames: Sequence[str]) -> Tuple[Any, List[Tuple[str, str]]]:
+    """
+    Run visitors on Dockerfiles of a chunk in a worker process.
+
+    Returns
+    -------
+    value, failures : Tuple[Any, List[Tuple[str, str]]]
+        Results of visitors (or their accumulated value if a combiner is given),
+        and Dockerfile names and error messages of Dockerfiles which could not be parsed or loaded.
+    """
+    visitor_factory, reducer, initial, combiner = task
+    results: List[Any] = list()
+    # 呼び出し元やほかのチャンクと共有しないよう複製（同一プロセスで実行する場合に必要）
+    accumulated_value: Any = copy.deepcopy(initial)
+    failures: List[Tuple[str, str]] = list()
+    for filename in filenames:
+        try:
+            dockerfile_ast: DockerfileAST = _load_dockerfile_ast(filename)
+        except (OSError, ValueError, bashlex.errors.ParsingError) as e:
+            # GoParseErrorはValueErrorのサブクラス
+            failures.append((filename, str(e)))
+            continue
+        visitor: DockerfileASTVisitor = visitor_factory(dockerfile_ast)
+        try:
+            visitor.visit()
+        except bashlex.errors.ParsingError as e:
+            # 遅延構築される命令の本体はvisitorが参照したときにparseされる
+            failures.append((filename, str(e)))
+            continue
+        if combiner is None:
+            results.append(visitor.result())
+        else:
+            accumulated_value = reducer(accumulated_value, visitor.result())
+    return (results if combiner is None else accumulated_value), failures
+
+
+def _load_dockerfile_ast(filename: str) -> DockerfileAST:
+    if _worker_cache is None:
+        return _worker_parser.parse_file(filename)
+    entry: ParseCacheEntry = _worker_cache.get(filename)
+    if entry is None:
+        raise ValueError("{0}: not in the cache of Dockerfile ASTs.".format(filename))
+    return entry.dockerfile_ast
@@ -0,0 +1,62 @@
+import unittest
+
+from dockerfile_ast import DockerfileParser
+from dockerfile_ast.columnar_ast import ColumnarDockerfileAST, StringTable
+from dockerfile_ast.dockerfile_items.utils import InstructionEnum
+
+
+def _rows(columnar_ast: ColumnarDockerfileAST):
+    return [
+        (
+            columnar_ast.instruction_type(row), columnar_ast.line_nums[row], columnar_ast.raw_code(row),
+            columnar_ast.row_values(row), columnar_ast.row_flags(row)
+        )
+        for row in range(len(columnar_ast))
+    ]
+
+
+class ColumnarDockerfileASTTest(unittest.TestCase):
+    RAW_CODES = (
+        "FROM a AS b\n# comment\nENV A=1 \\\n  B=2\n\nCOPY --from=b /x /y\nRUN echo $A\n",
+        "FROM a\nCOPY <<EOF /x\nENV A\nEOF\nRUN <<-'END' cat\n\tFROM b\n\tEND\nLABEL a=b\n",
+        "ARG V=1\nFROM a:${V}\nONBUILD RUN x\nEXPOSE 80/tcp\nCMD [\"y\"]\n",
+    )
+
+    def test_from_ast_matches_parse_columnar(self):
+        parser = DockerfileParser()
+        for raw_code in self.RAW_CODES:
+            with self.subTest(raw_code=raw_code):
+                expected = parser.parse_columnar(raw_code)
+                actual = ColumnarDockerfileAST.from_ast(parser.parse(raw_code), StringTable())
+                self.assertEqual(_rows(expected), _rows(actual))
+
+    def test_from_ast_skips_heredoc_bodies(self):
+        parser = DockerfileParser()
+        dockerfile_ast = parser.parse("FROM a\nCOPY <<EOF /x\nENV A\nEOF\n")
+        columnar_ast = ColumnarDockerfileAST.from_ast(dockerfile_ast, StringTable())
+        self.assertEqual([InstructionEnum.FROM, InstructionEnum.COPY], [row[0] for row in _rows(columnar_ast)])
+        self.assertEqual(0, columnar_ast.count(InstructionEnum.ENV))
+
+    def test_to_ast_keeps_instructions_and_line_numbers(self):
+        parser = DockerfileParser()
+        for raw_code in self.RAW_CODES:
+            with self.subTest(raw_code=raw_code):
+                expected = parser.parse(raw_code)
+                actual = parser.parse_columnar(raw_code).to_ast(parser)
+                self.assertEqual(
+                    [(instruction.__class__, instruction.line_num) for instruction in expected.instructions],
+                    [(instruction.__class__, instruction.line_num) for instruction in actual.instructions]
+                )
+
+    def test_string_table_is_shared(self):
+        parser = DockerfileParser()
+        string_table = StringTable()
+        first = parser.parse_columnar(self.RAW_CODES[0], string_table)
+        size = len(string_table)
+        second = parser.parse_columnar(self.RAW_CODES[0], string_table)
+        self.assertEqual(size, len(string_table))
+        self.assertEqual(list(first.raw_codes), list(second.raw_codes))
+
+
+if __name__ == "__main__":
+    unittest.main()
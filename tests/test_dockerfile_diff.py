@@ -0,0 +1,38 @@
+import unittest
+
+from dockerfile_ast import DockerfileParser, EditType, diff
+
+
+def value_edits(old_raw_code, new_raw_code):
+    parser = DockerfileParser()
+    edits = diff(parser.parse(old_raw_code), parser.parse(new_raw_code))
+    return [
+        (value_edit.edit_type, value_edit.kind, value_edit.name)
+        for edit in edits if edit.edit_type == EditType.MODIFIED
+        for value_edit in edit.value_edits
+    ]
+
+
+class DockerfileDiffTest(unittest.TestCase):
+
+    def test_multi_source_copy_removes_source(self):
+        self.assertEqual(
+            [(EditType.REMOVED, "source", "b")],
+            value_edits("FROM x\nCOPY a b /dst/\n", "FROM x\nCOPY a /dst/\n")
+        )
+
+    def test_multi_source_add_adds_source(self):
+        self.assertEqual(
+            [(EditType.ADDED, "source", "c")],
+            value_edits("FROM x\nADD a b /dst/\n", "FROM x\nADD a b c /dst/\n")
+        )
+
+    def test_copy_changes_destination(self):
+        self.assertEqual(
+            [(EditType.REMOVED, "destination", "/dst/"), (EditType.ADDED, "destination", "/app/")],
+            value_edits("FROM x\nCOPY a b /dst/\n", "FROM x\nCOPY a b /app/\n")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
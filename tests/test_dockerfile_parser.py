@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from dockerfile import GoParseError
+
+from dockerfile_ast import DockerfileParser, Instruction
+from dockerfile_ast.dockerfile_items.instructions import COPYInstruction, ENVInstruction, FROMInstruction
+from dockerfile_ast.dockerfile_items.instructions import LABELInstruction, RUNInstruction
+from dockerfile_ast.dockerfile_items.utils import InstructionEnum
+from dockerfile_ast.utils import materialize_all
+
+
+class ErrorTolerantParseTest(unittest.TestCase):
+
+    def test_cst_error_is_recorded_per_instruction(self):
+        dockerfile_ast = DockerfileParser(error_tolerant=True).parse("FROM x\nENV A\nRUN y\n")
+        self.assertEqual(
+            [FROMInstruction, Instruction, RUNInstruction],
+            [instruction.__class__ for instruction in dockerfile_ast.instructions]
+        )
+        self.assertEqual([1, 2, 3], [instruction.line_num for instruction in dockerfile_ast.instructions])
+        self.assertEqual([2], [diagnostic.line_num for diagnostic in dockerfile_ast.diagnostics])
+        self.assertIn("ENV must have two arguments", dockerfile_ast.diagnostics[0].message)
+        self.assertIs(dockerfile_ast.instructions[1], dockerfile_ast.diagnostics[0].instruction)
+
+    def test_cst_error_keeps_continuations_and_escape_directive(self):
+        raw_code = "# escape=`\nFROM x\nRUN a `\n  b\n\nENV A\n# comment\nLABEL a=b\n"
+        dockerfile_ast = DockerfileParser(error_tolerant=True).parse(raw_code)
+        self.assertEqual(
+            [(FROMInstruction, 2), (RUNInstruction, 3), (Instruction, 6), (LABELInstruction, 8)],
+            [(instruction.__class__, instruction.line_num) for instruction in dockerfile_ast.instructions]
+        )
+        self.assertEqual([6], [diagnostic.line_num for diagnostic in dockerfile_ast.diagnostics])
+
+    def test_cst_error_in_file(self):
+        directory = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(directory, "Dockerfile")
+            with open(filename, "w") as fp:
+                fp.write("FROM x\nRUN a \\\n  b\nENV A\n")
+            dockerfile_ast = DockerfileParser(error_tolerant=True).parse_file(filename)
+        finally:
+            shutil.rmtree(directory)
+        self.assertEqual([1, 2, 4], [instruction.line_num for instruction in dockerfile_ast.instructions])
+        self.assertEqual([4], [diagnostic.line_num for diagnostic in dockerfile_ast.diagnostics])
+
+    def test_bashlex_error_is_recorded_in_lazy_mode(self):
+        raw_code = "FROM x\nLABEL a=\"b\nENV A=\"$(foo\"\nRUN y\n"
+        for exclude_types in [None, [InstructionEnum.ENV]]:
+            dockerfile_ast = DockerfileParser(lazy=True, error_tolerant=True, exclude_types=exclude_types).parse(
+                raw_code
+            )
+            materialize_all((dockerfile_ast.instructions, dockerfile_ast.diagnostics))
+            self.assertEqual([2, 3], [diagnostic.line_num for diagnostic in dockerfile_ast.diagnostics])
+            self.assertEqual(
+                [FROMInstruction, Instruction, Instruction, RUNInstruction],
+                [instruction.__class__ for instruction in dockerfile_ast.instructions]
+            )
+
+    def test_cst_error_is_raised_unless_error_tolerant(self):
+        with self.assertRaises(GoParseError):
+            DockerfileParser().parse("FROM x\nENV A\nRUN y\n")
+
+
+
+class HeredocTest(unittest.TestCase):
+
+    def parse(self, raw_code):
+        dockerfile_ast = DockerfileParser().parse(raw_code)
+        return [
+            (
+                instruction.__class__, instruction.line_num,
+                [
+                    (heredoc.name, heredoc.line_num, heredoc.body, heredoc.strip_tabs, heredoc.quoted)
+                    for heredoc in getattr(instruction, "heredocs", ())
+                ]
+            )
+            for instruction in dockerfile_ast.instructions
+        ]
+
+    def test_heredoc_starts_only_words_outside_quotes(self):
+        for raw_code in [
+            "FROM x\nRUN echo \"a <<EOF b\"\nENV A=1\nRUN y\n",
+            "FROM x\nRUN echo 'a <<EOF b'\nENV A=1\nRUN y\n",
+            "FROM x\nRUN echo $((1<<X))\nENV A=1\nRUN y\n",
+            "FROM x\nRUN cat<<EOF\nENV A=1\nRUN y\n",
+        ]:
+            self.assertEqual(
+                [(FROMInstruction, 1, []), (RUNInstruction, 2, []), (ENVInstruction, 3, []), (RUNInstruction, 4, [])],
+                self.parse(raw_code), raw_code
+            )
+
+    def test_heredoc_stripping_tabs(self):
+        self.assertEqual(
+            [
+                (FROMInstruction, 1, []), (RUNInstruction, 2, [("EOF", 3, "echo a\n", True, False)]),
+                (ENVInstruction, 5, [])
+            ],
+            self.parse("FROM x\nRUN <<-EOF\n\techo a\n\tEOF\nENV A=1\n")
+        )
+
+    def test_multiple_heredocs(self):
+        self.assertEqual(
+            [
+                (FROMInstruction, 1, []),
+                (COPYInstruction, 2, [("A", 3, "a\n", False, False), ("B", 5, "b\n", False, True)]),
+                (ENVInstruction, 7, [])
+            ],
+            self.parse("FROM x\nCOPY <<A <<\"B\" /dst/\na\nA\nb\nB\nENV X=1\n")
+        )
+
+    def test_heredoc_after_continuation(self):
+        self.assertEqual(
+            [
+                (FROMInstruction, 1, []), (RUNInstruction, 2, [("EOF", 4, "hi\n", False, False)]),
+                (ENVInstruction, 6, [])
+            ],
+            self.parse("FROM x\nRUN echo 'a \\\n  b' <<EOF\nhi\nEOF\nENV A=1\n")
+        )
+
+    def test_unterminated_heredoc_lasts_to_end(self):
+        self.assertEqual(
+            [(FROMInstruction, 1, []), (RUNInstruction, 2, [("EOF", 3, "echo a\nENV A=1\n", False, False)])],
+            self.parse("FROM x\nRUN <<EOF\necho a\nENV A=1\n")
+        )
+
+
+class ShellTest(unittest.TestCase):
+
+    @staticmethod
+    def argv(raw_code):
+        dockerfile_ast = DockerfileParser().parse(raw_code)
+        return [
+            [str(arg) for arg in instruction.argv]
+            for instruction in dockerfile_ast.instructions if isinstance(instruction, RUNInstruction)
+        ]
+
+    def test_shell_changes_following_shell_forms(self):
+        self.assertEqual(
+            [["/bin/sh", "-c", "a"], ["/bin/bash", "-c", "b"], ["c"]],
+            self.argv("FROM x\nRUN a\nSHELL [\"/bin/bash\", \"-c\"]\nRUN b\nRUN [\"c\"]\n")
+        )
+
+    def test_onbuild_shell_does_not_change_shell(self):
+        self.assertEqual(
+            [["/bin/bash", "-c", "a"]],
+            self.argv("FROM x\nSHELL [\"/bin/bash\", \"-c\"]\nONBUILD SHELL [\"pwsh\", \"-c\"]\nRUN a\n")
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
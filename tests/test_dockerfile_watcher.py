@@ -0,0 +1,175 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from dockerfile_ast import DockerfileIndex, DockerfileParser, DockerfileWatcher, ParseCache, WatchEventType
+from dockerfile_ast.dockerfile_items.utils import InstructionEnum
+
+
+DOCKERFILE = "FROM ubuntu:22.04\nENV APP=/app\nRUN echo $APP && make\nCOPY a b /dst/\nEXPOSE 80 443/udp\n"
+
+
+class ParseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.dockerfile = os.path.join(self.directory, "Dockerfile")
+        with open(self.dockerfile, "w") as fp:
+            fp.write(DOCKERFILE)
+        self.cache_filename = os.path.join(self.directory, "cache", "index.pickle")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_warm_restart_reuses_cached_asts(self):
+        index = DockerfileIndex(self.directory, DockerfileParser(), ParseCache(self.cache_filename))
+        index.scan()
+        cache = ParseCache(self.cache_filename)
+        self.assertTrue(cache.load())
+        restarted_index = DockerfileIndex(self.directory, DockerfileParser(), cache)
+        events = restarted_index.scan()
+        self.assertEqual([WatchEventType.ADDED], [event.event_type for event in events])
+        self.assertIs(cache.get(self.dockerfile).dockerfile_ast, restarted_index.get(self.dockerfile))
+
+    def test_other_parser_options_drop_cached_asts(self):
+        index = DockerfileIndex(self.directory, DockerfileParser(parse_level=2), ParseCache(self.cache_filename))
+        index.scan()
+
+        # 読み込んだ後に別のオプションのパーサに束縛
+        cache = ParseCache(self.cache_filename)
+        self.assertTrue(cache.load())
+        restarted_index = DockerfileIndex(self.directory, DockerfileParser(), cache)
+        restarted_index.scan()
+        expected = DockerfileParser().parse(DOCKERFILE).instructions
+        self.assertEqual(expected, restarted_index.get(self.dockerfile).instructions)
+
+        # 束縛した後に別のオプションのキャッシュファイルを読み込み
+        cache.save()
+        level2_cache = ParseCache(self.cache_filename)
+        level2_cache.bind(DockerfileParser(parse_level=2).fingerprint)
+        self.assertFalse(level2_cache.load())
+        self.assertEqual(0, len(level2_cache))
+
+    def test_fingerprint_of_parser_options(self):
+        fingerprint = DockerfileParser().fingerprint
+        self.assertEqual(fingerprint, DockerfileParser(lazy=True).fingerprint)
+        self.assertNotEqual(fingerprint, DockerfileParser(parse_level=2).fingerprint)
+        self.assertNotEqual(fingerprint, DockerfileParser(error_tolerant=True).fingerprint)
+        self.assertNotEqual(fingerprint, DockerfileParser(exclude_types=[InstructionEnum.RUN]).fingerprint)
+
+    def test_lazy_asts_are_built_before_saved(self):
+        index = DockerfileIndex(self.directory, DockerfileParser(lazy=True), ParseCache(self.cache_filename))
+        index.scan()
+        cache = ParseCache(self.cache_filename)
+        self.assertTrue(cache.load())
+        expected = DockerfileParser().parse(DOCKERFILE).instructions
+        self.assertEqual(expected, cache.get(self.dockerfile).dockerfile_ast.instructions)
+
+    def test_save_if_due_debounces_saves(self):
+        cache = ParseCache(self.cache_filename, save_interval=3600.0)
+        index = DockerfileIndex(self.directory, DockerfileParser(), cache)
+        index.scan()
+        self.assertTrue(os.path.isfile(self.cache_filename))
+
+        other_dockerfile = os.path.join(self.directory, "Dockerfile.dev")
+        with open(other_dockerfile, "w") as fp:
+            fp.write("FROM alpine\n")
+        index.scan()
+        self.assertFalse(cache.save_if_due())
+        saved_cache = ParseCache(self.cache_filename)
+        saved_cache.load()
+        self.assertIsNone(saved_cache.get(other_dockerfile))
+
+        cache.save()
+        saved_cache.load()
+        self.assertIsNotNone(saved_cache.get(other_dockerfile))
+
+
+class DockerfileWatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.dockerfile = os.path.join(self.directory, "Dockerfile")
+        with open(self.dockerfile, "w") as fp:
+            fp.write(DOCKERFILE)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_polling_emits_changes(self):
+        with DockerfileWatcher(DockerfileIndex(self.directory), interval=0.0, use_inotify=False) as watcher:
+            events = watcher.index.scan()
+            self.assertEqual([(WatchEventType.ADDED, self.dockerfile)], [(e.event_type, e.filename) for e in events])
+            self.assertEqual([], watcher.poll())
+
+            with open(self.dockerfile, "w") as fp:
+                fp.write("FROM alpine\n")
+            events = watcher.poll()
+            self.assertEqual([WatchEventType.MODIFIED], [event.event_type for event in events])
+            self.assertEqual(1, len(events[0].dockerfile_ast.instructions))
+
+            os.remove(self.dockerfile)
+            self.assertEqual([WatchEventType.REMOVED], [event.event_type for event in watcher.poll()])
+            self.assertIsNone(watcher.index.get(self.dockerfile))
+
+            with open(self.dockerfile, "w") as fp:
+                fp.write("FROM\n")
+            self.assertEqual([WatchEventType.FAILED], [event.event_type for event in watcher.poll()])
+
+    def test_unbuildable_dockerfiles_fail(self):
+        broken_dockerfile = os.path.join(self.directory, "Dockerfile.bad")
+        with open(broken_dockerfile, "w") as fp:
+            fp.write("FROM x\nLABEL a=\"b\n")
+        cache_filename = os.path.join(self.directory, "index.pickle")
+        for parser in [DockerfileParser(), DockerfileParser(lazy=True)]:
+            cache = ParseCache(cache_filename, save_interval=0.0)
+            events = DockerfileIndex(self.directory, parser, cache).scan()
+            self.assertEqual(
+                [(self.dockerfile, WatchEventType.ADDED), (broken_dockerfile, WatchEventType.FAILED)],
+                sorted((event.filename, event.event_type) for event in events)
+            )
+            self.assertIsNone(cache.get(broken_dockerfile))
+            cache.save()
+
+    def test_unchanged_failed_dockerfiles_are_skipped(self):
+        broken_dockerfile = os.path.join(self.directory, "Dockerfile.bad")
+        with open(broken_dockerfile, "w") as fp:
+            fp.write("FROM\n")
+        with DockerfileWatcher(DockerfileIndex(self.directory), interval=0.0, use_inotify=False) as watcher:
+            self.assertEqual(
+                [(self.dockerfile, WatchEventType.ADDED), (broken_dockerfile, WatchEventType.FAILED)],
+                sorted((event.filename, event.event_type) for event in watcher.index.scan())
+            )
+            self.assertEqual([], watcher.poll())
+            # 更新日時のみの変更
+            os.utime(broken_dockerfile, ns=(0, 0))
+            self.assertEqual([], watcher.poll())
+
+            with open(broken_dockerfile, "w") as fp:
+                fp.write("FROM x\nLABEL a=\"b\n")
+            self.assertEqual([WatchEventType.FAILED], [event.event_type for event in watcher.poll()])
+            self.assertEqual([], watcher.poll())
+
+            with open(broken_dockerfile, "w") as fp:
+                fp.write("FROM x\n")
+            self.assertEqual(
+                [(broken_dockerfile, WatchEventType.ADDED)],
+                [(event.filename, event.event_type) for event in watcher.poll()]
+            )
+
+    def test_close_saves_pending_changes(self):
+        cache_filename = os.path.join(self.directory, "index.pickle")
+        cache = ParseCache(cache_filename, save_interval=3600.0)
+        with DockerfileWatcher(DockerfileIndex(self.directory, cache=cache), use_inotify=False) as watcher:
+            watcher.index.scan()
+            with open(self.dockerfile, "w") as fp:
+                fp.write("FROM alpine\n")
+            watcher.poll(0.0)
+        saved_cache = ParseCache(cache_filename)
+        self.assertTrue(saved_cache.load())
+        self.assertEqual(1, len(saved_cache.get(self.dockerfile).dockerfile_ast.instructions))
+
+
+if __name__ == "__main__":
+    unittest.main()
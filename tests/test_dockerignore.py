@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from dockerfile_ast.dockerignore import DockerignoreParser
+
+
+class DockerignoreTest(unittest.TestCase):
+    # `.dockerignore`のソースコード，パス，無視されるか
+    IS_IGNORED_CASES = (
+        ("*.md\n!README.md", "a.md", True),
+        ("*.md\n!README.md", "README.md", False),
+        ("*.md\n!README.md", "docs/a.md", False),
+        ("**/*.go", "a.go", True),
+        ("**/*.go", "x/y/a.go", True),
+        ("**/*.go", "x/a.gox", False),
+        ("a/**/b", "a/b", True),
+        ("a/**/b", "a/x/y/b", True),
+        ("a/**/b", "a/b/c", True),
+        ("a/**/b", "b", False),
+        ("**\n!src/**", "a", True),
+        ("**\n!src/**", "src/b/c", False),
+        ("docs\n!docs/keep.md", "docs/a.md", True),
+        ("docs\n!docs/keep.md", "docs/keep.md", False),
+        ("docs\n!docs/keep.md", "docsx", False),
+        ("[a-c].txt", "a.txt", True),
+        ("[a-c].txt", "d.txt", False),
+        ("[^a].log", "a.log", False),
+        ("[^a].log", "b.log", True),
+        ("?.py", "a.py", True),
+        ("?.py", "ab.py", False),
+        ("?.py", "x/a.py", False),
+        ("\\*.txt", "*.txt", True),
+        ("\\*.txt", "a.txt", False),
+        ("/build/\n./tmp", "build/x", True),
+        ("/build/\n./tmp", "tmp", True),
+        ("/build/\n./tmp", "src/build", False),
+        ("# comment\n\n*.md", "# comment", False),
+    )
+    # `.dockerignore`のソースコード，無視されるディレクトリ，枝刈りできるか
+    CAN_PRUNE_CASES = (
+        ("node_modules", "node_modules", True),
+        ("docs\n!docs/keep.md", "docs", False),
+        ("docs\n!docs/keep.md", "docs/sub", True),
+        ("a/*\n!a/b*/c", "a/b1", False),
+        ("a/*\n!a/b*/c", "a/x", True),
+        ("**\n!src/**/*.py", "src", False),
+        ("**\n!src/**/*.py", "src/a", False),
+        ("**\n!src/**/*.py", "other", True),
+    )
+
+    def test_is_ignored(self):
+        parser = DockerignoreParser()
+        for raw_code, path, expected in self.IS_IGNORED_CASES:
+            with self.subTest(raw_code=raw_code, path=path):
+                self.assertEqual(expected, parser.parse(raw_code).is_ignored(path))
+
+    def test_can_prune(self):
+        parser = DockerignoreParser()
+        for raw_code, directory, expected in self.CAN_PRUNE_CASES:
+            with self.subTest(raw_code=raw_code, directory=directory):
+                self.assertEqual(expected, parser.parse(raw_code).can_prune(directory))
+
+    def test_illegal_exclusion(self):
+        with self.assertRaises(ValueError):
+            DockerignoreParser().parse("*\n!\n")
+
+
+class DockerignoreWalkTest(unittest.TestCase):
+    FILENAMES = (
+        "Dockerfile", "README.md", "a.md", "src/main.py", "src/main.pyc", "src/lib/util.py",
+        "node_modules/x/index.js", "docs/index.md", "docs/keep.md"
+    )
+    # `.dockerignore`のソースコード，走査されるファイル
+    WALK_CASES = (
+        ("", sorted(FILENAMES)),
+        ("*.md\n!README.md", sorted(set(FILENAMES) - {"a.md"})),
+        ("node_modules\n**/*.pyc\ndocs\n!docs/keep.md", [
+            "Dockerfile", "README.md", "a.md", "docs/keep.md", "src/lib/util.py", "src/main.py"
+        ]),
+        ("**\n!src/**/*.py\n!Dockerfile", ["Dockerfile", "src/lib/util.py", "src/main.py"]),
+    )
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for filename in self.FILENAMES:
+            path = os.path.join(self.directory, *filename.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as fp:
+                fp.write(filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_walk(self):
+        parser = DockerignoreParser()
+        for raw_code, expected in self.WALK_CASES:
+            with self.subTest(raw_code=raw_code):
+                dockerignore = parser.parse(raw_code)
+                self.assertEqual(expected, sorted(path for path, _ in dockerignore.walk(self.directory)))
+                self.assertEqual(len(expected), dockerignore.context_size(self.directory)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+
+from dockerfile_ast import DockerfileParser, ImageConfig, evaluate_stage_configs
+
+
+class ImageConfigTest(unittest.TestCase):
+
+    def test_predefined_environment_variables_refer_to_base_image(self):
+        instructions = DockerfileParser().parse("FROM x\nENV P=$PATH\nENV PATH=/opt/bin:$PATH\nENV Q=$PATH\n")
+        image_config = ImageConfig(env={"PATH": "/usr/bin"}).apply(instructions.instructions[1:])
+        self.assertEqual("/usr/bin", image_config.env["P"])
+        self.assertEqual("/opt/bin:/usr/bin", image_config.env["PATH"])
+        self.assertEqual("/opt/bin:/usr/bin", image_config.env["Q"])
+
+    def test_environment_variables_declared_in_stage_override_base_image(self):
+        instructions = DockerfileParser().parse("FROM x\nENV HOME=/root A=1\nENV B=$HOME$A\n")
+        image_config = ImageConfig(env={"HOME": "/home/user", "A": "0"}).apply(iter(instructions.instructions[1:]))
+        self.assertEqual("/root1", image_config.env["B"])
+
+    def test_predefined_environment_variables_default_without_base_image(self):
+        instructions = DockerfileParser().parse("FROM x\nENV P=$PATH\n")
+        image_config = ImageConfig().apply(instructions.instructions[1:])
+        self.assertEqual("/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin", image_config.env["P"])
+
+    def test_predefined_environment_variables_are_inherited_by_stages(self):
+        instructions = DockerfileParser().parse(
+            "FROM x AS base\nENV PATH=/opt/bin:$PATH\nFROM base\nENV P=$PATH\n"
+        ).instructions
+        image_configs = evaluate_stage_configs(instructions, base_config=lambda _: ImageConfig(env={"PATH": "/bin"}))
+        self.assertEqual("/opt/bin:/bin", image_configs[0].env["PATH"])
+        self.assertEqual("/opt/bin:/bin", image_configs[1].env["P"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from dockerfile_ast import BuildContextIndex, DockerfileParser, LayerCacheAnalyzer, matches_source
+
+
+FILENAMES = ["a.py", "b.py", "^.py", "src/main.py", "src/lib/util.py", "docs/index.md"]
+
+
+class LayerCacheAnalyzerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for filename in FILENAMES:
+            path = os.path.join(self.directory, *filename.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as fp:
+                fp.write(filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_matches_source_agrees_with_index(self):
+        context_index = BuildContextIndex(self.directory)
+        for pattern in ["[^a].py", "[!a].py", "?.py", "**.py", "*", "src", "src/*", "./src/../docs/*.md", ".", "s*/l*"]:
+            expected = context_index.expand(pattern)
+            self.assertEqual(
+                expected, [filename for filename in sorted(FILENAMES) if matches_source(pattern, filename)], pattern
+            )
+
+    def test_invalidated_layers_follow_go_pattern_syntax(self):
+        dockerfile_ast = DockerfileParser().parse(
+            "FROM x AS build\nRUN make\nCOPY [^a].py /app/\nFROM build\nCOPY src/lib /lib/\n"
+        )
+        analyzer = LayerCacheAnalyzer(self.directory)
+        copy_instruction = dockerfile_ast.instructions[2]
+        self.assertEqual([None, None], analyzer.invalidated_layers(dockerfile_ast, ["a.py", "src/main.py"]))
+        self.assertEqual(
+            [copy_instruction, dockerfile_ast.instructions[3]], analyzer.invalidated_layers(dockerfile_ast, ["b.py"])
+        )
+        self.assertEqual(
+            [None, dockerfile_ast.instructions[4]],
+            analyzer.invalidated_layers(dockerfile_ast, [os.path.join(self.directory, "src", "lib", "new.py")])
+        )
+
+    def test_copy_from_image_does_not_depend_on_build_context(self):
+        dockerfile_ast = DockerfileParser().parse("FROM x\nCOPY --from=nginx:latest src/main.py /app/\n")
+        analyzer = LayerCacheAnalyzer(self.directory)
+        self.assertEqual([None], analyzer.invalidated_layers(dockerfile_ast, ["src/main.py"]))
+        layer_keys = analyzer.layer_keys(dockerfile_ast)
+        with open(os.path.join(self.directory, "src", "main.py"), "w") as fp:
+            fp.write("changed")
+        analyzer.context_index.refresh()
+        self.assertEqual(layer_keys, analyzer.layer_keys(dockerfile_ast))
+
+    def test_changed_arg_invalidates_from_first_use(self):
+        dockerfile_ast = DockerfileParser().parse(
+            "FROM x\nARG V=1\nLABEL a=b\nCOPY a.py /app/$V/\nRUN make\n"
+        )
+        analyzer = LayerCacheAnalyzer(self.directory)
+        keys = [key for _, key in analyzer.layer_keys(dockerfile_ast)[0]]
+        changed_keys = [key for _, key in analyzer.layer_keys(dockerfile_ast, {"V": "2"})[0]]
+        self.assertEqual(keys[:3], changed_keys[:3])
+        self.assertTrue(all(key != changed_key for key, changed_key in zip(keys[3:], changed_keys[3:])))
+        dockerfile_ast = DockerfileParser().parse("FROM x\nARG V=1\nLABEL a=$VERSION\nRUN make\n")
+        keys = [key for _, key in analyzer.layer_keys(dockerfile_ast)[0]]
+        changed_keys = [key for _, key in analyzer.layer_keys(dockerfile_ast, {"V": "2"})[0]]
+        self.assertEqual(keys[:3], changed_keys[:3])
+        self.assertNotEqual(keys[3], changed_keys[3])
+
+
+if __name__ == "__main__":
+    unittest.main()
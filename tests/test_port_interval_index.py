@@ -0,0 +1,68 @@
+import unittest
+
+from dockerfile_ast import DockerfileParser, PortIntervalIndex
+from dockerfile_ast.dockerfile_items.instructions import EXPOSEInstruction
+from dockerfile_ast.dockerfile_items.nodes import DockerPortRange
+
+
+class DockerPortRangeTest(unittest.TestCase):
+
+    def test_port_range_is_parsed_without_expansion(self):
+        dockerfile_ast = DockerfileParser().parse("FROM x\nEXPOSE 80 8000-8010/udp 9000-9001\n")
+        expose_instruction = dockerfile_ast.instructions[1]
+        self.assertIsInstance(expose_instruction, EXPOSEInstruction)
+        port_range = expose_instruction.ports[1]
+        self.assertIsInstance(port_range, DockerPortRange)
+        self.assertEqual((8000, 8010, 11), (port_range.start, port_range.end, len(port_range)))
+        self.assertIn(8005, port_range)
+        self.assertNotIn(8011, port_range)
+        self.assertEqual("8000-8010/udp", str(port_range))
+        self.assertEqual("9000-9001", str(expose_instruction.ports[2]))
+        self.assertEqual(
+            [(80, 80, "tcp"), (8000, 8010, "udp"), (9000, 9001, "tcp")], dockerfile_ast.exposed_port_intervals()
+        )
+
+
+class PortIntervalIndexTest(unittest.TestCase):
+    INTERVALS = (
+        ("a", 80, 80, "tcp"),
+        ("b", 1, 1000, "tcp"),
+        ("c", 500, 600, "tcp"),
+        ("a", 550, 560, "tcp"),
+        ("d", 53, 53, "udp"),
+        ("c", 600, 700, "tcp"),
+    )
+
+    def setUp(self):
+        self.index = PortIntervalIndex()
+        for key, start, end, protocol in self.INTERVALS:
+            self.index.add_interval(key, start, end, protocol)
+
+    def test_find_agrees_with_linear_scan(self):
+        for port_num in range(0, 1002):
+            for protocol in (None, "tcp", "udp", "sctp"):
+                expected = list(dict.fromkeys(
+                    key for key, start, end, interval_protocol in self.INTERVALS
+                    if start <= port_num <= end and protocol in (None, interval_protocol)
+                ))
+                actual = self.index.find(port_num, protocol)
+                self.assertEqual(sorted(expected), sorted(actual), (port_num, protocol))
+
+    def test_find_keeps_order_of_addition(self):
+        self.assertEqual(["b", "c", "a"], self.index.find(555, "tcp"))
+        self.assertEqual(["b", "c"], self.index.find(600, "TCP"))
+
+    def test_add_after_find_rebuilds(self):
+        self.assertFalse(self.index.exposes(5000))
+        self.index.add("e", DockerfileParser().parse("FROM x\nEXPOSE 4000-6000 8080/udp\n"))
+        self.assertEqual(["e"], self.index.find(5000))
+        self.assertTrue(self.index.exposes(8080, "udp"))
+        self.assertEqual(8, len(self.index))
+
+    def test_illegal_interval(self):
+        with self.assertRaises(ValueError):
+            self.index.add_interval("x", 2, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
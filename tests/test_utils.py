@@ -0,0 +1,42 @@
+import logging
+import unittest
+
+from dockerfile_ast import DockerfileASTVisitor, DockerfileParser
+from dockerfile_ast.utils import default_logger, init_logger
+
+
+class DefaultLoggerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger("dockerfile_ast.utils")
+        self.root_handlers = list(logging.getLogger().handlers)
+        self.tearDown()
+
+    def tearDown(self):
+        for handler in list(self.logger.handlers):
+            self.logger.removeHandler(handler)
+        self.logger.setLevel(logging.NOTSET)
+        logging.getLogger().handlers = list(self.root_handlers)
+
+    def test_default_logger_keeps_verbosity_set_before(self):
+        logger = init_logger(logging.DEBUG, None, logging.WARNING)
+        DockerfileASTVisitor(DockerfileParser().parse("FROM x\n")).visit()
+        self.assertIs(logger, default_logger())
+        self.assertEqual(logging.DEBUG, logger.level)
+        self.assertEqual([logging.DEBUG], [handler.level for handler in logger.handlers])
+
+    def test_default_logger_adds_handler_once(self):
+        logging.getLogger().handlers = list()
+        DockerfileParser()
+        DockerfileParser()
+        self.assertEqual([logging.WARNING], [handler.level for handler in self.logger.handlers])
+        self.assertEqual(logging.NOTSET, self.logger.level)
+
+    def test_default_logger_uses_configured_handlers(self):
+        logging.getLogger().handlers = [logging.NullHandler()]
+        default_logger()
+        self.assertEqual([], self.logger.handlers)
+
+
+if __name__ == "__main__":
+    unittest.main()
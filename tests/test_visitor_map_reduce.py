@@ -0,0 +1,101 @@
+import collections
+import os
+import shutil
+import tempfile
+import unittest
+
+from dockerfile_ast import DockerfileASTVisitor, DockerfileParser, VisitorMapReduce
+from dockerfile_ast.dockerfile_items.instructions import LABELInstruction
+
+
+class InstructionTypeCounter(DockerfileASTVisitor):
+    def __init__(self, ast):
+        super(InstructionTypeCounter, self).__init__(ast)
+        self.__instruction_types = collections.Counter(
+            instruction.__class__.__name__ for instruction in ast.instructions
+        )
+
+    def result(self):
+        return self.__instruction_types
+
+
+class LabelCounter(DockerfileASTVisitor):
+    def __init__(self, ast):
+        super(LabelCounter, self).__init__(ast)
+        self.__ast = ast
+        self.__labels = collections.Counter()
+
+    def visit(self):
+        for instruction in self.__ast.instructions:
+            if isinstance(instruction, LABELInstruction):
+                self.__labels.update(label.name for label in instruction.labels)
+        return super(LabelCounter, self).visit()
+
+    def result(self):
+        return self.__labels
+
+
+def lazy_parser():
+    return DockerfileParser(lazy=True)
+
+
+def update_counter(accumulated_value, result):
+    # 累積値をその場で更新する集約関数
+    accumulated_value.update(result)
+    return accumulated_value
+
+
+class VisitorMapReduceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filenames = list()
+        for index in range(5):
+            filename = os.path.join(self.directory, "Dockerfile.{0}".format(index))
+            with open(filename, "w") as fp:
+                fp.write("FROM ubuntu:22.04\nRUN make {0}\nEXPOSE 80\n".format(index))
+            self.filenames.append(filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_map_reduce(self, max_workers, combiner, initial):
+        map_reduce = VisitorMapReduce(
+            InstructionTypeCounter, update_counter, initial=initial, combiner=combiner,
+            max_workers=max_workers, chunk_size=2
+        )
+        return map_reduce.run_files(self.filenames)
+
+    def test_serial_and_parallel_results_are_equal(self):
+        expected = collections.Counter({"FROMInstruction": 5, "RUNInstruction": 5, "EXPOSEInstruction": 5})
+        for combiner in [None, update_counter]:
+            initial = collections.Counter()
+            serial_result = self.run_map_reduce(1, combiner, initial)
+            parallel_result = self.run_map_reduce(2, combiner, initial)
+            self.assertEqual(expected, serial_result)
+            self.assertEqual(expected, parallel_result)
+            # 初期値は変更されない
+            self.assertEqual(collections.Counter(), initial)
+
+    def test_failures_are_collected(self):
+        with open(self.filenames[0], "w") as fp:
+            fp.write("FROM\n")
+        with open(self.filenames[1], "w") as fp:
+            fp.write("FROM x\nLABEL a=\"b\n")
+        map_reduce = VisitorMapReduce(
+            InstructionTypeCounter, update_counter, initial=collections.Counter(), max_workers=1
+        )
+        result = map_reduce.run_files(self.filenames)
+        self.assertEqual(3, result["FROMInstruction"])
+        self.assertEqual(self.filenames[:2], [filename for filename, _ in map_reduce.failures])
+
+        # 遅延構築される命令の本体はvisitorが参照したときにparseされる
+        map_reduce = VisitorMapReduce(
+            LabelCounter, update_counter, initial=collections.Counter(), parser_factory=lazy_parser, max_workers=1
+        )
+        map_reduce.run_files(self.filenames)
+        self.assertEqual(self.filenames[:2], [filename for filename, _ in map_reduce.failures])
+
+
+if __name__ == "__main__":
+    unittest.main()